@@ -1,19 +1,137 @@
+import asyncio
+import json
+import logging
 import os
-from flask import Flask, request, jsonify
+import threading
+import time
+from contextlib import nullcontext
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from yaml_parser import YamlParser
+from parse_cache import ParseCache
+from file_watcher import WatchedParser
+from batch_scan import iter_repository_scans, merge_repository_scans
+from mermaid import generate_mermaid_graph, generate_scalable_mermaid
+from graph_analytics import DependencyGraph
+from scan_records import DetachedScan, iter_scan_records, scan_result
+from scan_diff import diff_snapshots, snapshot_parser, validate_snapshot
+from result_cache import ResultCache, directory_fingerprint, payload_fingerprint
+from metrics import MetricsRegistry, ParseMetrics
+from discovery import DEFAULT_IGNORE_GLOBS, Discovery
+from mmap_scan import precompile_patterns
+
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
 
 app = Flask(__name__)
 CORS(app)
 
+# Worker processes used for per-file parsing (0 = one per CPU)
+PARSER_WORKERS = int(os.environ.get("PARSER_WORKERS", "1"))
+
+# Per-file parse results persisted across requests (disabled unless PARSE_CACHE_DIR is set)
+PARSE_CACHE_DIR = os.environ.get("PARSE_CACHE_DIR")
+parse_cache = ParseCache(PARSE_CACHE_DIR) if PARSE_CACHE_DIR else None
+
+# Which files a scan reads: names to skip (comma-separated globs, PARSE_IGNORE),
+# .gitignore rules (PARSE_GITIGNORE=0 turns them off) and symlinked directories
+# (PARSE_FOLLOW_SYMLINKS=1). Inventories are kept next to the parse cache.
+PARSE_IGNORE = os.environ.get("PARSE_IGNORE")
+discovery = Discovery(
+    DEFAULT_IGNORE_GLOBS if PARSE_IGNORE is None else [glob.strip() for glob in PARSE_IGNORE.split(",") if glob.strip()],
+    use_gitignore=os.environ.get("PARSE_GITIGNORE", "1") == "1",
+    follow_symlinks=os.environ.get("PARSE_FOLLOW_SYMLINKS", "0") == "1",
+    inventory_dir=os.path.join(PARSE_CACHE_DIR, "inventory") if PARSE_CACHE_DIR else None,
+)
+
+# Read files through the async prefetching pipeline, this many at a time (0 = plain reads)
+PARSE_ASYNC_IO = int(os.environ.get("PARSE_ASYNC_IO", "0"))
+
+# Scan files as memory-mapped bytes instead of decoded text (PARSE_MMAP=1)
+PARSE_MMAP = os.environ.get("PARSE_MMAP", "0") == "1"
+
+# Config files of at least this many bytes are parsed one YAML document at a time
+PARSE_STREAM_MIN_BYTES = int(os.environ.get("PARSE_STREAM_MIN_BYTES", str(YamlParser.STREAM_MIN_BYTES)))
+
+# Generated /parse and /generate-mermaid responses, keyed by a fingerprint of their input
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "64"))
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", "300"))
+result_cache = ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL) if RESULT_CACHE_SIZE > 0 else None
+
+# Repos of a batch scan processed at the same time (they share the PARSER_WORKERS pool)
+BATCH_PARALLEL_REPOS = int(os.environ.get("BATCH_PARALLEL_REPOS", "4"))
+
+# Keep a watched, incrementally updated parser per directory (PARSE_WATCH=1)
+PARSE_WATCH = os.environ.get("PARSE_WATCH", "0") == "1"
+
+# Per-stage timings and counters for /parse and /metrics (PARSE_METRICS=0 turns them off)
+PARSE_METRICS = os.environ.get("PARSE_METRICS", "1") == "1"
+metrics_registry = MetricsRegistry() if PARSE_METRICS else None
+
+# Directories scanned by warmup() before serving, separated by os.pathsep
+WARMUP_DIRECTORIES = [path for path in os.environ.get("WARMUP_DIRECTORIES", "").split(os.pathsep) if path]
+
+# Set once warmup() has finished; servers that do not call it warm up on the first request
+warmed_up = threading.Event()
+warmup_lock = threading.Lock()
+
 class YAMLParser:
     def __init__(self):
         self.supported_files = {
             'docker-compose': ['docker-compose.yml', 'docker-compose.yaml'],
             'kubernetes': ['*.yaml', '*.yml']
         }
+        self.watched_parsers = {}
+        self._watch_lock = threading.Lock()
+
+    def new_metrics(self):
+        """Metrics for one request, or None when instrumentation is off"""
+        if metrics_registry is None:
+            return None
+        return ParseMetrics(metrics_registry)
+
+    def _record_scan(self):
+        if metrics_registry is not None:
+            metrics_registry.record_scan()
+
+    def _get_parser(self, directory_path, metrics=None):
+        """Return (parser, lock) for directory_path, fully processed.
+
+        In watch mode the parser is created once per directory and then kept
+        current by its watcher, so later requests skip the scan entirely.
+        metrics (a ParseMetrics) receives this request's timings.
+        """
+        if not PARSE_WATCH:
+            microservice_parser = YamlParser(directory_path, workers=PARSER_WORKERS, cache=parse_cache,
+                                             metrics=metrics, use_mmap=PARSE_MMAP, discovery=discovery,
+                                             stream_min_bytes=PARSE_STREAM_MIN_BYTES)
+            # A failed scan raises, so a partial result never reaches a response or the result cache
+            self._record_scan()
+            if PARSE_ASYNC_IO > 0:
+                asyncio.run(microservice_parser.process_all_microservices_async(PARSE_ASYNC_IO))
+            else:
+                microservice_parser.process_all_microservices()
+            return microservice_parser, nullcontext()
+
+        watched = self._watched_parser(directory_path, metrics)
+        if metrics is not None:
+            with watched.lock:
+                # Later watcher updates land here too and still reach the registry
+                watched.parser.metrics = metrics
+        return watched.parser, watched.lock
     
-    def scan_directory(self, directory_path):
+    def _watched_parser(self, directory_path, metrics=None):
+        """The WatchedParser of directory_path, created (and scanned) on first use"""
+        with self._watch_lock:
+            watched = self.watched_parsers.get(directory_path)
+            if watched is None:
+                self._record_scan()
+                watched = WatchedParser(directory_path, workers=PARSER_WORKERS, cache=parse_cache,
+                                        metrics=metrics, use_mmap=PARSE_MMAP, discovery=discovery,
+                                        stream_min_bytes=PARSE_STREAM_MIN_BYTES)
+                self.watched_parsers[directory_path] = watched
+            return watched
+
+    def scan_directory(self, directory_path, metrics=None):
         #delete the comment for docker build.
         #directory_path = "/app/projects/" + directory_path
 
@@ -23,180 +141,491 @@ class YAMLParser:
         if not os.path.exists(directory_path):
             raise FileNotFoundError(f"Directory not found: {directory_path}")
         
-        all_dependencies = []
-        microservices_data = []
-        total_dependency_count = 0
-        total_publish_subscribe_events = 0
-        
-        try:
-            microservice_parser = YamlParser(directory_path)
-            microservice_parser.process_all_microservices()
-            ms_dependencies = microservice_parser.build_dependency_graph()
-            ms_topic_map = microservice_parser.get_microservice_topic_map()
-            
-            # Calculate total publish/subscribe events (all produced and subscribed topics)
-            for service_name, topics in ms_topic_map.items():
-                microservices_data.append({
-                    "name": service_name,
-                    "produces": list(topics.produces),
-                    "subscribes": list(topics.subscribes)
-                })
-                # Count all produced and subscribed topics for this service
-                total_publish_subscribe_events += len(topics.produces) + len(topics.subscribes)
-                
-            # Create direct dependency arrows - service -> dependency
-            for service, deps in ms_dependencies.items():
-                for dep in deps:
-                    all_dependencies.append({
-                        "name": dep,
-                        "type": "microservice_dependency",
-                        "description": f"{service} depends on {dep}",
-                        "service": service,
-                        "version": "",
-                        "category": "microservice"
-                    })
-            # Topic-based communication dependencies are already handled in the parser
-            # The parser's build_dependency_graph() method creates dependencies based on topic matching
-            # So we don't need to duplicate that logic here
-        except Exception as e:
-            pass
-
-        print(f"All dependencies from app.py: {len(all_dependencies)}")
-        print(f"Dependencies from parser.get_total_dependency_count(): {microservice_parser.get_total_dependency_count()}")
-        print(f"Total publish/subscribe events: {total_publish_subscribe_events}")
-        total_dependency_count = microservice_parser.get_total_dependency_count()
-
-        return {
-            "dependencies": all_dependencies,
-            "total_dependencies": total_publish_subscribe_events,
-            "microservices": microservices_data,
-            "total_dependency_count": total_dependency_count
-            
+        microservice_parser, parser_lock = self._get_parser(directory_path, metrics)
+        with parser_lock:
+            return scan_result(microservice_parser)
+
+    def request_fields(self, metrics, started):
+        """Per-request /parse fields, added to the body after the result cache lookup"""
+        fields = {}
+        if parse_cache is not None:
+            fields["cache_stats"] = parse_cache.stats()
+        if metrics is not None:
+            metrics.add_stage_time("request", time.perf_counter() - started)
+            fields["timings"] = metrics.summary()
+        return fields
+
+    def directory_fingerprint(self, directory_path):
+        """Fingerprint of what a scan of directory_path returns (see result_cache).
+
+        That is the files the scan reads, or in watch mode the state the
+        watched parser has applied, which trails the files until its watcher
+        catches up.
+        """
+        directory_path = os.path.abspath(directory_path)
+        if not os.path.exists(directory_path):
+            raise FileNotFoundError(f"Directory not found: {directory_path}")
+        if PARSE_WATCH:
+            watched = self._watched_parser(directory_path)
+            with watched.lock:
+                return directory_fingerprint([], directory_path, watched.generation, watched.parser.topics_version)
+        return directory_fingerprint(
+            [os.path.join(directory_path, "deployment", "config"), os.path.join(directory_path, "doc")],
+            directory_path, discovery=discovery, root=directory_path)
+
+    def dependency_graph(self, directory_path):
+        """DependencyGraph (see graph_analytics) of the services under directory_path"""
+        directory_path = os.path.abspath(directory_path)
+        if not os.path.exists(directory_path):
+            raise FileNotFoundError(f"Directory not found: {directory_path}")
+        microservice_parser, parser_lock = self._get_parser(directory_path, self.new_metrics())
+        with parser_lock:
+            return DependencyGraph(microservice_parser.build_dependency_graph())
+
+    def snapshot(self, directory_path):
+        """Scan snapshot (see scan_diff) of the services under directory_path"""
+        directory_path = os.path.abspath(directory_path)
+        if not os.path.exists(directory_path):
+            raise FileNotFoundError(f"Directory not found: {directory_path}")
+        microservice_parser, parser_lock = self._get_parser(directory_path, self.new_metrics())
+        with parser_lock:
+            return snapshot_parser(microservice_parser)
+
+    def stream_directory(self, directory_path):
+        """Yield /parse results as records, one service or dependency at a time.
+
+        A "scan" record is yielded before any parsing so clients get their
+        first bytes immediately; a closing "summary" record carries the totals.
+        The records are written from a copy of the parser state taken under
+        the parser lock, so a slow client never holds up other requests or
+        the watcher.
+        """
+        directory_path = os.path.abspath(directory_path)
+        if not os.path.exists(directory_path):
+            raise FileNotFoundError(f"Directory not found: {directory_path}")
+        yield {"record": "scan", "directory_path": directory_path}
+
+        metrics = self.new_metrics()
+        started = time.perf_counter()
+        microservice_parser, parser_lock = self._get_parser(directory_path, metrics)
+        with parser_lock:
+            scan = DetachedScan(microservice_parser)
+        for record in iter_scan_records(scan):
+            if record["record"] == "summary":
+                summary = record
+            else:
+                yield record
+
+        if metrics is not None:
+            metrics.add_stage_time("request", time.perf_counter() - started)
+            summary["timings"] = metrics.summary()
+        yield summary
+
+    def stream_directories(self, directory_paths):
+        """Yield batch scan records for several repos parsed on one shared worker pool.
+
+        A "batch" record comes first, then a "repo" record per repo as each
+        one finishes (with completed/total for progress), then a "merged"
+        record with the cross-repo graph. A repo that fails gets a repo
+        record with status "error"; the other repos are unaffected. Batch
+        scans always parse afresh, also in watch mode.
+        """
+        directory_paths = [os.path.abspath(path) for path in directory_paths]
+        total = len(directory_paths)
+        yield {"record": "batch", "directory_paths": directory_paths, "total": total}
+
+        scans = []
+        for scan in iter_repository_scans(directory_paths, workers=PARSER_WORKERS,
+                                          max_parallel_repos=BATCH_PARALLEL_REPOS, cache=parse_cache,
+                                          use_mmap=PARSE_MMAP, discovery=discovery,
+                                          stream_min_bytes=PARSE_STREAM_MIN_BYTES, metrics=self.new_metrics):
+            scans.append(scan)
+            self._record_scan()
+            yield {"record": "repo", "completed": len(scans), "total": total, **self._repo_result(scan)}
+
+        merged_parser, service_repos = merge_repository_scans(scans)
+        yield {"record": "merged", **self._merged_result(merged_parser, service_repos)}
+
+    def scan_directories(self, directory_paths):
+        """Batch /parse: per-repo results in request order plus the merged graph"""
+        repos = []
+        merged = None
+        for record in self.stream_directories(directory_paths):
+            kind = record.pop("record")
+            if kind == "repo":
+                del record["completed"], record["total"]
+                repos.append(record)
+            elif kind == "merged":
+                merged = record
+        repos.sort(key=lambda repo: repo["index"])
+        return {"repos": repos, "merged": merged}
+
+    def _repo_result(self, scan):
+        result = {
+            "index": scan.index,
+            "directory_path": scan.root,
+            "status": "ok" if scan.ok else "error",
+            "elapsed_ms": round(scan.seconds * 1000, 3),
         }
+        if not scan.ok:
+            result["error"] = str(scan.error)
+            return result
+        result.update(scan_result(scan.parser))
+        if scan.parser.metrics.enabled:
+            result["timings"] = scan.parser.metrics.summary()
+        return result
+
+    def _merged_result(self, merged_parser, service_repos):
+        """scan_result for the merged graph, annotated with the repos of each service"""
+        result = scan_result(merged_parser)
+        for microservice in result["microservices"]:
+            microservice["repos"] = service_repos[microservice["name"]]
+        cross_repo_count = 0
+        for dependency in result["dependencies"]:
+            # Cross-repo: the dependency is not defined in any repo of the dependent service
+            dependency["cross_repo"] = not set(service_repos[dependency["service"]]) & set(service_repos[dependency["name"]])
+            cross_repo_count += dependency["cross_repo"]
+        result["cross_repo_dependency_count"] = cross_repo_count
+        return result
 
 parser = YAMLParser()
 
+def warmup(directory_paths=None):
+    """Get this process ready to serve, then mark /health ready.
+
+    Compiles the patterns the mmap scanner otherwise builds on first use and
+    scans directory_paths (default WARMUP_DIRECTORIES), which fills the parse
+    cache, the parser's name caches and the /parse result cache. A failed
+    directory is reported and skipped. Run it before forking workers (see
+    gunicorn.conf.py) so that every worker starts warm.
+    """
+    started = time.perf_counter()
+    precompile_patterns()
+    for directory_path in WARMUP_DIRECTORIES if directory_paths is None else directory_paths:
+        try:
+            etag = "parse-" + parser.directory_fingerprint(directory_path)
+            body = app.json.dumps(parser.scan_directory(directory_path))
+            if result_cache is not None:
+                result_cache.put(etag, body)
+        except Exception as e:
+            print(f"Error warming up {directory_path}: {e}")
+    warmed_up.set()
+    app.logger.info("Warmup finished in %.2fs", time.perf_counter() - started)
+
+def after_fork():
+    """Reset per-process state in a server worker forked from a warmed-up parent"""
+    if parse_cache is not None:
+        parse_cache.reopen()
+    # Watcher threads do not survive a fork; each worker starts its own
+    parser.watched_parsers.clear()
+
+def cached_json_response(etag, build, request_fields=None):
+    """JSON response for an input fingerprinted as etag.
+
+    Answers 304 Not Modified when the client already holds etag, otherwise
+    serves the body from result_cache or builds, serializes and caches it.
+    request_fields, if given, returns per-request fields (timings and the
+    like) that are added to the body after caching, so hits get fresh ones.
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    body = result_cache.get(etag) if result_cache is not None else None
+    cache_status = "hit"
+    if body is None:
+        body = app.json.dumps(build())
+        cache_status = "miss"
+        if result_cache is not None:
+            result_cache.put(etag, body)
+    if request_fields is not None:
+        fields = request_fields()
+        if fields:
+            # Splice into the serialized object rather than re-parsing a large body
+            body = body[:-1] + ("," if body != "{}" else "") + app.json.dumps(fields)[1:]
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["X-Result-Cache"] = cache_status
+    return response
+
+@app.before_request
+def count_request():
+    if metrics_registry is not None and request.endpoint not in (None, 'health', 'metrics'):
+        metrics_registry.record_request()
+
+@app.before_request
+def warm_up_lazily():
+    """Run warmup() on the first request when the server has not (flask run, the test client).
+
+    Other requests wait for it; /health answers 503 meanwhile.
+    """
+    if warmed_up.is_set():
+        return None
+    if not warmup_lock.acquire(blocking=request.endpoint != 'health'):
+        return jsonify({"status": "warming_up"}), 503
+    try:
+        if not warmed_up.is_set():
+            warmup()
+    finally:
+        warmup_lock.release()
+    return None
+
 @app.route('/health')
 def health():
     return jsonify({"status": "healthy"})
 
+@app.route('/metrics')
+def metrics():
+    """Parse metrics in the Prometheus text exposition format"""
+    if metrics_registry is None:
+        return jsonify({"error": "metrics are disabled (PARSE_METRICS=0)"}), 404
+    cache_stats = parse_cache.stats() if parse_cache is not None else None
+    result_cache_stats = result_cache.stats() if result_cache is not None else None
+    return Response(metrics_registry.render_prometheus(cache_stats, result_cache_stats),
+                    mimetype="text/plain; version=0.0.4")
+
 @app.route('/parse', methods=['POST'])
 def parse_yaml():
     try:
         data = request.get_json()
         if 'directory_path' in data:
             directory_path = data['directory_path']
-            result = parser.scan_directory(directory_path)
-            return jsonify(result)
+            started = time.perf_counter()
+            metrics = parser.new_metrics()
+            etag = "parse-" + parser.directory_fingerprint(directory_path)
+            return cached_json_response(etag, lambda: parser.scan_directory(directory_path, metrics),
+                                        lambda: parser.request_fields(metrics, started))
         else:
             return jsonify({"error": "missing 'directory_path'"}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/parse/stream', methods=['POST'])
+def parse_yaml_stream():
+    """Streaming /parse: newline-delimited JSON records (scan, microservice, dependency, summary)"""
+    try:
+        data = request.get_json()
+        if 'directory_path' not in data:
+            return jsonify({"error": "missing 'directory_path'"}), 400
+        records = parser.stream_directory(data['directory_path'])
+        # Run up to the first record so a bad path still gets a proper error status
+        first_record = next(records)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    def generate():
+        yield json.dumps(first_record) + "\n"
+        try:
+            for record in records:
+                yield json.dumps(record) + "\n"
+        except Exception as e:
+            yield json.dumps({"record": "error", "error": str(e)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+def _batch_directory_paths(data):
+    paths = data.get('directory_paths') if isinstance(data, dict) else None
+    if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+        return None
+    return paths
+
+@app.route('/parse/batch', methods=['POST'])
+def parse_yaml_batch():
+    """Parse several repos at once: {"directory_paths": [...]} -> per-repo results plus a merged graph"""
+    try:
+        directory_paths = _batch_directory_paths(request.get_json())
+        if directory_paths is None:
+            return jsonify({"error": "'directory_paths' must be a list of paths"}), 400
+        return jsonify(parser.scan_directories(directory_paths))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/parse/batch/stream', methods=['POST'])
+def parse_yaml_batch_stream():
+    """Streaming /parse/batch: NDJSON batch, repo (one per finished repo) and merged records"""
+    try:
+        directory_paths = _batch_directory_paths(request.get_json())
+        if directory_paths is None:
+            return jsonify({"error": "'directory_paths' must be a list of paths"}), 400
+        records = parser.stream_directories(directory_paths)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    def generate():
+        try:
+            for record in records:
+                yield json.dumps(record) + "\n"
+        except Exception as e:
+            yield json.dumps({"record": "error", "error": str(e)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+def graph_source(data):
+    """(etag, build_graph) for a graph request.
+
+    The graph comes from a scan of 'directory_path', or from the
+    'dependencies' / 'microservices' lists of an earlier /parse response.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("request body must be a JSON object")
+    if 'directory_path' in data:
+        directory_path = data['directory_path']
+        etag = parser.directory_fingerprint(directory_path) + "-" + payload_fingerprint(request.get_data())
+        return etag, lambda: parser.dependency_graph(directory_path)
+    if 'dependencies' in data:
+        services = [microservice.get('name') for microservice in data.get('microservices', [])]
+        return payload_fingerprint(request.get_data()), lambda: DependencyGraph.from_records(
+            data['dependencies'], [service for service in services if service])
+    raise ValueError("missing 'directory_path' or 'dependencies'")
+
+@app.route('/graph/analysis', methods=['POST'])
+def graph_analysis():
+    """Cycles (strongly connected components) and topological layers of the dependency graph"""
+    try:
+        etag, build_graph = graph_source(request.get_json())
+        return cached_json_response("analysis-" + etag, lambda: build_graph().analysis())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/graph/impact', methods=['POST'])
+def graph_impact():
+    """Services transitively affected by 'service': downstream (its dependents), upstream or both"""
+    try:
+        data = request.get_json()
+        etag, build_graph = graph_source(data)
+        service = data.get('service')
+        direction = data.get('direction', 'downstream')
+        max_depth = data.get('max_depth')
+        if not isinstance(service, str):
+            raise ValueError("missing 'service'")
+        if direction not in ('downstream', 'upstream', 'both'):
+            raise ValueError("'direction' must be 'downstream', 'upstream' or 'both'")
+        if max_depth is not None and (not isinstance(max_depth, int) or isinstance(max_depth, bool) or max_depth < 1):
+            raise ValueError("'max_depth' must be a positive integer")
+
+        def build():
+            graph = build_graph()
+            if service not in graph.index:
+                raise LookupError(f"Unknown service: {service}")
+            result = {"service": service, "max_depth": max_depth}
+            for name in (('downstream', 'upstream') if direction == 'both' else (direction,)):
+                impacted = graph.impact(service, name, max_depth)
+                result[name] = [{"name": dep, "distance": distance} for dep, distance in impacted.items()]
+            return result
+
+        return cached_json_response("impact-" + etag, build)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/snapshot', methods=['POST'])
+def snapshot():
+    """Compact snapshot of a scan of 'directory_path', for a later /diff"""
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict) or 'directory_path' not in data:
+            return jsonify({"error": "missing 'directory_path'"}), 400
+        directory_path = data['directory_path']
+        etag = "snapshot-" + parser.directory_fingerprint(directory_path)
+        return cached_json_response(etag, lambda: parser.snapshot(directory_path))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def _diff_side(data, key):
+    """The snapshot for one side of a /diff request: given inline or as {'directory_path': ...}"""
+    side = data.get(key)
+    if isinstance(side, dict) and 'directory_path' in side:
+        return parser.snapshot(side['directory_path'])
+    if side is None:
+        raise ValueError(f"missing '{key}'")
+    validate_snapshot(side)
+    return side
+
+@app.route('/diff', methods=['POST'])
+def diff():
+    """Services, topics and dependency edges added or removed between 'base' and 'head'"""
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict):
+            raise ValueError("request body must be a JSON object")
+        return jsonify(diff_snapshots(_diff_side(data, 'base'), _diff_side(data, 'head')))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+MERMAID_OPTION_TYPES = {
+    "group_by_domain": bool,
+    "collapse_groups": bool,
+    "focus": str,
+    "depth": int,
+    "page": int,
+    "page_size": int,
+    "max_edges": int,
+}
+
+# Upper bounds on what a client may ask a single response to contain
+MERMAID_MAX_PAGE_SIZE = int(os.environ.get("MERMAID_MAX_PAGE_SIZE", "500"))
+MERMAID_MAX_EDGES = int(os.environ.get("MERMAID_MAX_EDGES", "2000"))
+
+def mermaid_options(options):
+    """Validated keyword arguments for generate_scalable_mermaid from a request's options"""
+    if not isinstance(options, dict):
+        raise ValueError("'options' must be an object")
+    kwargs = {}
+    for name, value in options.items():
+        expected = MERMAID_OPTION_TYPES.get(name)
+        if expected is None:
+            raise ValueError(f"Unknown mermaid option: {name}")
+        if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+            raise ValueError(f"Mermaid option '{name}' must be {expected.__name__}")
+        kwargs[name] = value
+    kwargs["page_size"] = min(kwargs.get("page_size", 200), MERMAID_MAX_PAGE_SIZE)
+    kwargs["max_edges"] = min(kwargs.get("max_edges", 500), MERMAID_MAX_EDGES)
+    return kwargs
+
 @app.route('/generate-mermaid', methods=['POST'])
 def generate_mermaid():
     try:
         data = request.get_json()
-        dependencies = data.get('dependencies', [])
-        #------for debug----------
-        print("---------Dependencies---------")
-        print(dependencies)
-        microservices = data.get('microservices', [])
-        mermaid_code = generate_mermaid_graph(dependencies, microservices)
+
+        def build():
+            dependencies = data.get('dependencies', [])
+            #------for debug----------
+            app.logger.debug("---------Dependencies---------\n%s", dependencies)
+            microservices = data.get('microservices', [])
+            options = data.get('options')
+            if options is not None:
+                # Scalable mode: grouped, collapsible, focusable and paginated
+                rendered = generate_scalable_mermaid(dependencies, microservices, **mermaid_options(options))
+                return {"success": True, **rendered}
+            mermaid_code = generate_mermaid_graph(dependencies, microservices)
+            return {
+                "success": True,
+                "mermaid": mermaid_code
+            }
+
+        return cached_json_response("mermaid-" + payload_fingerprint(request.get_data()), build)
+    except ValueError as e:
+        # Bad options: wrong types, page out of range, unknown focus service
         return jsonify({
-            "success": True,
-            "mermaid": mermaid_code
-        })
+            "success": False,
+            "error": str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             "success": False,
             "error": str(e)
         }), 500
 
-def generate_mermaid_graph(dependencies, microservices):
-    services = set()
-    service_connections = []
-    producers = set()
-    consumers = set()
-    for dep in dependencies:
-        if dep.get('type') == 'microservice_communication':
-            source = dep.get('source_service')
-            target = dep.get('target_service')
-            topic = dep.get('topic', '')
-            if source and target:
-                services.add(source)
-                services.add(target)
-                producers.add(source)
-                consumers.add(target)
-                service_connections.append({
-                    'from': source,
-                    'to': target,
-                    'topic': topic
-                })
-        elif dep.get('type') == 'microservice_dependency':
-            dependent_service = dep.get('service')  
-            dependency = dep.get('name')           
-            if dependent_service and dependency:
-                services.add(dependent_service)
-                services.add(dependency)
-                service_connections.append({
-                    'from': dependency,        # who provides the service
-                    'to': dependent_service,   # who depends on it
-                    'topic': ''
-                })
-    for ms in microservices:
-        if isinstance(ms, dict) and 'name' in ms:
-            services.add(ms['name'])
-        elif isinstance(ms, str):
-            services.add(ms)
-    mermaid_lines = ['flowchart TD']
-    pure_producers = producers - consumers
-    pure_consumers = consumers - producers
-    bidirectional = producers & consumers
-    standalone = services - producers - consumers
-    all_services = pure_producers | pure_consumers | bidirectional | standalone
-    for service in sorted(all_services):
-        clean_name = service.replace('-', '_').replace('.', '_')
-        mermaid_lines.append(f'    {clean_name}[{service}]')
-    if service_connections:
-        unique_connections = []
-        seen_connections = set()
-        for conn in service_connections:
-            conn_key = (conn['from'], conn['to'])
-            if conn_key not in seen_connections:
-                unique_connections.append(conn)
-                seen_connections.add(conn_key)
-        for conn in unique_connections:
-            source_clean = conn['from'].replace('-', '_').replace('.', '_')
-            target_clean = conn['to'].replace('-', '_').replace('.', '_')
-
-            # mermaid arrows
-            if conn['topic']:
-                mermaid_lines.append(f'    {source_clean} -->|{conn["topic"]}| {target_clean}')
-            else:
-                mermaid_lines.append(f'    {source_clean} --> {target_clean}')
-    mermaid_lines.extend([
-        '',
-        '    %% Styling',
-        '    classDef default fill:#f9f9f9,stroke:#333,stroke-width:2px,color:#333',
-        '    classDef producer fill:#e8f5e8,stroke:#4caf50,stroke-width:2px,color:#2e7d32',
-        '    classDef consumer fill:#fff3e0,stroke:#ff9800,stroke-width:2px,color:#f57c00',
-        '    classDef bidirectional fill:#e3f2fd,stroke:#2196f3,stroke-width:2px,color:#1565c0',
-        '    classDef standalone fill:#f5f5f5,stroke:#757575,stroke-width:2px,color:#424242'
-    ])
-    for service in sorted(pure_producers):
-        clean_name = service.replace('-', '_').replace('.', '_')
-        mermaid_lines.append(f'    class {clean_name} producer')
-    for service in sorted(pure_consumers):
-        clean_name = service.replace('-', '_').replace('.', '_')
-        mermaid_lines.append(f'    class {clean_name} consumer')
-    for service in sorted(bidirectional):
-        clean_name = service.replace('-', '_').replace('.', '_')
-        mermaid_lines.append(f'    class {clean_name} bidirectional')
-    for service in sorted(standalone):
-        clean_name = service.replace('-', '_').replace('.', '_')
-        mermaid_lines.append(f'    class {clean_name} standalone')
-    return '\n'.join(mermaid_lines)
-
 if __name__ == '__main__':
+    warmup()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
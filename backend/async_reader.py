@@ -0,0 +1,48 @@
+import asyncio
+import os
+from collections import deque
+
+
+def read_text_file(filepath, max_size=None, digest=None):
+    """Read filepath as UTF-8 text; returns (content, os.stat taken before the read, digest).
+
+    The text is the same as a text-mode read gives, universal newlines
+    included. digest, if given, is applied to the raw bytes and its result
+    returned; otherwise the third item is None. content is None, and nothing
+    is read, when the file is larger than max_size.
+    """
+    with open(filepath, "rb") as f:
+        st = os.fstat(f.fileno())
+        if max_size is not None and st.st_size > max_size:
+            return None, st, None
+        data = f.read()
+    content = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+    return content, st, digest(data) if digest is not None else None
+
+
+async def iter_file_contents(filepaths, concurrency=16, executor=None, max_size=None, digest=None):
+    """Yield (filepath, content, st, file_digest, error) for each file, in filepaths order.
+
+    Up to concurrency files are read ahead on executor threads, so reads stay
+    in flight while the consumer works on earlier files. Only the read-ahead
+    window is held in memory. file_digest is digest(raw bytes), computed on
+    the reader thread, or None without digest. A file that cannot be read
+    comes back with content None and the exception as error; one larger than
+    max_size with content None and no error, for the caller to read its own way.
+    """
+    loop = asyncio.get_running_loop()
+    pending = deque()
+    for filepath in filepaths:
+        pending.append((filepath, loop.run_in_executor(executor, read_text_file, filepath, max_size, digest)))
+        if len(pending) >= concurrency:
+            yield await _completed_read(*pending.popleft())
+    while pending:
+        yield await _completed_read(*pending.popleft())
+
+
+async def _completed_read(filepath, future):
+    try:
+        content, st, file_digest = await future
+    except Exception as e:
+        return filepath, None, None, None, e
+    return filepath, content, st, file_digest, None
@@ -0,0 +1,105 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from topic_store import MicroserviceTopics
+from yaml_parser import YamlParser
+
+
+class RepoScan:
+    """Outcome of scanning one repo root: the processed parser, or the error that stopped it"""
+
+    def __init__(self, index, root, parser=None, error=None, seconds=0.0):
+        self.index = index
+        self.root = root
+        self.parser = parser
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def iter_repository_scans(roots, workers=0, max_parallel_repos=4, **parser_options):
+    """Scan every repo root and yield a RepoScan for each, in completion order.
+
+    Up to max_parallel_repos repos are processed at once on threads; their
+    per-file parsing all goes to one process pool of workers processes
+    (0 = one per CPU). A repo that fails yields a RepoScan carrying the error
+    and does not affect the others. parser_options are passed to YamlParser
+    (cache, use_mmap, ...); metrics may be a callable returning a ParseMetrics
+    per repo.
+    """
+    roots = list(roots)
+    if not roots:
+        return
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    metrics_factory = parser_options.pop("metrics", None)
+
+    def scan(index, root, executor):
+        started = time.perf_counter()
+        try:
+            if not os.path.isdir(root):
+                raise FileNotFoundError(f"Directory not found: {root}")
+            parser = YamlParser(root, workers=workers, executor=executor,
+                                metrics=metrics_factory() if metrics_factory else None, **parser_options)
+            parser.process_all_microservices()
+            parser.build_dependency_graph()
+        except Exception as e:
+            return RepoScan(index, root, error=e, seconds=time.perf_counter() - started)
+        return RepoScan(index, root, parser=parser, seconds=time.perf_counter() - started)
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_parallel_repos, len(roots))),
+                                thread_name_prefix="repo-scan") as threads:
+            futures = [threads.submit(scan, index, root, executor) for index, root in enumerate(roots)]
+            for future in as_completed(futures):
+                yield future.result()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def merge_repository_scans(scans):
+    """Merge the services of successful scans into one YamlParser.
+
+    Services with the same name in several repos are merged into one entry,
+    so a consumer in one repo is matched against producers in every other.
+    Returns (merged_parser, service_repos) where service_repos maps each
+    service name to the roots it was found in, in scan order.
+    """
+    merged = YamlParser("")
+    service_repos = {}
+    for scan in sorted(scans, key=lambda scan: scan.index):
+        if not scan.ok:
+            continue
+        for service_name, topics_obj in scan.parser.microservice_topics_map.items():
+            merged_topics = merged.microservice_topics_map.get(service_name)
+            if merged_topics is None:
+                merged_topics = merged.microservice_topics_map[service_name] = MicroserviceTopics(merged.topic_table)
+            merged_topics.produces.update(topics_obj.produces)
+            merged_topics.subscribes.update(topics_obj.subscribes)
+            service_repos.setdefault(service_name, []).append(scan.root)
+    merged.invalidate_dependency_graph()
+    return merged, service_repos
+
+
+def scan_repositories(roots, workers=0, max_parallel_repos=4, progress=None, **parser_options):
+    """Scan several repo roots on one shared worker pool.
+
+    progress, if given, is called as progress(completed, total, scan) after
+    each repo finishes. Returns (scans, merged_parser, service_repos) with
+    scans in the order of roots; see merge_repository_scans.
+    """
+    roots = list(roots)
+    scans = []
+    for scan in iter_repository_scans(roots, workers, max_parallel_repos, **parser_options):
+        scans.append(scan)
+        if progress is not None:
+            progress(len(scans), len(roots), scan)
+    scans.sort(key=lambda scan: scan.index)
+    merged, service_repos = merge_repository_scans(scans)
+    return scans, merged, service_repos
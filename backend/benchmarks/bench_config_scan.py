@@ -0,0 +1,103 @@
+"""Compare the legacy three-pass config extraction with the single-pass scanner.
+
+Usage: python benchmarks/bench_config_scan.py [--files N] [--topics N] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.test_single_pass_scan import legacy_config_scan
+from yaml_parser import YamlParser
+
+
+def generate_config(topic_count, seed=0):
+    """Build a large Spring-style config with topics, consumers and placeholders"""
+    lines = [
+        "spring:",
+        "  application:",
+        f"    name: synthetic-service-{seed}",
+        "  kafka:",
+        "    bootstrap-servers: localhost:9092",
+        "",
+        "topics:",
+    ]
+    for i in range(topic_count):
+        domain = f"domain{(seed + i) % 37}"
+        lines.extend([
+            f"  {domain}{i}:",
+            "    warehouse:",
+            f"      stock{i % 5}:",
+            f"        event: company.{domain}.stock{i}.event",
+            "    product:",
+            f"      event: company.{domain}.product{i}.event",
+        ])
+    lines.append("")
+    lines.append("consumers:")
+    for i in range(0, topic_count, 4):
+        domain = f"domain{(seed + i) % 37}"
+        lines.extend([
+            f"  consumer{i}:",
+            "    topics:",
+            f"      - ${{topics.{domain}{i}.warehouse.stock{i % 5}.event}}",
+            f"      - ${{topics.{domain}{i}.product.event}}",
+            f"      - company.{domain}.direct{i}.event",
+            "    group-id: synthetic",
+        ])
+    lines.append("")
+    lines.append("listeners:")
+    for i in range(0, topic_count, 3):
+        lines.append(f"  listener{i}: ${{topics.unknown{i}.event}} ${{topics.domain{i % 37}{i}.product.event}}")
+    return "\n".join(lines) + "\n"
+
+
+def legacy_scan(parser, content):
+    return legacy_config_scan(content)
+
+
+def single_pass_scan(parser, content):
+    topic_map = {}
+    consumed_topics = []
+    parser._scan_config_lines(content.splitlines(), topic_map, consumed_topics)
+    return topic_map, consumed_topics
+
+
+def time_scan(scan, parser, contents, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in contents:
+            scan(parser, content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--files", type=int, default=50)
+    arg_parser.add_argument("--topics", type=int, default=500)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    parser = YamlParser(".")
+    contents = [generate_config(args.topics, seed) for seed in range(args.files)]
+
+    for content in contents:
+        if legacy_scan(parser, content) != single_pass_scan(parser, content):
+            raise SystemExit("Single-pass output differs from the legacy three-pass output")
+
+    total_lines = sum(content.count("\n") for content in contents)
+    legacy = time_scan(legacy_scan, parser, contents, args.repeat)
+    single = time_scan(single_pass_scan, parser, contents, args.repeat)
+
+    print(f"{args.files} files, {total_lines} lines (best of {args.repeat})")
+    print(f"  three-pass : {legacy * 1000:.1f} ms")
+    print(f"  single-pass: {single * 1000:.1f} ms")
+    print(f"  speedup    : {legacy / single:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Scaling of build_dependency_graph: normalized-key index vs. pairwise matching.
+
+Usage: python benchmarks/bench_dependency_graph.py [--services N] [--topics N] [--legacy-max N]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yaml_parser import MicroserviceTopics, YamlParser
+
+
+def generate_topic_map(service_count, topic_count, subscriptions_per_service=10, seed=0):
+    """Synthetic microservice_topics_map with camelCase/kebab-case spelling drift"""
+    rng = random.Random(seed)
+    topics_per_service = max(1, topic_count // service_count)
+    topic_map = {}
+    for i in range(service_count):
+        topics = MicroserviceTopics()
+        for j in range(topics_per_service):
+            topics.produces.add(f"company.stockLevel{i}.update{j}.event")
+        topic_map[f"stock-level-{i}"] = topics
+    for name, topics in topic_map.items():
+        for _ in range(subscriptions_per_service):
+            other = rng.randrange(service_count)
+            topics.subscribes.add(f"company.stock-level-{other}.update{rng.randrange(topics_per_service)}.event")
+    return topic_map
+
+
+def legacy_build(parser):
+    """The pre-index algorithm: every subscribed topic is compared to every producer topic"""
+    topic_to_producers = {}
+    for producer_service, topics_obj in parser.microservice_topics_map.items():
+        for topic in topics_obj.produces:
+            topic_to_producers.setdefault(topic, set()).add(producer_service)
+    all_producer_topics = set(topic_to_producers)
+
+    dependencies = {service: set() for service in parser.microservice_topics_map}
+    for consumer_service, topics_obj in parser.microservice_topics_map.items():
+        for subscribed_topic in topics_obj.subscribes:
+            for producer_topic in parser.find_matching_producer_topics(subscribed_topic, all_producer_topics):
+                dependencies[consumer_service].update(
+                    p for p in topic_to_producers[producer_topic] if p != consumer_service)
+    return dependencies
+
+
+def timed(fn, parser):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn(parser)
+    return time.perf_counter() - start, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--services", type=int, default=5000)
+    arg_parser.add_argument("--topics", type=int, default=50000)
+    arg_parser.add_argument("--legacy-max", type=int, default=100,
+                            help="largest service count to run the quadratic algorithm on")
+    args = arg_parser.parse_args()
+
+    topics_per_service = max(1, args.topics // args.services)
+    sizes = []
+    size = 50
+    while size < args.services:
+        sizes.append(size)
+        size *= 2
+    sizes.append(args.services)
+
+    print(f"{'services':>9} {'topics':>8} {'indexed':>10} {'pairwise':>10}")
+    for service_count in sizes:
+        parser = YamlParser(".")
+        parser.microservice_topics_map = generate_topic_map(service_count, service_count * topics_per_service)
+        indexed_time, indexed = timed(YamlParser.build_dependency_graph, parser)
+
+        pairwise = "-"
+        if service_count <= args.legacy_max:
+            legacy_time, legacy = timed(legacy_build, parser)
+            if legacy != indexed:
+                raise SystemExit(f"Indexed graph differs from pairwise graph at {service_count} services")
+            pairwise = f"{legacy_time * 1000:.1f}ms"
+
+        print(f"{service_count:>9} {service_count * topics_per_service:>8} "
+              f"{indexed_time * 1000:>8.1f}ms {pairwise:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Discovery time of os.walk, a pruned scandir scan and an inventory refresh.
+
+Generates a repo with repo_generator and adds --noise-files files in
+node_modules and build-output trees below deployment/config. The scan
+prunes them; a refresh of its inventory only stats the kept directories
+and files.
+Usage: python benchmarks/bench_discovery.py [--services N] [--noise-files N] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from discovery import Discovery
+from repo_generator import add_spec_arguments, generate_repo, spec_from_args
+
+
+def os_walk_yaml_files(directory):
+    """The discovery used before: every directory walked, every name suffix-checked"""
+    filepaths = []
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            if filename.endswith((".yaml", ".yml")):
+                filepaths.append(os.path.join(root, filename))
+    return filepaths
+
+
+def add_noise(config_directory, count):
+    for tree in ("node_modules", "target"):
+        for i in range(count // 2):
+            package = os.path.join(config_directory, tree, f"package-{i // 50}", "conf")
+            os.makedirs(package, exist_ok=True)
+            with open(os.path.join(package, f"file-{i}.yml"), "w", encoding="utf-8") as f:
+                f.write("key: value\n")
+
+
+def best_of(repeat, fn):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--noise-files", type=int, default=20000)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    add_spec_arguments(arg_parser)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="yaml-parser-discovery-") as tmp:
+        repo = os.path.join(tmp, "repo")
+        generate_repo(repo, spec_from_args(args))
+        config_directory = os.path.join(repo, "deployment", "config")
+        add_noise(config_directory, args.noise_files)
+
+        walk_time, walked = best_of(args.repeat, lambda: os_walk_yaml_files(config_directory))
+        scan_time, scanned = best_of(args.repeat, lambda: Discovery().yaml_files(config_directory, repo))
+        discovery = Discovery(inventory_dir=os.path.join(tmp, "inventory"))
+        discovery.refresh(config_directory, repo)
+        refresh_time, refreshed = best_of(args.repeat, lambda: discovery.refresh(config_directory, repo))
+        if list(refreshed[0].files) != scanned:
+            raise SystemExit("Refreshed inventory differs from a fresh scan")
+
+        print(f"os.walk   {walk_time * 1000:9.1f} ms   {len(walked)} files")
+        print(f"scandir   {scan_time * 1000:9.1f} ms   {len(scanned)} files (pruned)")
+        print(f"refresh   {refresh_time * 1000:9.1f} ms   {len(refreshed[0].dirs)} directories stated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compare per-match domain-event classification with the single forward pass.
+
+Usage: python benchmarks/bench_doc_classification.py [--paths N] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.test_single_pass_scan import legacy_doc_topics
+from yaml_parser import YamlParser
+
+
+def generate_openapi_doc(path_count):
+    """OpenAPI doc with one documented topic per path, alternating tag styles"""
+    lines = [
+        "openapi: 3.0.0",
+        "info:",
+        "  title: Synthetic Service API",
+        "  version: 1.0.0",
+        "paths:",
+    ]
+    for i in range(path_count):
+        domain_tag = i % 3 != 0
+        lines.extend([
+            f"  /synthetic/resource{i}:",
+            "    post:",
+            "      tags:",
+            "        - DomainEvent:" if domain_tag else "        - Internal:",
+            f"            name: Resource {i} Events",
+            "      summary: Resource event",
+            "      description: |+",
+            f"        **topic:** `company.synthetic.resource{i}" + (".event`" if i % 2 else "`"),
+            "        Published when the resource changes.",
+            "      requestBody:",
+            "        required: true",
+            "        content:",
+            "          application/json:",
+            "            schema:",
+            "              type: object",
+            "              properties:",
+            "                id:",
+            "                  type: string",
+            "      responses:",
+            "        '202':",
+            "          description: Event acknowledged",
+        ])
+    return "\n".join(lines) + "\n"
+
+
+def per_match(parser, content):
+    return legacy_doc_topics(content)
+
+
+def single_pass(parser, content):
+    return parser._classify_doc_topics(content)
+
+
+def best_time(fn, parser, content, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(parser, content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--paths", type=int, default=2000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    parser = YamlParser(".")
+    print(f"{'topics':>7} {'lines':>8} {'per-match':>11} {'single-pass':>12}")
+    size = 125
+    while True:
+        size = min(size, args.paths)
+        content = generate_openapi_doc(size)
+        if per_match(parser, content) != single_pass(parser, content):
+            raise SystemExit(f"Single-pass classification differs at {size} topics")
+        legacy = best_time(per_match, parser, content, args.repeat)
+        single = best_time(single_pass, parser, content, args.repeat)
+        print(f"{size:>7} {content.count(chr(10)):>8} {legacy * 1000:>9.1f}ms {single * 1000:>10.1f}ms")
+        if size >= args.paths:
+            break
+        size *= 2
+
+
+if __name__ == "__main__":
+    main()
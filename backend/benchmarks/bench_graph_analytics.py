@@ -0,0 +1,142 @@
+"""Time and check the graph analytics engine on large synthetic dependency graphs.
+
+Builds a layered random graph (mostly acyclic, with --cycles injected back
+edges), then times CSR construction, SCC/cycle detection, layering and
+impact queries. Results are checked against straightforward reference
+implementations: Kosaraju's algorithm for components and a dict-of-sets BFS
+for impact.
+Usage: python benchmarks/bench_graph_analytics.py [--services N] [--degree N] [--cycles N] [--queries N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph_analytics import DependencyGraph
+
+
+def generate_dependencies(service_count, degree, cycles, seed=0):
+    """{service: set(dependencies)} where services mostly depend on lower-numbered ones"""
+    rng = random.Random(seed)
+    names = [f"service-{i}" for i in range(service_count)]
+    dependencies = {name: set() for name in names}
+    for i in range(1, service_count):
+        for _ in range(rng.randint(0, 2 * degree)):
+            dependencies[names[i]].add(names[rng.randrange(i)])
+    for _ in range(cycles):
+        low, high = sorted(rng.sample(range(service_count), 2))
+        dependencies[names[low]].add(names[high])
+    return dependencies
+
+
+def reference_components(dependencies):
+    """Kosaraju's algorithm over the plain dict, as sets of names"""
+    dependents = {name: set() for name in dependencies}
+    for name, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].add(name)
+
+    finished, seen = [], set()
+    for root in dependencies:
+        if root in seen:
+            continue
+        seen.add(root)
+        stack = [(root, iter(dependencies[root]))]
+        while stack:
+            node, successors = stack[-1]
+            for successor in successors:
+                if successor not in seen:
+                    seen.add(successor)
+                    stack.append((successor, iter(dependencies[successor])))
+                    break
+            else:
+                stack.pop()
+                finished.append(node)
+
+    components, assigned = [], set()
+    for root in reversed(finished):
+        if root in assigned:
+            continue
+        assigned.add(root)
+        component, stack = {root}, [root]
+        while stack:
+            for dependent in dependents[stack.pop()]:
+                if dependent not in assigned:
+                    assigned.add(dependent)
+                    component.add(dependent)
+                    stack.append(dependent)
+        components.append(frozenset(component))
+    return set(components)
+
+
+def reference_impact(adjacency, service):
+    distances, frontier, distance = {}, [service], 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for node in frontier:
+            for successor in adjacency[node]:
+                if successor not in distances:
+                    distances[successor] = distance
+                    next_frontier.append(successor)
+        frontier = next_frontier
+    return distances
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--services", type=int, default=10000)
+    arg_parser.add_argument("--degree", type=int, default=3, help="average dependencies per service")
+    arg_parser.add_argument("--cycles", type=int, default=20, help="back edges that create cycles")
+    arg_parser.add_argument("--queries", type=int, default=100, help="impact queries per direction")
+    args = arg_parser.parse_args()
+
+    dependencies = generate_dependencies(args.services, args.degree, args.cycles)
+    build_time, graph = timed(DependencyGraph, dependencies)
+    scc_time, components = timed(graph.strongly_connected_components)
+    layer_time, layers = timed(graph.layers, components)
+    print(f"{len(graph)} services, {graph.edge_count} edges")
+    print(f"  build   {build_time * 1000:9.1f} ms")
+    print(f"  scc     {scc_time * 1000:9.1f} ms   {len(components)} components, {len(graph.cycles(components))} cycles")
+    print(f"  layers  {layer_time * 1000:9.1f} ms   {len(layers)} layers")
+
+    found = {frozenset(graph.names[node] for node in component) for component in components}
+    if found != reference_components(dependencies):
+        raise SystemExit("Components differ from the reference implementation")
+
+    layer_of = {name: number for number, layer in enumerate(layers) for name in layer}
+    component_of = {name: component for component in found for name in component}
+    for name, deps in dependencies.items():
+        for dep in deps:
+            if component_of[name] is not component_of[dep] and layer_of[name] <= layer_of[dep]:
+                raise SystemExit(f"{name} is not layered above its dependency {dep}")
+
+    dependents = {name: set() for name in dependencies}
+    for name, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].add(name)
+    services = random.Random(1).sample(graph.names, min(args.queries, len(graph)))
+    for direction, adjacency in (("downstream", dependents), ("upstream", dependencies)):
+        elapsed = 0.0
+        reached = 0
+        for service in services:
+            query_time, impacted = timed(graph.impact, service, direction)
+            elapsed += query_time
+            reached += len(impacted)
+            if impacted != reference_impact(adjacency, service):
+                raise SystemExit(f"{direction} impact of {service} differs from the reference")
+        print(f"  {direction:<10} {elapsed / len(services) * 1000:6.2f} ms/query   "
+              f"{reached / len(services):.0f} services reached on average")
+
+
+if __name__ == "__main__":
+    main()
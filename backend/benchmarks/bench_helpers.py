@@ -0,0 +1,91 @@
+"""Micro-benchmarks for the YamlParser string helpers.
+
+Each helper is timed against the inline-regex version it replaced.
+Usage: python benchmarks/bench_helpers.py [--number N]
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service_index import name_words, normalize_service_name
+from yaml_parser import YamlParser
+
+SERVICE_PATHS = [
+    "/repo/deployment/config/order/order-service-dev.yml",
+    "/repo/deployment/config/air_defence_grid/application.yml",
+    "/repo/deployment/config/payment/payment-runtime-config.yaml",
+    "/repo/deployment/config/inventory/inventory.yml",
+]
+TOPIC_PARTS = ["c2ResourceManagement", "orderService", "XMLHttpRequest", "air-defence-grid", "payment"]
+TOPICS = [f"company.{part}.entity{i}.event" for i, part in enumerate(TOPIC_PARTS)]
+PLACEHOLDER_CONTENT = "\n".join(
+    f"  listener{i}: ${{topics.domain{i}.warehouse.stock.event}} plain-{i}" for i in range(200))
+DOC_LINES = ["  /order/ordered:", "    post:", "      tags:", "        - DomainEvent:",
+             "      description: |+", "        **topic:** `ecommerce.order.event`"] * 50
+
+
+def legacy_derive_service_name(filepath):
+    base_name = os.path.splitext(os.path.basename(filepath))[0]
+    base_name = re.sub(r"-(dev|runtime-config|persistence)$", "", base_name, flags=re.IGNORECASE)
+    base_name = re.sub(r"-service$", "", base_name, flags=re.IGNORECASE)
+    if base_name.lower() in {"application", "config", "settings", "dockerfile", "topics"} or not base_name:
+        base_name = os.path.basename(os.path.dirname(filepath))
+    return base_name.replace("_", "-")
+
+
+def legacy_normalize_topic_name(name):
+    name = re.sub(r'([a-z0-9])([A-Z])', r'\1-\2', name)
+    name = re.sub(r'([A-Z])([A-Z][a-z])', r'\1-\2', name)
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+def legacy_placeholders(content):
+    return [m.group(1) for m in re.finditer(r"(\$\{topics\.[\w.-]+(?:\.[\w.-]+)*\.event\})", content)]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--number", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    parser = YamlParser(".")
+    cases = [
+        ("_derive_service_name",
+         lambda: [legacy_derive_service_name(p) for p in SERVICE_PATHS],
+         lambda: [parser._derive_service_name(p) for p in SERVICE_PATHS]),
+        ("normalize_topic_name",
+         lambda: [legacy_normalize_topic_name(p) for p in TOPIC_PARTS],
+         lambda: [parser.normalize_topic_name(p) for p in TOPIC_PARTS]),
+        ("topic_match_key",
+         lambda: [legacy_normalize_topic_name(parser.extract_microservice_name_from_topic(t)) for t in TOPICS],
+         lambda: [parser.topic_match_key(t) for t in TOPICS]),
+        ("placeholder scan",
+         lambda: legacy_placeholders(PLACEHOLDER_CONTENT),
+         lambda: [m.group(1) for m in parser.PLACEHOLDER_PATTERN.finditer(PLACEHOLDER_CONTENT)]),
+        ("doc path line match",
+         lambda: [re.match(r'^\s*/[^:]*:\s*$', line) is not None for line in DOC_LINES],
+         lambda: [parser.DOC_PATH_PATTERN.match(line) is not None for line in DOC_LINES]),
+        ("normalize_service_name",
+         lambda: [re.sub(r'[^a-z0-9]', '', p.lower()) for p in TOPIC_PARTS],
+         lambda: [normalize_service_name(p) for p in TOPIC_PARTS]),
+        ("name_words",
+         lambda: [re.findall(r'[a-z]+', p.lower()) for p in TOPIC_PARTS],
+         lambda: [name_words(p) for p in TOPIC_PARTS]),
+    ]
+
+    print(f"{'helper':<24} {'inline regex':>14} {'current':>10} {'speedup':>8}  (us per call, {args.number} calls)")
+    for name, legacy, current in cases:
+        if legacy() != current():
+            raise SystemExit(f"{name}: current helper disagrees with the inline-regex version")
+        legacy_time = min(timeit.repeat(legacy, number=args.number, repeat=3)) / args.number
+        current_time = min(timeit.repeat(current, number=args.number, repeat=3)) / args.number
+        print(f"{name:<24} {legacy_time * 1e6:>14.2f} {current_time * 1e6:>10.2f} "
+              f"{legacy_time / current_time:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Peak memory and time of the text and mmap scanning modes on large files.
+
+Writes one large OpenAPI doc and one large config with repo_generator, then
+parses each with YamlParser(use_mmap=False) and YamlParser(use_mmap=True).
+Peak memory is the tracemalloc peak of the parse call: the Python heap the
+parse allocates. Mapped file pages are page cache and are not counted.
+Usage: python benchmarks/bench_mmap_scan.py [--doc-topics N] [--doc-properties N] [--subscriptions N]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from repo_generator import RepoSpec, config_content, doc_content
+from yaml_parser import YamlParser
+
+
+def measure(parse, filepath):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = parse(filepath)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--doc-topics", type=int, default=5000)
+    arg_parser.add_argument("--doc-properties", type=int, default=40)
+    arg_parser.add_argument("--subscriptions", type=int, default=20000)
+    args = arg_parser.parse_args()
+
+    spec = RepoSpec(services=args.subscriptions, topics_per_service=args.doc_topics,
+                    subscriptions_per_service=args.subscriptions, doc_properties=args.doc_properties)
+    with tempfile.TemporaryDirectory(prefix="yaml-parser-mmap-") as tmp:
+        doc_path = os.path.join(tmp, "large-doc.yml")
+        config_path = os.path.join(tmp, "large-config.yml")
+        with open(doc_path, "w", encoding="utf-8") as f:
+            f.write(doc_content(0, spec))
+        with open(config_path, "w", encoding="utf-8") as f:
+            f.write(config_content(0, spec, random.Random(0)))
+
+        for label, filepath, method_name in (
+            ("doc", doc_path, "_extract_doc_topics"),
+            ("config", config_path, "_parse_subscription_config"),
+        ):
+            size_mib = os.path.getsize(filepath) / (1024 * 1024)
+            print(f"{label}: {size_mib:.1f} MiB")
+            results = {}
+            for mode, use_mmap in (("text", False), ("mmap", True)):
+                parse = getattr(YamlParser("", use_mmap=use_mmap), method_name)
+                result, elapsed, peak = measure(parse, filepath)
+                results[mode] = result
+                print(f"  {mode:<5} {elapsed * 1000:9.1f} ms   peak {peak / (1024 * 1024):8.2f} MiB")
+            assert results["text"] == results["mmap"], f"{label}: modes disagree"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""End-to-end scan benchmark over a synthetic repo, with JSON output for regression tracking.
+
+Generates a repo with repo_generator (or uses --repo), then times each parse
+stage on a fresh YamlParser and the full /parse request through the Flask
+test client, with the result cache cleared before each request; repeat
+requests answered from the result cache are timed separately. Every stage
+is run --repeat times; min/median/max are reported.
+With --async-io N the async read pipeline is timed as well.
+Usage: python benchmarks/bench_scan.py [--services N] [--repeat N] [--workers N] [--async-io N] [--output FILE]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from repo_generator import add_spec_arguments, generate_repo, spec_from_args
+from yaml_parser import YamlParser
+
+
+def summarize(runs):
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "max": max(runs),
+        "runs": runs,
+    }
+
+
+def time_parser_stages(repo, workers, repeat):
+    stages = {"process_subscription_configs": [], "process_producer_docs": [], "build_dependency_graph": []}
+    counts = {}
+    for _ in range(repeat):
+        parser = YamlParser(repo, workers=workers)
+
+        start = time.perf_counter()
+        parser.process_subscription_configs(workers)
+        stages["process_subscription_configs"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        parser.process_producer_docs(workers)
+        stages["process_producer_docs"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        parser.build_dependency_graph()
+        stages["build_dependency_graph"].append(time.perf_counter() - start)
+
+        counts = {
+            "microservices": len(parser.microservice_topics_map),
+            "dependencies": parser.get_total_dependency_count(),
+        }
+    return {name: summarize(runs) for name, runs in stages.items()}, counts
+
+
+def time_async_scan(repo, concurrency, repeat):
+    runs = []
+    for _ in range(repeat):
+        parser = YamlParser(repo)
+        start = time.perf_counter()
+        asyncio.run(parser.process_all_microservices_async(concurrency))
+        runs.append(time.perf_counter() - start)
+    return summarize(runs)
+
+
+def time_parse_request(repo, repeat):
+    """Full POST /parse round trips as (scans, result cache hits), or None when Flask is not installed"""
+    try:
+        import app as app_module
+    except ImportError as e:
+        print(f"Skipping /parse timing: {e}", file=sys.stderr)
+        return None
+
+    client = app_module.app.test_client()
+    result_cache = app_module.result_cache
+    scans, hits = [], []
+    for _ in range(repeat):
+        if result_cache is not None:
+            result_cache.clear()
+        scans.append(post_parse(client, repo, "miss"))
+    if result_cache is not None:
+        for _ in range(repeat):
+            hits.append(post_parse(client, repo, "hit"))
+    return summarize(scans), summarize(hits) if hits else None
+
+
+def post_parse(client, repo, expected_cache_status):
+    start = time.perf_counter()
+    response = client.post("/parse", json={"directory_path": repo})
+    elapsed = time.perf_counter() - start
+    if response.status_code != 200:
+        raise RuntimeError(f"/parse returned {response.status_code}: {response.get_data(as_text=True)}")
+    if response.headers.get("X-Result-Cache") != expected_cache_status:
+        raise RuntimeError(f"/parse result cache {response.headers.get('X-Result-Cache')}, "
+                           f"expected {expected_cache_status}")
+    return elapsed
+
+
+def run(args, repo):
+    results, counts = time_parser_stages(repo, args.workers, args.repeat)
+    if args.async_io:
+        results["process_all_microservices_async"] = time_async_scan(repo, args.async_io, args.repeat)
+    parse_request = time_parse_request(repo, args.repeat)
+    if parse_request is not None:
+        results["parse_request"], cached = parse_request
+        if cached is not None:
+            results["parse_request_cached"] = cached
+    return results, counts
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_spec_arguments(arg_parser)
+    arg_parser.add_argument("--repo", help="benchmark an existing repo instead of generating one")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--workers", type=int, default=1)
+    arg_parser.add_argument("--async-io", type=int, default=0, metavar="CONCURRENCY",
+                            help="also time process_all_microservices_async with this read concurrency")
+    arg_parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = arg_parser.parse_args()
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "workers": args.workers,
+        "repeat": args.repeat,
+    }
+    if args.repo:
+        repo = os.path.abspath(args.repo)
+        report["repo"] = {"path": repo}
+        report["results"], report["counts"] = run(args, repo)
+    else:
+        spec = spec_from_args(args)
+        with tempfile.TemporaryDirectory(prefix="yaml-parser-bench-") as repo:
+            file_count, total_bytes = generate_repo(repo, spec)
+            report["repo"] = {"spec": spec.to_dict(), "files": file_count, "bytes": total_bytes}
+            report["results"], report["counts"] = run(args, repo)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        for stage, summary in report["results"].items():
+            print(f"{stage:<34} median {summary['median'] * 1000:9.2f} ms")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
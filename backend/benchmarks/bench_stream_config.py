@@ -0,0 +1,58 @@
+"""Peak memory and time of whole-file and streamed parsing of a multi-document config.
+
+Concatenates --documents repo_generator configs with '---' separators into
+one file, as generated Helm/Spring bundles are, then parses it with
+YamlParser(stream_min_bytes=<never>) and YamlParser(stream_min_bytes=0).
+Peak memory is the tracemalloc peak of the parse call.
+Usage: python benchmarks/bench_stream_config.py [--documents N] [--subscriptions N]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from repo_generator import RepoSpec, config_content
+from yaml_parser import YamlParser
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--documents", type=int, default=2000)
+    arg_parser.add_argument("--subscriptions", type=int, default=100, help="consumer topics per document")
+    args = arg_parser.parse_args()
+
+    spec = RepoSpec(services=args.documents, subscriptions_per_service=args.subscriptions)
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory(prefix="yaml-parser-stream-") as tmp:
+        filepath = os.path.join(tmp, "bundle-service.yml")
+        largest = 0
+        with open(filepath, "w", encoding="utf-8") as f:
+            for index in range(args.documents):
+                document = config_content(index, spec, rng)
+                largest = max(largest, len(document))
+                f.write("---\n")
+                f.write(document)
+        print(f"{os.path.getsize(filepath) / (1024 * 1024):.1f} MiB, {args.documents} documents, "
+              f"largest {largest / 1024:.1f} KiB")
+
+        results = {}
+        for mode, stream_min_bytes in (("whole", float("inf")), ("stream", 0)):
+            parser = YamlParser("", stream_min_bytes=stream_min_bytes)
+            tracemalloc.start()
+            start = time.perf_counter()
+            results[mode] = parser._parse_subscription_config(filepath)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"  {mode:<6} {elapsed * 1000:9.1f} ms   peak {peak / (1024 * 1024):8.2f} MiB")
+        assert results["whole"] == results["stream"], "modes disagree"
+
+
+if __name__ == "__main__":
+    main()
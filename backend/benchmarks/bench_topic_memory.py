@@ -0,0 +1,79 @@
+"""Memory of the topic map: plain sets of strings vs. interned, array-backed TopicSets.
+
+Usage: python benchmarks/bench_topic_memory.py [--services N] [--vocabulary N]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from topic_store import MicroserviceTopics, TopicTable
+
+
+class PlainMicroserviceTopics:
+    """The original representation: a regular object holding two sets"""
+
+    def __init__(self):
+        self.produces = set()
+        self.subscribes = set()
+
+
+def compact_topics(table):
+    return MicroserviceTopics(table)
+
+
+def build_map(make_topics, service_count, vocabulary, produces, subscribes, seed=0):
+    """Topic strings are rebuilt for every occurrence, as they are when each file is parsed"""
+    rng = random.Random(seed)
+    topic_map = {}
+    for i in range(service_count):
+        topics = make_topics()
+        for _ in range(produces):
+            topics.produces.add(f"company.domain{rng.randrange(vocabulary)}.entity.event")
+        for _ in range(subscribes):
+            topics.subscribes.add(f"company.domain{rng.randrange(vocabulary)}.entity.event")
+        topic_map[f"service-{i}"] = topics
+    return topic_map
+
+
+def measure(make_topics, args):
+    gc.collect()
+    tracemalloc.start()
+    topic_map = build_map(make_topics, args.services, args.vocabulary, args.produces, args.subscribes)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return topic_map, current, peak
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--services", type=int, default=20000)
+    arg_parser.add_argument("--vocabulary", type=int, default=50000)
+    arg_parser.add_argument("--produces", type=int, default=5)
+    arg_parser.add_argument("--subscribes", type=int, default=15)
+    args = arg_parser.parse_args()
+
+    plain_map, plain_current, plain_peak = measure(PlainMicroserviceTopics, args)
+    table = TopicTable()
+    compact_map, compact_current, compact_peak = measure(lambda: compact_topics(table), args)
+
+    for name in plain_map:
+        if set(plain_map[name].produces) != set(compact_map[name].produces) \
+                or set(plain_map[name].subscribes) != set(compact_map[name].subscribes):
+            raise SystemExit(f"Compact store differs for {name}")
+
+    mib = 1024 * 1024
+    print(f"{args.services} services, {len(table)} distinct topics")
+    print(f"  plain sets : {plain_current / mib:7.1f} MiB retained, {plain_peak / mib:7.1f} MiB peak")
+    print(f"  compact    : {compact_current / mib:7.1f} MiB retained, {compact_peak / mib:7.1f} MiB peak "
+          f"(includes the intern table)")
+    print(f"  ratio      : {plain_current / compact_current:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
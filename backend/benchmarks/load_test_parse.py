@@ -0,0 +1,118 @@
+"""Load-test /parse on a running server: requests per second and latency percentiles.
+
+Start the server first, e.g. the production setup:
+    WARMUP_DIRECTORIES=<repo> gunicorn -c gunicorn.conf.py wsgi:application
+then point this script at it. The fixture repo is generated with
+repo_generator unless --repo is given; it must be readable by the server.
+With --if-none-match the ETag of the first response is sent back, measuring
+the 304 path instead of full response bodies.
+Usage: python benchmarks/load_test_parse.py [--url URL] [--repo DIR] [--concurrency N] [--requests N] [--output FILE]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from repo_generator import add_spec_arguments, generate_repo, spec_from_args
+
+
+def post_parse(url, directory_path, etag=None):
+    """One /parse request: (status, seconds, etag, X-Result-Cache)"""
+    request = urllib.request.Request(
+        url.rstrip("/") + "/parse",
+        data=json.dumps({"directory_path": directory_path}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    if etag:
+        request.add_header("If-None-Match", etag)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status, headers = response.status, response.headers
+    except urllib.error.HTTPError as e:
+        e.read()
+        status, headers = e.code, e.headers
+    return status, time.perf_counter() - start, headers.get("ETag"), headers.get("X-Result-Cache")
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_load(url, directory_path, concurrency, total, etag=None):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: post_parse(url, directory_path, etag), range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(seconds for _, seconds, _, _ in results)
+    statuses = {}
+    for status, _, _, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "requests_per_second": total / elapsed,
+        "latency_ms": {
+            "mean": statistics.mean(latencies) * 1000,
+            "p50": percentile(latencies, 0.50) * 1000,
+            "p95": percentile(latencies, 0.95) * 1000,
+            "p99": percentile(latencies, 0.99) * 1000,
+            "max": latencies[-1] * 1000,
+        },
+        "statuses": statuses,
+        "result_cache_hits": sum(1 for _, _, _, cache in results if cache == "hit"),
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--url", default="http://localhost:5000")
+    arg_parser.add_argument("--repo", help="existing repo to request instead of a generated one")
+    arg_parser.add_argument("--concurrency", type=int, default=16)
+    arg_parser.add_argument("--requests", type=int, default=1000)
+    arg_parser.add_argument("--warmup-requests", type=int, default=20)
+    arg_parser.add_argument("--if-none-match", action="store_true", help="revalidate with the first response's ETag")
+    arg_parser.add_argument("--output", help="also write the results as JSON to this file")
+    add_spec_arguments(arg_parser)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="yaml-parser-load-") as tmp:
+        repo = args.repo
+        if repo is None:
+            repo = os.path.join(tmp, "repo")
+            files, size = generate_repo(repo, spec_from_args(args))
+            print(f"Generated {files} files ({size / (1024 * 1024):.1f} MiB) in {repo}")
+        repo = os.path.abspath(repo)
+
+        status, seconds, etag, _ = post_parse(args.url, repo)
+        if status != 200:
+            raise SystemExit(f"/parse answered {status}")
+        print(f"First request: {seconds * 1000:.1f} ms")
+        run_load(args.url, repo, args.concurrency, args.warmup_requests)
+        result = run_load(args.url, repo, args.concurrency, args.requests, etag if args.if_none_match else None)
+
+    latency = result["latency_ms"]
+    print(f"{result['requests']} requests, concurrency {result['concurrency']}: "
+          f"{result['requests_per_second']:.1f} req/s")
+    print(f"  latency ms  mean {latency['mean']:.1f}  p50 {latency['p50']:.1f}  "
+          f"p95 {latency['p95']:.1f}  p99 {latency['p99']:.1f}  max {latency['max']:.1f}")
+    print(f"  statuses {result['statuses']}  result cache hits {result['result_cache_hits']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"url": args.url, "repo": repo, **result}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Generate a synthetic microservice repo with deployment/config and doc trees.
+
+Usage: python benchmarks/repo_generator.py OUTPUT_DIR [--services N] [--topics-per-service N] ...
+"""
+import argparse
+import os
+import random
+from dataclasses import asdict, dataclass
+
+
+@dataclass
+class RepoSpec:
+    services: int = 100
+    topics_per_service: int = 5
+    subscriptions_per_service: int = 8
+    # Nesting levels under each service's key in the topics: section
+    depth: int = 3
+    # Fraction of consumed topics written as ${topics...event} placeholders
+    placeholder_ratio: float = 0.5
+    # Schema properties per documented path; controls OpenAPI doc size
+    doc_properties: int = 10
+    seed: int = 0
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def service_name(index):
+    return f"synthetic-service-{index}"
+
+
+def produced_topic(service_index, topic_index):
+    return f"company.synthetic-service-{service_index}.entity{topic_index}.event"
+
+
+def topic_var_path(service_index, topic_index, depth):
+    """Dotted key path (below topics.) under which a consumer defines a topic"""
+    return [f"svc{service_index}"] + [f"level{d}" for d in range(depth - 1)] + [f"entity{topic_index}"]
+
+
+def _append_tree(lines, node, level):
+    for key, value in node.items():
+        if isinstance(value, dict):
+            lines.append("  " * level + f"{key}:")
+            _append_tree(lines, value, level + 1)
+        else:
+            lines.append("  " * level + f"{key}: {value}")
+
+
+def config_content(index, spec, rng):
+    lines = [
+        "spring:",
+        "  application:",
+        f"    name: {service_name(index)}",
+        "  kafka:",
+        "    bootstrap-servers: localhost:9092",
+        "",
+    ]
+    subscriptions = []
+    for _ in range(spec.subscriptions_per_service):
+        subscription = (rng.randrange(spec.services), rng.randrange(spec.topics_per_service))
+        if subscription[0] != index and subscription not in subscriptions:
+            subscriptions.append(subscription)
+
+    placeholders = {s for s in subscriptions if rng.random() < spec.placeholder_ratio}
+    if placeholders:
+        # One nested definition per subscribed topic; shared prefixes are merged
+        tree = {}
+        for other, topic_index in sorted(placeholders):
+            node = tree
+            for key in topic_var_path(other, topic_index, spec.depth):
+                node = node.setdefault(key, {})
+            node["event"] = produced_topic(other, topic_index)
+        lines.append("topics:")
+        _append_tree(lines, tree, 1)
+        lines.append("")
+
+    lines.append("consumers:")
+    lines.append("  mainConsumer:")
+    lines.append("    topics:")
+    for other, topic_index in subscriptions:
+        if (other, topic_index) in placeholders:
+            path = ".".join(topic_var_path(other, topic_index, spec.depth))
+            lines.append(f"      - ${{topics.{path}.event}}")
+        else:
+            lines.append(f"      - {produced_topic(other, topic_index)}")
+    lines.append("    group-id: synthetic")
+    return "\n".join(lines) + "\n"
+
+
+def doc_content(index, spec):
+    lines = [
+        "openapi: 3.0.0",
+        "info:",
+        f"  title: Synthetic Service {index} API",
+        "  version: 1.0.0",
+        "paths:",
+    ]
+    for topic_index in range(spec.topics_per_service):
+        lines.extend([
+            f"  /{service_name(index)}/entity{topic_index}:",
+            "    post:",
+            "      tags:",
+            "        - DomainEvent:",
+            f"            name: Entity {topic_index} Events",
+            "      summary: Entity event",
+            "      description: |+",
+            f"        **topic:** `{produced_topic(index, topic_index)}`",
+            "        Published when the entity changes.",
+            "      requestBody:",
+            "        content:",
+            "          application/json:",
+            "            schema:",
+            "              type: object",
+            "              properties:",
+        ])
+        for p in range(spec.doc_properties):
+            lines.extend([f"                field{p}:", "                  type: string"])
+        lines.extend(["      responses:", "        '202':", "          description: Event acknowledged"])
+    return "\n".join(lines) + "\n"
+
+
+def generate_repo(root, spec):
+    """Write the repo under root; returns (file_count, total_bytes)"""
+    rng = random.Random(spec.seed)
+    file_count = 0
+    total_bytes = 0
+    for index in range(spec.services):
+        name = service_name(index)
+        config_dir = os.path.join(root, "deployment", "config", name)
+        doc_dir = os.path.join(root, "doc")
+        os.makedirs(config_dir, exist_ok=True)
+        os.makedirs(doc_dir, exist_ok=True)
+        for path, content in (
+            (os.path.join(config_dir, f"{name}.yml"), config_content(index, spec, rng)),
+            (os.path.join(doc_dir, f"{name}.yml"), doc_content(index, spec)),
+        ):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+            file_count += 1
+            total_bytes += len(content.encode("utf-8"))
+    return file_count, total_bytes
+
+
+def add_spec_arguments(arg_parser):
+    defaults = RepoSpec()
+    arg_parser.add_argument("--services", type=int, default=defaults.services)
+    arg_parser.add_argument("--topics-per-service", type=int, default=defaults.topics_per_service)
+    arg_parser.add_argument("--subscriptions-per-service", type=int, default=defaults.subscriptions_per_service)
+    arg_parser.add_argument("--depth", type=int, default=defaults.depth)
+    arg_parser.add_argument("--placeholder-ratio", type=float, default=defaults.placeholder_ratio)
+    arg_parser.add_argument("--doc-properties", type=int, default=defaults.doc_properties)
+    arg_parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def spec_from_args(args):
+    return RepoSpec(
+        services=args.services,
+        topics_per_service=args.topics_per_service,
+        subscriptions_per_service=args.subscriptions_per_service,
+        depth=args.depth,
+        placeholder_ratio=args.placeholder_ratio,
+        doc_properties=args.doc_properties,
+        seed=args.seed,
+    )
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("output_dir")
+    add_spec_arguments(arg_parser)
+    args = arg_parser.parse_args()
+    file_count, total_bytes = generate_repo(args.output_dir, spec_from_args(args))
+    print(f"Wrote {file_count} files ({total_bytes / 1024:.0f} KiB) to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
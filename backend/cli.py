@@ -0,0 +1,95 @@
+"""Scan a repo from the command line, without starting the Flask app.
+
+    python cli.py REPO [--workers N] [--cache-dir DIR] [--format json|ndjson|mermaid|dot]
+                       [-o FILE] [--profile]
+
+json is the /parse response body and ndjson the /parse/stream records;
+mermaid and dot draw the dependency graph. --profile prints per-stage
+timings and counters to stderr. Exit status: 0 on success, 1 when the
+scan or the write fails, 2 on bad arguments (including a missing REPO).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import nullcontext
+
+from discovery import Discovery
+from metrics import ParseMetrics
+from mermaid import generate_dot_graph, generate_mermaid_graph
+from parse_cache import ParseCache
+from scan_records import iter_scan_records, scan_result
+from yaml_parser import YamlParser
+
+FORMATS = ("json", "ndjson", "mermaid", "dot")
+
+
+def render(microservice_parser, output_format, directory_path):
+    """Yield the output of a processed parser in output_format, chunk by chunk"""
+    if output_format == "ndjson":
+        yield json.dumps({"record": "scan", "directory_path": directory_path}) + "\n"
+        for record in iter_scan_records(microservice_parser):
+            yield json.dumps(record) + "\n"
+        return
+    result = scan_result(microservice_parser)
+    if output_format == "json":
+        yield json.dumps(result) + "\n"
+    elif output_format == "mermaid":
+        yield generate_mermaid_graph(result["dependencies"], result["microservices"]) + "\n"
+    else:
+        yield generate_dot_graph(result["dependencies"], result["microservices"]) + "\n"
+
+
+def print_profile(metrics, file=sys.stderr):
+    """Per-stage wall times and counters as an aligned table"""
+    print(f"{'stage':<24} {'ms':>10} {'runs':>6}", file=file)
+    for name, seconds in metrics.stage_seconds.items():
+        print(f"{name:<24} {seconds * 1000:>10.1f} {metrics.stage_runs[name]:>6}", file=file)
+    for name, amount in metrics.counters.items():
+        print(f"{name:<24} {amount:>10}", file=file)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("repo", help="repo root holding deployment/config and doc")
+    arg_parser.add_argument("--workers", type=int, default=1, help="worker processes (0 = one per CPU)")
+    arg_parser.add_argument("--cache-dir", help="directory of the parse cache and discovery inventories")
+    arg_parser.add_argument("--format", choices=FORMATS, default="json")
+    arg_parser.add_argument("-o", "--output", help="file to write (default: stdout)")
+    arg_parser.add_argument("--profile", action="store_true", help="print per-stage timings to stderr")
+    args = arg_parser.parse_args(argv)
+    if args.workers < 0:
+        arg_parser.error("--workers must be 0 or more")
+
+    directory_path = os.path.abspath(args.repo)
+    if not os.path.isdir(directory_path):
+        arg_parser.error(f"Directory not found: {directory_path}")
+
+    metrics = ParseMetrics() if args.profile else None
+    cache = ParseCache(args.cache_dir) if args.cache_dir else None
+    discovery = Discovery(inventory_dir=os.path.join(args.cache_dir, "inventory") if args.cache_dir else None)
+    started = time.perf_counter()
+    try:
+        microservice_parser = YamlParser(directory_path, workers=args.workers, cache=cache, metrics=metrics,
+                                         discovery=discovery)
+        microservice_parser.process_all_microservices()
+        with microservice_parser.metrics.stage("output"):
+            with open(args.output, "w", encoding="utf-8") if args.output else nullcontext(sys.stdout) as out:
+                for chunk in render(microservice_parser, args.format, directory_path):
+                    out.write(chunk)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if cache is not None:
+            cache.close()
+
+    if metrics is not None:
+        metrics.add_stage_time("total", time.perf_counter() - started)
+        print_profile(metrics)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,369 @@
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+YAML_SUFFIXES = (".yaml", ".yml")
+
+# Directory and file names skipped unless a Discovery is given its own list
+DEFAULT_IGNORE_GLOBS = (".git", ".hg", ".svn", "node_modules", "target", "__pycache__", ".venv")
+
+# Bump when the persisted inventory layout changes
+INVENTORY_FORMAT_VERSION = 1
+
+
+def _glob_regex(pattern):
+    """Regex source for a gitignore glob: * and ? stop at '/', ** crosses directories"""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        char = pattern[i]
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                parts.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif char == "\\" and i + 1 < len(pattern):
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return "".join(parts)
+
+
+def parse_gitignore(text):
+    """Rules of a .gitignore file as (regex, negate, dir_only), in file order.
+
+    Regexes match paths relative to the .gitignore's directory with '/'
+    separators. Supported: comments, '!' negation, trailing '/' for
+    directories, leading or inner '/' anchoring, *, ?, [...] and **.
+    """
+    rules = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate or line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        source = _glob_regex(line.lstrip("/"))
+        if "/" not in line:
+            # Unanchored: matches at any depth
+            source = "(?:.*/)?" + source
+        rules.append((re.compile(source + r"\Z", re.DOTALL), negate, dir_only))
+    return rules
+
+
+def _stat_key(path):
+    """(size, mtime_ns) of path, or None when it does not exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class Inventory:
+    """Snapshot of the YAML files under one directory, in os.walk order.
+
+    files maps each path to its (size, mtime_ns). dirs maps every visited
+    directory to (mtime_ns, .gitignore (size, mtime_ns) or None, kept YAML
+    file names, kept subdirectory names): a directory whose mtime and
+    .gitignore are unchanged has the same entries, so a refresh reuses its
+    listing and only stats. gitignores holds the stats of the .gitignore
+    files above directory that were applied.
+    """
+
+    __slots__ = ("directory", "settings", "gitignores", "dirs", "files")
+
+    def __init__(self, directory, settings, gitignores, dirs, files):
+        self.directory = directory
+        self.settings = settings
+        self.gitignores = gitignores
+        self.dirs = dirs
+        self.files = files
+
+    def diff(self, previous):
+        """(added, removed, modified) paths relative to an older Inventory (or None)"""
+        old_files = previous.files if previous is not None else {}
+        added = {path for path in self.files if path not in old_files}
+        removed = {path for path in old_files if path not in self.files}
+        modified = {path for path, stat in self.files.items()
+                    if path in old_files and old_files[path] != stat}
+        return added, removed, modified
+
+    def to_dict(self):
+        return {
+            "version": INVENTORY_FORMAT_VERSION,
+            "directory": self.directory,
+            "settings": self.settings,
+            "gitignores": [[path, stat] for path, stat in self.gitignores],
+            "dirs": {path: [mtime_ns, gitignore, filenames, subdirs]
+                     for path, (mtime_ns, gitignore, filenames, subdirs) in self.dirs.items()},
+            "files": self.files,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inventory from to_dict() output, or None if it is from another format version"""
+        if data.get("version") != INVENTORY_FORMAT_VERSION:
+            return None
+        return cls(
+            data["directory"],
+            data["settings"],
+            [(path, tuple(stat) if stat else None) for path, stat in data["gitignores"]],
+            {path: (mtime_ns, tuple(gitignore) if gitignore else None, filenames, subdirs)
+             for path, (mtime_ns, gitignore, filenames, subdirs) in data["dirs"].items()},
+            {path: tuple(stat) for path, stat in data["files"].items()},
+        )
+
+
+class Discovery:
+    """Finds the YAML files below a directory with os.scandir, pruning ignored trees.
+
+    ignore_globs are fnmatch patterns matched against file and directory
+    names. With use_gitignore the .gitignore files from the root given to a
+    call down to each directory are applied as git does. Symlinked
+    directories are only entered with follow_symlinks.
+
+    The last Inventory of each directory is kept, in memory and, with
+    inventory_dir, as a JSON file, so a repeat scan stats directories and
+    files instead of listing every directory again. In memory at most
+    max_inventories inventories and max_inventories *
+    MAX_GITIGNORES_PER_INVENTORY parsed .gitignore files are kept, least
+    recently used dropped first, so a long-running server stays bounded
+    however many directories it scans.
+    """
+
+    DEFAULT_MAX_INVENTORIES = 128
+    MAX_GITIGNORES_PER_INVENTORY = 64
+
+    def __init__(self, ignore_globs=DEFAULT_IGNORE_GLOBS, use_gitignore=True, follow_symlinks=False,
+                 inventory_dir=None, max_inventories=DEFAULT_MAX_INVENTORIES):
+        self.ignore_globs = tuple(ignore_globs)
+        self.use_gitignore = use_gitignore
+        self.follow_symlinks = follow_symlinks
+        self.inventory_dir = inventory_dir
+        self._glob_pattern = (re.compile("|".join(fnmatch.translate(glob) for glob in self.ignore_globs))
+                              if self.ignore_globs else None)
+        self.max_inventories = max_inventories
+        # Least recently used first
+        self._gitignore_rules = OrderedDict()
+        self._inventories = OrderedDict()
+        self._lock = threading.Lock()
+        if inventory_dir:
+            os.makedirs(inventory_dir, exist_ok=True)
+
+    @property
+    def settings(self):
+        return [list(self.ignore_globs), self.use_gitignore, self.follow_symlinks]
+
+    def yaml_files(self, directory, root=None):
+        """YAML files under directory in os.walk order; root bounds the .gitignore lookup"""
+        return list(self.inventory(directory, root).files)
+
+    def inventory(self, directory, root=None):
+        """Current Inventory of directory, refreshed from the previous one if there is one"""
+        return self.refresh(directory, root)[0]
+
+    def refresh(self, directory, root=None):
+        """(inventory, added, removed, modified) of directory since its previous inventory"""
+        previous = self._previous_inventory(directory)
+        current = self.scan(directory, root, previous)
+        changes = current.diff(previous)
+        with self._lock:
+            self._remember(self._inventories, os.path.abspath(directory), current, self.max_inventories)
+        if self.inventory_dir and (previous is None or any(changes) or current.dirs != previous.dirs):
+            self._save(current)
+        return (current, *changes)
+
+    def scan(self, directory, root=None, previous=None):
+        """Inventory of directory, reusing the listings of unchanged directories in previous.
+
+        Paths are spelled like directory, as os.walk would spell them.
+        """
+        frames, gitignores = self._ancestor_frames(directory, root)
+        if previous is not None and (previous.settings != self.settings or previous.gitignores != gitignores):
+            previous = None
+        dirs, files = {}, {}
+        self._visit(directory, frames, previous, dirs, files, previous is None, set())
+        return Inventory(directory, self.settings, gitignores, dirs, files)
+
+    def is_ignored(self, path, root, is_dir=False):
+        """Whether path would be skipped by a scan of its parent rooted at root"""
+        frames, _ = self._ancestor_frames(path, root)
+        return self._is_ignored(os.path.basename(path), path, is_dir, frames)
+
+    def _previous_inventory(self, directory):
+        with self._lock:
+            previous = self._inventories.get(os.path.abspath(directory))
+            if previous is not None:
+                self._inventories.move_to_end(os.path.abspath(directory))
+        if previous is not None and previous.directory != directory:
+            previous = None
+        if previous is None and self.inventory_dir:
+            try:
+                with open(self._inventory_path(directory), encoding="utf-8") as f:
+                    previous = Inventory.from_dict(json.load(f))
+            except (OSError, ValueError, KeyError, TypeError):
+                previous = None
+        return previous
+
+    def _inventory_path(self, directory):
+        key_source = repr((os.path.abspath(directory), directory, self.settings))
+        key = hashlib.blake2b(key_source.encode("utf-8", "surrogateescape"), digest_size=16).hexdigest()
+        return os.path.join(self.inventory_dir, f"inventory-{key}.json")
+
+    def _save(self, inventory):
+        path = self._inventory_path(inventory.directory)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8", errors="surrogateescape") as f:
+                json.dump(inventory.to_dict(), f, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error saving inventory {path}: {e}")
+
+    def _rules(self, gitignore_path, stat):
+        """Parsed rules of a .gitignore, re-read only when its stat changes"""
+        with self._lock:
+            cached = self._gitignore_rules.get(gitignore_path)
+            if cached is not None and cached[0] == stat:
+                self._gitignore_rules.move_to_end(gitignore_path)
+                return cached[1]
+        try:
+            with open(gitignore_path, encoding="utf-8", errors="replace") as f:
+                rules = parse_gitignore(f.read())
+        except OSError:
+            rules = []
+        with self._lock:
+            self._remember(self._gitignore_rules, gitignore_path, (stat, rules),
+                           self.max_inventories * self.MAX_GITIGNORES_PER_INVENTORY)
+        return rules
+
+    @staticmethod
+    def _remember(entries, key, value, max_entries):
+        """Store value in the LRU OrderedDict entries, dropping the oldest over max_entries"""
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > max_entries:
+            entries.popitem(last=False)
+
+    def _ancestor_frames(self, path, root):
+        """Rule frames and stats of the .gitignore files in root and below it, above path"""
+        frames, gitignores = [], []
+        if not self.use_gitignore or root is None:
+            return frames, gitignores
+        relative = os.path.relpath(path, root)
+        if relative == os.curdir or relative.startswith(os.pardir):
+            return frames, gitignores
+        # Directories from root down to the parent of path, spelled like path
+        ancestors = []
+        current = os.path.dirname(path)
+        for _ in range(relative.count(os.sep) + 1):
+            ancestors.append(current)
+            current = os.path.dirname(current)
+        for ancestor in reversed(ancestors):
+            gitignore_path = os.path.join(ancestor, ".gitignore")
+            stat = _stat_key(gitignore_path)
+            if stat is not None:
+                frames.append((ancestor, self._rules(gitignore_path, stat)))
+                gitignores.append((gitignore_path, stat))
+        return frames, gitignores
+
+    def _is_ignored(self, name, path, is_dir, frames):
+        if self._glob_pattern is not None and self._glob_pattern.match(name):
+            return True
+        ignored = False
+        for base, rules in frames:
+            relative = path[len(base) + 1:]
+            if os.sep != "/":
+                relative = relative.replace(os.sep, "/")
+            for regex, negate, dir_only in rules:
+                if (is_dir or not dir_only) and regex.match(relative):
+                    # The last matching rule wins, deeper .gitignore files last
+                    ignored = not negate
+        return ignored
+
+    def _visit(self, dirpath, frames, previous, dirs, files, relist, visited):
+        try:
+            st = os.stat(dirpath)
+        except OSError:
+            return
+        if self.follow_symlinks:
+            # Symlink loops would otherwise recurse forever
+            if (st.st_dev, st.st_ino) in visited:
+                return
+            visited.add((st.st_dev, st.st_ino))
+
+        gitignore = _stat_key(os.path.join(dirpath, ".gitignore")) if self.use_gitignore else None
+        if gitignore is not None:
+            frames = frames + [(dirpath, self._rules(os.path.join(dirpath, ".gitignore"), gitignore))]
+        old = previous.dirs.get(dirpath) if previous is not None else None
+        if old is not None and old[1] != gitignore:
+            # Changed rules can change what is kept anywhere below
+            relist = True
+        if not relist and old is not None and old[0] == st.st_mtime_ns:
+            filenames, subdirs = old[2], old[3]
+        else:
+            filenames, subdirs = self._list(dirpath, frames)
+        dirs[dirpath] = (st.st_mtime_ns, gitignore, filenames, subdirs)
+
+        for filename in filenames:
+            filepath = os.path.join(dirpath, filename)
+            stat = _stat_key(filepath)
+            if stat is not None:
+                files[filepath] = stat
+        for subdir in subdirs:
+            self._visit(os.path.join(dirpath, subdir), frames, previous, dirs, files, relist, visited)
+
+    def _list(self, dirpath, frames):
+        """Kept YAML file names and subdirectory names of dirpath, in scandir order"""
+        filenames, subdirs = [], []
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir and not entry.name.endswith(YAML_SUFFIXES):
+                        continue
+                    if self._is_ignored(entry.name, entry.path, is_dir, frames):
+                        continue
+                    if not is_dir:
+                        filenames.append(entry.name)
+                    elif self.follow_symlinks or not entry.is_symlink():
+                        subdirs.append(entry.name)
+        except OSError as e:
+            print(f"Error listing {dirpath}: {e}")
+        return filenames, subdirs
+
+
+# Shared by parsers and watchers created without their own Discovery
+DEFAULT_DISCOVERY = Discovery()
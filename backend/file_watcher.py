@@ -0,0 +1,375 @@
+import ctypes
+import ctypes.util
+import itertools
+import logging
+import os
+import select
+import struct
+import threading
+import time
+
+from discovery import DEFAULT_DISCOVERY, YAML_SUFFIXES
+from yaml_parser import YamlParser
+
+logger = logging.getLogger(__name__)
+
+# Numbers WatchedParser instances; see WatchedParser.generation
+_generations = itertools.count(1)
+
+# inotify event bits (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _changed_gitignores(previous, inventory):
+    """.gitignore files applied to one of two inventories that were added, removed or changed"""
+    def gitignores(inv):
+        stats = dict(inv.gitignores)
+        for dirpath, (_, gitignore, _, _) in inv.dirs.items():
+            if gitignore is not None:
+                stats[os.path.join(dirpath, ".gitignore")] = gitignore
+        return stats
+    old, new = gitignores(previous), gitignores(inventory)
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+def walk_yaml_files(directory, discovery=None, root=None):
+    """Map every YAML file under directory that discovery keeps to its (size, mtime_ns)"""
+    return dict((discovery or DEFAULT_DISCOVERY).inventory(directory, root).files)
+
+
+class PollingWatcher:
+    """Detects YAML file changes by re-stating the tree every poll_interval seconds.
+
+    Each poll refreshes the previous discovery.Inventory: directories whose
+    mtime is unchanged are not listed again, only their files are stated.
+    Edited .gitignore files are reported along with the YAML files.
+    """
+
+    def __init__(self, directories, poll_interval=2.0, discovery=None, root=None):
+        self.directories = [d for d in directories if os.path.isdir(d)]
+        self.poll_interval = poll_interval
+        self._discovery = discovery or DEFAULT_DISCOVERY
+        self._root = root
+        self._inventories = {directory: self._discovery.scan(directory, root) for directory in self.directories}
+
+    def wait_for_changes(self, timeout=None):
+        """Block until files change (or timeout) and return the changed paths"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for directory, previous in self._inventories.items():
+                inventory = self._discovery.scan(directory, self._root, previous)
+                for paths in inventory.diff(previous):
+                    changed |= paths
+                changed |= _changed_gitignores(previous, inventory)
+                self._inventories[directory] = inventory
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            delay = self.poll_interval
+            if deadline is not None:
+                delay = min(delay, max(0.0, deadline - time.monotonic()))
+            time.sleep(delay)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watcher over every directory below the given roots.
+
+    Changes are reported as file paths; directories that are created, moved
+    or deleted are expanded to the YAML files inside them, and .gitignore
+    files in the watched trees are reported too. Events arriving within
+    settle_delay of each other are batched together.
+    """
+
+    def __init__(self, directories, settle_delay=0.2, discovery=None, root=None):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        self.settle_delay = settle_delay
+        self.directories = [d for d in directories if os.path.isdir(d)]
+        self._discovery = discovery or DEFAULT_DISCOVERY
+        self._root = root
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watch_paths = {}
+        self._known_files = set()
+        for directory in self.directories:
+            self._watch_tree(directory)
+
+    def _add_watch(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self._watch_paths[wd] = directory
+
+    def _watch_tree(self, directory):
+        """Watch directory and its kept subdirectories; return the YAML files found"""
+        inventory = self._discovery.scan(directory, self._root)
+        for subdirectory in inventory.dirs:
+            self._add_watch(subdirectory)
+        found = set(inventory.files)
+        self._known_files |= found
+        return found
+
+    def _forget_tree(self, directory):
+        prefix = os.path.join(directory, "")
+        gone = {path for path in self._known_files if path.startswith(prefix)}
+        self._known_files -= gone
+        return gone
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + name_length].rstrip(b"\0")
+            offset += name_length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def _handle_event(self, wd, mask, name, changed):
+        if mask & IN_Q_OVERFLOW:
+            # Lost events; report everything we know plus whatever is there now
+            changed |= self._known_files
+            for directory in self.directories:
+                changed |= self._watch_tree(directory)
+            return
+        directory = self._watch_paths.get(wd)
+        if directory is None:
+            return
+        if mask & IN_IGNORED:
+            self._watch_paths.pop(wd, None)
+            return
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF) or not name:
+            return
+
+        path = os.path.join(directory, name)
+        if name == ".gitignore" and not mask & IN_ISDIR:
+            changed.add(path)
+            return
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                if not self._discovery.is_ignored(path, self._root, is_dir=True):
+                    changed |= self._watch_tree(path)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                changed |= self._forget_tree(path)
+            return
+
+        if not name.endswith(YAML_SUFFIXES):
+            return
+        if mask & (IN_DELETE | IN_MOVED_FROM):
+            self._known_files.discard(path)
+        elif self._discovery.is_ignored(path, self._root):
+            return
+        else:
+            self._known_files.add(path)
+        changed.add(path)
+
+    def wait_for_changes(self, timeout=None):
+        """Block until files change (or timeout) and return the changed paths"""
+        changed = set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if changed:
+                wait = self.settle_delay
+            elif deadline is None:
+                wait = None
+            else:
+                wait = max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self._fd], [], [], wait)
+            if not ready:
+                if changed or deadline is not None:
+                    return changed
+                continue
+            for wd, mask, name in self._read_events():
+                self._handle_event(wd, mask, name, changed)
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(directories, poll_interval=2.0, discovery=None, root=None):
+    """inotify watcher where available, polling otherwise.
+
+    discovery (a discovery.Discovery) decides which files are watched, with
+    .gitignore files looked up from root.
+    """
+    try:
+        return InotifyWatcher(directories, discovery=discovery, root=root)
+    except (OSError, AttributeError) as e:
+        logger.info("inotify unavailable (%s); polling every %ss", e, poll_interval)
+        return PollingWatcher(directories, poll_interval, discovery, root)
+
+
+class WatchedParser:
+    """A YamlParser kept up to date by a background watcher thread.
+
+    The initial scan is a full process_all_microservices(); afterwards only
+    changed files are applied through YamlParser.apply_file_changes. When the
+    watcher's view may be out of date (a config or doc directory appeared,
+    vanished or was replaced, or a .gitignore changed) it is replaced and
+    every file is applied again; a watcher that fails with OSError (e.g. the
+    inotify watch limit) is replaced by a PollingWatcher, retried every
+    poll_interval until it starts. Hold `lock` while reading the parser so
+    a request sees a consistent state.
+    """
+
+    def __init__(self, base_dir, workers=1, cache=None, poll_interval=2.0, metrics=None, use_mmap=False,
+                 discovery=None, stream_min_bytes=None):
+        self.parser = YamlParser(base_dir, workers=workers, cache=cache, metrics=metrics, use_mmap=use_mmap,
+                                 discovery=discovery, stream_min_bytes=stream_min_bytes)
+        self.lock = threading.Lock()
+        # Tells this parser's topics_version apart from other instances' in cache keys
+        self.generation = next(_generations)
+        with self.lock:
+            # Raises on failure; the caller must not keep a partially scanned parser
+            self.parser.process_all_microservices()
+        self.poll_interval = poll_interval
+        self._roots = [self.parser.config_directory, self.parser.doc_directory]
+        self._gitignore_paths = self._ancestor_gitignores() if self.parser.discovery.use_gitignore else []
+        self._polling = False
+        self._layout = self._current_layout()
+        self._watcher = self._new_watcher()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"watch:{base_dir}", daemon=True)
+        self._thread.start()
+
+    def _ancestor_gitignores(self):
+        """.gitignore paths from the base directory down to the parents of the roots"""
+        paths = []
+        for directory in self._roots:
+            ancestor = self.parser.base_directory
+            parts = os.path.relpath(directory, ancestor).split(os.sep)
+            for part in [None] + parts[:-1]:
+                if part is not None:
+                    ancestor = os.path.join(ancestor, part)
+                path = os.path.join(ancestor, ".gitignore")
+                if path not in paths:
+                    paths.append(path)
+        return paths
+
+    def _current_layout(self):
+        """Identity of each root and the stats of the .gitignore files above them"""
+        layout = []
+        for path in self._roots + self._gitignore_paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                layout.append(None)
+                continue
+            # A root's own mtime changes with every file added to it; only its identity matters
+            is_root = len(layout) < len(self._roots)
+            layout.append((st.st_dev, st.st_ino) if is_root else (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns))
+        return layout
+
+    def _new_watcher(self):
+        if self._polling:
+            return PollingWatcher(self._roots, self.poll_interval, self.parser.discovery, self.parser.base_directory)
+        return create_watcher(self._roots, self.poll_interval, self.parser.discovery, self.parser.base_directory)
+
+    def _replace_watcher(self):
+        """Close the watcher and start a new one; if that fails there is no watcher until the next try"""
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            try:
+                watcher.close()
+            except OSError as e:
+                logger.warning("Error closing watcher: %s", e)
+        self._watcher = self._new_watcher()
+
+    def _next_changes(self):
+        """Changed files to apply, or None when every file must be applied again"""
+        if self._watcher is None:
+            # Starting the last one failed; changes since then were not seen
+            self._replace_watcher()
+            return None
+        layout = self._current_layout()
+        if layout != self._layout:
+            self._layout = layout
+            self._replace_watcher()
+            return None
+        changed = self._watcher.wait_for_changes(timeout=1.0)
+        if any(os.path.basename(path) == ".gitignore" for path in changed):
+            # Edited rules can keep or drop files anywhere below; watch the trees afresh
+            self._replace_watcher()
+            return None
+        return changed
+
+    def _resync(self):
+        """Apply every file again; files discovery no longer keeps are dropped"""
+        current = set()
+        for directory in self._roots:
+            if os.path.isdir(directory):
+                current.update(self.parser.discovery.scan(directory, self.parser.base_directory).files)
+        with self.lock:
+            known = set(self.parser.config_file_results) | set(self.parser.doc_file_results)
+            affected = self.parser.apply_file_changes(known | current, removed=known - current)
+        self._log_update(f"Rescanned all {len(current)} file(s)", affected)
+
+    def _log_update(self, what, affected):
+        logger.info("%s; updated %d service(s)", what, len(affected))
+        logger.debug("Updated services: %s", sorted(affected))
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                changed = self._next_changes()
+            except OSError as e:
+                # e.g. the inotify watch limit (ENOSPC) or a directory removed mid-walk
+                logger.warning("Watcher failed (%s); polling every %ss", e, self.poll_interval)
+                self._polling = True
+                try:
+                    self._replace_watcher()
+                except OSError as e:
+                    # e.g. a directory removed while the new watcher walks it; retried next round
+                    logger.warning("Error starting polling watcher: %s", e)
+                    self._stopped.wait(self.poll_interval)
+                    continue
+                changed = None
+            if changed is not None and not changed:
+                continue
+            try:
+                if changed is None:
+                    self._resync()
+                else:
+                    with self.lock:
+                        affected = self.parser.apply_file_changes(changed)
+                    self._log_update(f"Rescanned {len(changed)} changed file(s)", affected)
+            except Exception:
+                logger.exception("Error applying file changes")
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        if self._watcher is not None:
+            self._watcher.close()
+        # Applies keep the parser's worker pool between batches
+        self.parser.close()
@@ -0,0 +1,204 @@
+from array import array
+from collections import deque
+
+
+class DependencyGraph:
+    """Compact (CSR) form of a service dependency graph with linear-time analyses.
+
+    Built from the {service: set(dependencies)} dict of
+    YamlParser.build_dependency_graph; an edge u -> v means u depends on v.
+    Nodes are numbered in sorted name order. The dependencies of node u are
+    targets[offsets[u]:offsets[u + 1]]; the reverse arrays hold each node's
+    dependents the same way.
+    """
+
+    __slots__ = ("names", "index", "offsets", "targets", "reverse_offsets", "reverse_targets")
+
+    def __init__(self, dependencies):
+        names = set(dependencies)
+        for deps in dependencies.values():
+            names.update(deps)
+        self.names = sorted(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+        index = self.index
+        self.offsets = array("I", [0])
+        self.targets = array("I")
+        for name in self.names:
+            self.targets.extend(sorted(index[dep] for dep in dependencies.get(name, ())))
+            self.offsets.append(len(self.targets))
+
+        # Reverse adjacency by counting sort over the edge targets
+        counts = [0] * (len(self.names) + 1)
+        for target in self.targets:
+            counts[target + 1] += 1
+        for i in range(len(self.names)):
+            counts[i + 1] += counts[i]
+        self.reverse_offsets = array("I", counts)
+        fill = counts[:-1]
+        reverse_targets = [0] * len(self.targets)
+        for node in range(len(self.names)):
+            for edge in range(self.offsets[node], self.offsets[node + 1]):
+                target = self.targets[edge]
+                reverse_targets[fill[target]] = node
+                fill[target] += 1
+        self.reverse_targets = array("I", reverse_targets)
+
+    @classmethod
+    def from_records(cls, dependency_records, services=()):
+        """Graph from /parse dependency records ({"service", "name"}) plus extra service names"""
+        dependencies = {service: set() for service in services}
+        for record in dependency_records:
+            service, dep = record.get("service"), record.get("name")
+            if service and dep:
+                dependencies.setdefault(service, set()).add(dep)
+        return cls(dependencies)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    def strongly_connected_components(self):
+        """Tarjan's algorithm without recursion, O(V + E).
+
+        Returns components as lists of node ids. A component is listed after
+        every component it depends on, so the list is a topological order of
+        the condensation with dependencies first.
+        """
+        offsets, targets = self.offsets, self.targets
+        node_count = len(self.names)
+        order = [-1] * node_count
+        low = [0] * node_count
+        on_stack = [False] * node_count
+        stack = []
+        components = []
+        counter = 0
+
+        for root in range(node_count):
+            if order[root] != -1:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [[root, offsets[root]]]
+            while work:
+                frame = work[-1]
+                node, edge = frame
+                if edge < offsets[node + 1]:
+                    frame[1] = edge + 1
+                    successor = targets[edge]
+                    if order[successor] == -1:
+                        order[successor] = low[successor] = counter
+                        counter += 1
+                        stack.append(successor)
+                        on_stack[successor] = True
+                        work.append([successor, offsets[successor]])
+                    elif on_stack[successor] and order[successor] < low[node]:
+                        low[node] = order[successor]
+                    continue
+
+                work.pop()
+                if work and low[node] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[node]
+                if low[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+        return components
+
+    def cycles(self, components=None):
+        """Service-name groups that form dependency cycles (SCCs with a cycle), each sorted"""
+        if components is None:
+            components = self.strongly_connected_components()
+        cycles = []
+        for component in components:
+            node = component[0]
+            if len(component) > 1 or node in self.targets[self.offsets[node]:self.offsets[node + 1]]:
+                cycles.append(sorted(self.names[member] for member in component))
+        return sorted(cycles)
+
+    def layers(self, components=None):
+        """Topological layers as lists of service names.
+
+        Layer 0 holds services that depend on nothing; every other service
+        sits one layer above its highest dependency. Services on a cycle share
+        a layer.
+        """
+        if components is None:
+            components = self.strongly_connected_components()
+        component_of = [0] * len(self.names)
+        for component_id, component in enumerate(components):
+            for member in component:
+                component_of[member] = component_id
+
+        # Components come dependencies first, so each one's dependencies are final
+        component_layer = [0] * len(components)
+        for component_id, component in enumerate(components):
+            layer = 0
+            for member in component:
+                for edge in range(self.offsets[member], self.offsets[member + 1]):
+                    dep_component = component_of[self.targets[edge]]
+                    if dep_component != component_id and component_layer[dep_component] + 1 > layer:
+                        layer = component_layer[dep_component] + 1
+            component_layer[component_id] = layer
+
+        layers = [[] for _ in range(max(component_layer, default=-1) + 1)]
+        for node, name in enumerate(self.names):
+            layers[component_layer[component_of[node]]].append(name)
+        return layers
+
+    def impact(self, service, direction="downstream", max_depth=None):
+        """Services transitively connected to service, mapped to their distance.
+
+        downstream: services that depend on service, i.e. what breaks if it
+        goes down. upstream: services that service depends on. The result is
+        ordered by distance, then name, and excludes service itself unless it
+        is on a cycle.
+        """
+        if direction == "downstream":
+            offsets, targets = self.reverse_offsets, self.reverse_targets
+        elif direction == "upstream":
+            offsets, targets = self.offsets, self.targets
+        else:
+            raise ValueError(f"direction must be 'downstream' or 'upstream', not {direction!r}")
+        start = self.index.get(service)
+        if start is None:
+            raise KeyError(service)
+
+        distances = {}
+        queue = deque([(start, 0)])
+        while queue:
+            node, distance = queue.popleft()
+            if max_depth is not None and distance >= max_depth:
+                continue
+            for edge in range(offsets[node], offsets[node + 1]):
+                successor = targets[edge]
+                if successor not in distances:
+                    distances[successor] = distance + 1
+                    queue.append((successor, distance + 1))
+        return {
+            self.names[node]: distance
+            for node, distance in sorted(distances.items(), key=lambda item: (item[1], self.names[item[0]]))
+        }
+
+    def analysis(self):
+        """JSON-ready summary: sizes, cycles and topological layers"""
+        components = self.strongly_connected_components()
+        cycles = self.cycles(components)
+        return {
+            "node_count": len(self.names),
+            "edge_count": self.edge_count,
+            "component_count": len(components),
+            "has_cycles": bool(cycles),
+            "cycles": cycles,
+            "layers": self.layers(components),
+        }
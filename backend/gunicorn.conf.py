@@ -0,0 +1,18 @@
+"""gunicorn settings for the production server (see wsgi.py)"""
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("WEB_THREADS", "1"))
+# Scans of large repos can take a while
+timeout = int(os.environ.get("WEB_TIMEOUT", "120"))
+
+# Import wsgi (and so run the warmup) once in the master, then fork warm workers
+preload_app = True
+
+
+def post_fork(server, worker):
+    from app import after_fork
+
+    after_fork()
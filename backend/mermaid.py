@@ -0,0 +1,281 @@
+from collections import Counter, deque
+
+from yaml_parser import YamlParser
+
+STYLE_LINES = [
+    '',
+    '    %% Styling',
+    '    classDef default fill:#f9f9f9,stroke:#333,stroke-width:2px,color:#333',
+    '    classDef producer fill:#e8f5e8,stroke:#4caf50,stroke-width:2px,color:#2e7d32',
+    '    classDef consumer fill:#fff3e0,stroke:#ff9800,stroke-width:2px,color:#f57c00',
+    '    classDef bidirectional fill:#e3f2fd,stroke:#2196f3,stroke-width:2px,color:#1565c0',
+    '    classDef standalone fill:#f5f5f5,stroke:#757575,stroke-width:2px,color:#424242'
+]
+
+# Group for services without any topic that TOPIC_PATTERN can parse
+UNGROUPED_DOMAIN = "other"
+
+
+def collect_graph(dependencies, microservices):
+    """Services and connections of a /generate-mermaid payload.
+
+    Returns (services, connections, producers, consumers); connections are
+    {'from', 'to', 'topic'} dicts, one per (from, to) pair, first topic kept.
+    """
+    services = set()
+    service_connections = []
+    producers = set()
+    consumers = set()
+    for dep in dependencies:
+        if dep.get('type') == 'microservice_communication':
+            source = dep.get('source_service')
+            target = dep.get('target_service')
+            topic = dep.get('topic', '')
+            if source and target:
+                services.add(source)
+                services.add(target)
+                producers.add(source)
+                consumers.add(target)
+                service_connections.append({
+                    'from': source,
+                    'to': target,
+                    'topic': topic
+                })
+        elif dep.get('type') == 'microservice_dependency':
+            dependent_service = dep.get('service')  
+            dependency = dep.get('name')           
+            if dependent_service and dependency:
+                services.add(dependent_service)
+                services.add(dependency)
+                service_connections.append({
+                    'from': dependency,        # who provides the service
+                    'to': dependent_service,   # who depends on it
+                    'topic': ''
+                })
+    for ms in microservices:
+        if isinstance(ms, dict) and 'name' in ms:
+            services.add(ms['name'])
+        elif isinstance(ms, str):
+            services.add(ms)
+    unique_connections = []
+    seen_connections = set()
+    for conn in service_connections:
+        conn_key = (conn['from'], conn['to'])
+        if conn_key not in seen_connections:
+            unique_connections.append(conn)
+            seen_connections.add(conn_key)
+    return services, unique_connections, producers, consumers
+
+
+def clean_node_id(service):
+    """Mermaid node id for a service name"""
+    return service.replace('-', '_').replace('.', '_')
+
+
+def mermaid_edge(source, target, label=''):
+    source_clean = clean_node_id(source)
+    target_clean = clean_node_id(target)
+    # mermaid arrows
+    if label:
+        return f'    {source_clean} -->|{label}| {target_clean}'
+    return f'    {source_clean} --> {target_clean}'
+
+
+def generate_mermaid_graph(dependencies, microservices):
+    services, service_connections, producers, consumers = collect_graph(dependencies, microservices)
+    mermaid_lines = ['flowchart TD']
+    pure_producers = producers - consumers
+    pure_consumers = consumers - producers
+    bidirectional = producers & consumers
+    standalone = services - producers - consumers
+    all_services = pure_producers | pure_consumers | bidirectional | standalone
+    for service in sorted(all_services):
+        clean_name = clean_node_id(service)
+        mermaid_lines.append(f'    {clean_name}[{service}]')
+    for conn in service_connections:
+        mermaid_lines.append(mermaid_edge(conn['from'], conn['to'], conn['topic']))
+    mermaid_lines.extend(STYLE_LINES)
+    for service in sorted(pure_producers):
+        clean_name = clean_node_id(service)
+        mermaid_lines.append(f'    class {clean_name} producer')
+    for service in sorted(pure_consumers):
+        clean_name = clean_node_id(service)
+        mermaid_lines.append(f'    class {clean_name} consumer')
+    for service in sorted(bidirectional):
+        clean_name = clean_node_id(service)
+        mermaid_lines.append(f'    class {clean_name} bidirectional')
+    for service in sorted(standalone):
+        clean_name = clean_node_id(service)
+        mermaid_lines.append(f'    class {clean_name} standalone')
+    return '\n'.join(mermaid_lines)
+
+
+# Graphviz fill colours matching the Mermaid classDefs
+DOT_FILL_COLORS = {
+    'producer': '#e8f5e8',
+    'consumer': '#fff3e0',
+    'bidirectional': '#e3f2fd',
+    'standalone': '#f5f5f5',
+}
+
+
+def dot_id(name):
+    """Quoted Graphviz identifier"""
+    return '"' + name.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def generate_dot_graph(dependencies, microservices):
+    """Graphviz DOT source for the same graph generate_mermaid_graph draws"""
+    services, service_connections, producers, consumers = collect_graph(dependencies, microservices)
+    dot_lines = [
+        'digraph dependencies {',
+        '    rankdir=TB;',
+        '    node [shape=box, style="rounded,filled", color="#333333", fillcolor="#f9f9f9"];',
+    ]
+    for service in sorted(services):
+        if service in producers:
+            kind = 'bidirectional' if service in consumers else 'producer'
+        else:
+            kind = 'consumer' if service in consumers else 'standalone'
+        dot_lines.append(f'    {dot_id(service)} [fillcolor="{DOT_FILL_COLORS[kind]}"];')
+    for conn in service_connections:
+        label = f' [label={dot_id(conn["topic"])}]' if conn['topic'] else ''
+        dot_lines.append(f'    {dot_id(conn["from"])} -> {dot_id(conn["to"])}{label};')
+    dot_lines.append('}')
+    return '\n'.join(dot_lines)
+
+
+def topic_domain(topic):
+    """First segment of a topic as parsed by YamlParser.TOPIC_PATTERN, or None"""
+    match = YamlParser.TOPIC_PATTERN.match(topic)
+    return match.group(1) if match else None
+
+
+def service_domains(microservices):
+    """Map each service in a /parse microservices list to its topic domain.
+
+    A service belongs to the most common domain of its produced topics, or
+    of its subscribed topics if it produces none; ties go to the
+    alphabetically first domain.
+    """
+    domains = {}
+    for ms in microservices:
+        if not isinstance(ms, dict) or 'name' not in ms:
+            continue
+        for topics in (ms.get('produces') or (), ms.get('subscribes') or ()):
+            counts = Counter(domain for domain in map(topic_domain, topics) if domain)
+            if counts:
+                domains[ms['name']] = min(counts, key=lambda domain: (-counts[domain], domain))
+                break
+    return domains
+
+
+def neighbourhood(connections, focus, depth):
+    """Services within depth edges of focus, following edges in both directions"""
+    adjacent = {}
+    for conn in connections:
+        adjacent.setdefault(conn['from'], set()).add(conn['to'])
+        adjacent.setdefault(conn['to'], set()).add(conn['from'])
+    reached = {focus: 0}
+    queue = deque([focus])
+    while queue:
+        service = queue.popleft()
+        if reached[service] == depth:
+            continue
+        for neighbour in adjacent.get(service, ()):
+            if neighbour not in reached:
+                reached[neighbour] = reached[service] + 1
+                queue.append(neighbour)
+    return set(reached)
+
+
+def generate_scalable_mermaid(dependencies, microservices, group_by_domain=True, collapse_groups=False,
+                              focus=None, depth=1, page=1, page_size=200, max_edges=500):
+    """Mermaid flowchart for large graphs, with output size bounded by page_size and max_edges.
+
+    - group_by_domain: one subgraph per topic domain (see service_domains)
+    - collapse_groups: edges between two domains become one labelled
+      domain -> domain edge carrying the number of edges it stands for
+    - focus/depth: only the services within depth edges of focus
+    - page/page_size: services are ordered by (domain, name) and cut into
+      pages; a page draws only the edges between its own services
+
+    Role classes are applied with one `class` line per role. Returns a dict
+    with the diagram and its paging and truncation details.
+    """
+    if page_size < 1 or max_edges < 0 or depth < 0:
+        raise ValueError("page_size must be >= 1, max_edges and depth >= 0")
+    services, connections, producers, consumers = collect_graph(dependencies, microservices)
+    if focus is not None:
+        if focus not in services:
+            raise ValueError(f"Unknown focus service: {focus}")
+        services = neighbourhood(connections, focus, depth)
+
+    domains = service_domains(microservices) if group_by_domain else {}
+    ordered = sorted(services, key=lambda service: (domains.get(service, UNGROUPED_DOMAIN), service))
+    pages = max(1, -(-len(ordered) // page_size))
+    if not 1 <= page <= pages:
+        raise ValueError(f"page must be between 1 and {pages}")
+    page_services = ordered[(page - 1) * page_size:page * page_size]
+    on_page = set(page_services)
+
+    mermaid_lines = ['flowchart TD']
+    if group_by_domain:
+        group_ids = {}
+        for service in page_services:
+            domain = domains.get(service, UNGROUPED_DOMAIN)
+            if domain not in group_ids:
+                if group_ids:
+                    mermaid_lines.append('    end')
+                group_ids[domain] = f'domain__{len(group_ids)}'
+                mermaid_lines.append(f'    subgraph {group_ids[domain]}["{domain}"]')
+            mermaid_lines.append(f'        {clean_node_id(service)}[{service}]')
+        if group_ids:
+            mermaid_lines.append('    end')
+    else:
+        mermaid_lines.extend(f'    {clean_node_id(service)}[{service}]' for service in page_services)
+
+    edge_lines = []
+    group_edges = Counter()
+    off_page_edges = 0
+    for conn in connections:
+        if conn['from'] not in on_page or conn['to'] not in on_page:
+            off_page_edges += conn['from'] in services and conn['to'] in services
+            continue
+        source_domain = domains.get(conn['from'], UNGROUPED_DOMAIN)
+        target_domain = domains.get(conn['to'], UNGROUPED_DOMAIN)
+        if collapse_groups and group_by_domain and source_domain != target_domain:
+            group_edges[(source_domain, target_domain)] += 1
+        else:
+            edge_lines.append(mermaid_edge(conn['from'], conn['to'], conn['topic']))
+    for (source_domain, target_domain), count in sorted(group_edges.items()):
+        edge_lines.append(f'    {group_ids[source_domain]} -->|{count}| {group_ids[target_domain]}')
+
+    truncated = len(edge_lines) > max_edges
+    mermaid_lines.extend(edge_lines[:max_edges])
+    if truncated:
+        mermaid_lines.append(f'    %% {len(edge_lines) - max_edges} more edges omitted (max_edges={max_edges})')
+    if off_page_edges:
+        mermaid_lines.append(f'    %% {off_page_edges} edges to services on other pages not shown')
+
+    mermaid_lines.extend(STYLE_LINES)
+    roles = (
+        ('producer', producers - consumers),
+        ('consumer', consumers - producers),
+        ('bidirectional', producers & consumers),
+        ('standalone', services - producers - consumers),
+    )
+    for role, members in roles:
+        members = sorted(on_page & members)
+        if members:
+            mermaid_lines.append(f'    class {",".join(map(clean_node_id, members))} {role}')
+
+    return {
+        "mermaid": '\n'.join(mermaid_lines),
+        "page": page,
+        "pages": pages,
+        "total_services": len(services),
+        "shown_services": len(page_services),
+        "shown_edges": min(len(edge_lines), max_edges),
+        "truncated": truncated,
+    }
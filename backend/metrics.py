@@ -0,0 +1,175 @@
+import threading
+import time
+from contextlib import nullcontext
+
+# Counters every scan reports, even when they stay at zero
+COUNTERS = ("files_scanned", "bytes_read", "regex_matches")
+
+COUNTER_HELP = {
+    "files_scanned": "YAML files handed to a parse stage.",
+    "bytes_read": "Bytes of YAML read from disk (cache hits read nothing).",
+    "regex_matches": "Placeholder, doc topic and title regex matches.",
+}
+
+
+class _Stage:
+    """Times one `with` block and adds it to a ParseMetrics stage"""
+
+    __slots__ = ("_metrics", "_name", "_start")
+
+    def __init__(self, metrics, name):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._metrics.add_stage_time(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class ParseMetrics:
+    """Counters and per-stage wall times collected by a YamlParser.
+
+    When a MetricsRegistry is given every update is forwarded to it as well,
+    so process-wide totals stay current without re-reading old scans.
+    """
+
+    enabled = True
+
+    def __init__(self, registry=None):
+        self.registry = registry
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.stage_seconds = {}
+        self.stage_runs = {}
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+        if self.registry is not None:
+            self.registry.count(name, amount)
+
+    def merge_counters(self, counters):
+        """Add counters collected elsewhere, e.g. in a worker process"""
+        for name, amount in counters.items():
+            if amount:
+                self.count(name, amount)
+
+    def stage(self, name):
+        """Context manager adding the wall time of its block to stage name"""
+        return _Stage(self, name)
+
+    def add_stage_time(self, name, seconds):
+        self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+        self.stage_runs[name] = self.stage_runs.get(name, 0) + 1
+        if self.registry is not None:
+            self.registry.add_stage_time(name, seconds)
+
+    def summary(self):
+        """JSON-ready timing summary: per-stage milliseconds plus counters"""
+        return {
+            "stages_ms": {name: round(seconds * 1000, 3) for name, seconds in self.stage_seconds.items()},
+            "counters": dict(self.counters),
+        }
+
+
+class _NullMetrics:
+    """Stand-in used when instrumentation is off; every call is a no-op"""
+
+    enabled = False
+    counters = {}
+
+    def count(self, name, amount=1):
+        pass
+
+    def merge_counters(self, counters):
+        pass
+
+    def stage(self, name):
+        return _NULL_STAGE
+
+    def add_stage_time(self, name, seconds):
+        pass
+
+    def summary(self):
+        return None
+
+
+_NULL_STAGE = nullcontext()
+NULL_METRICS = _NullMetrics()
+
+
+class MetricsRegistry:
+    """Process-wide metric totals, rendered in the Prometheus text format"""
+
+    def __init__(self, prefix="yaml_parser"):
+        self.prefix = prefix
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.stage_seconds = {}
+        self.stage_runs = {}
+        self.requests = 0
+        self.scans = 0
+        self._lock = threading.Lock()
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_stage_time(self, name, seconds):
+        with self._lock:
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+            self.stage_runs[name] = self.stage_runs.get(name, 0) + 1
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_scan(self):
+        with self._lock:
+            self.scans += 1
+
+    def render_prometheus(self, cache_stats=None, result_cache_stats=None):
+        """Exposition text for /metrics.
+
+        cache_stats is a ParseCache.stats() dict, result_cache_stats a
+        ResultCache.stats() dict.
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            stage_seconds = dict(self.stage_seconds)
+            stage_runs = dict(self.stage_runs)
+            requests = self.requests
+            scans = self.scans
+
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {self.prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {self.prefix}_{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{self.prefix}_{name}{labels} {value}")
+
+        metric("requests_total", "counter", "HTTP requests served, /health and /metrics excluded.", [("", requests)])
+        metric("scans_total", "counter", "Repo scans run; a batch request runs one per repo.", [("", scans)])
+        for name, value in counters.items():
+            metric(f"{name}_total", "counter", COUNTER_HELP.get(name, name), [("", value)])
+        metric("stage_seconds_total", "counter", "Wall time spent in each parse stage.",
+               [(f'{{stage="{name}"}}', f"{seconds:.6f}") for name, seconds in sorted(stage_seconds.items())])
+        metric("stage_runs_total", "counter", "Times each parse stage ran.",
+               [(f'{{stage="{name}"}}', runs) for name, runs in sorted(stage_runs.items())])
+
+        if cache_stats is not None:
+            metric("cache_hits_total", "counter", "Parse cache hits.", [("", cache_stats["hits"])])
+            metric("cache_misses_total", "counter", "Parse cache misses.", [("", cache_stats["misses"])])
+            metric("cache_evictions_total", "counter", "Parse cache LRU evictions.", [("", cache_stats["evictions"])])
+            metric("cache_entries", "gauge", "Entries in the parse cache.", [("", cache_stats["entries"])])
+            metric("cache_bytes", "gauge", "Payload bytes in the parse cache.", [("", cache_stats["bytes"])])
+        if result_cache_stats is not None:
+            metric("result_cache_hits_total", "counter", "Responses served from the result cache.",
+                   [("", result_cache_stats["hits"])])
+            metric("result_cache_misses_total", "counter", "Responses generated afresh.",
+                   [("", result_cache_stats["misses"])])
+            metric("result_cache_entries", "gauge", "Entries in the result cache.",
+                   [("", result_cache_stats["entries"])])
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,75 @@
+import mmap
+import os
+import re
+from contextlib import contextmanager
+from functools import lru_cache
+
+# Bytes that make text-mode reading differ from plain ASCII line handling:
+# anything non-ASCII (decoding, unicode whitespace), \v \f \x1c-\x1f (str.strip
+# and str.splitlines treat them as whitespace or line breaks) and a lone \r
+# (universal newlines). Buffers containing any of them take the text path.
+TEXT_ONLY_PATTERN = re.compile(rb"[\x80-\xff\x0b\x0c\x1c-\x1f]|\r(?!\n)")
+
+# Lines that can open a topics: definition or a consumers: section
+SECTION_START_PATTERN = re.compile(rb"^[ \t]*(?:topics:|consumers:)", re.MULTILINE)
+
+
+@contextmanager
+def mapped_file(filepath):
+    """Read-only mmap of filepath; yields None for an empty file (which cannot be mapped)"""
+    with open(filepath, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield None
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield buf
+
+
+def is_plain_ascii(buf):
+    """True if buf can be scanned as bytes with the same results as the decoded text"""
+    return TEXT_ONLY_PATTERN.search(buf) is None
+
+
+def line_start(buf, position):
+    return buf.rfind(b"\n", 0, position) + 1
+
+
+@lru_cache(maxsize=None)
+def _section_end_pattern(indent):
+    # Newline followed by a non-blank line indented by at most indent spaces
+    return re.compile(rb"\n {0,%d}(?! )(?=[\t\r]*[^\s])" % indent)
+
+
+def precompile_patterns(max_indent=16):
+    """Build the section-end patterns for indents up to max_indent ahead of the first scan"""
+    for indent in range(max_indent + 1):
+        _section_end_pattern(indent)
+
+
+def section_end(buf, start, indent):
+    """Start of the first non-blank line after the line at start indented by at most indent spaces"""
+    match = _section_end_pattern(indent).search(buf, start)
+    return match.start() + 1 if match else len(buf)
+
+
+def line_window(buf, position, before, after):
+    """Slice bounds covering up to before lines above position's line and after lines from it.
+
+    Returns (window_start, window_end, line_index, column): line_index is the
+    index of position's line within the window and column is position's offset
+    in that line.
+    """
+    start = line_start(buf, position)
+    window_start = start
+    line_index = 0
+    while line_index < before and window_start > 0:
+        window_start = line_start(buf, window_start - 1)
+        line_index += 1
+
+    window_end = start
+    for _ in range(after):
+        newline = buf.find(b"\n", window_end)
+        if newline < 0:
+            return window_start, len(buf), line_index, position - start
+        window_end = newline + 1
+    return window_start, window_end - 1, line_index, position - start
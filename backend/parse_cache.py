@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Bump when the shape or the meaning of cached parse results changes
+# (2: text after a document marker in a streamed config is kept)
+CACHE_FORMAT_VERSION = 2
+
+
+def content_digest(data):
+    """Digest ParseCache stores for a file whose bytes are data"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ParseCache:
+    """Persistent per-file cache of YamlParser extraction results.
+
+    Entries live in a SQLite file under cache_dir and are keyed by
+    (kind, absolute path). A lookup is a hit when the file's size and mtime
+    match the stored entry, or when they differ but the content hash still
+    matches (e.g. after a touch or checkout). Results are stored as compact
+    JSON; total payload size is capped with least-recently-used eviction.
+
+    Lookups only read. New entries and the bookkeeping of hits are kept in
+    memory and written by flush() in one short transaction, so a process
+    never holds the database write lock while it parses.
+    """
+
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_path = os.path.join(cache_dir, "parse-cache.sqlite3")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._inherited_conns = []
+        # Writes waiting for flush(), keyed by (kind, path)
+        self._pending_puts = {}
+        self._pending_mtimes = {}
+        self._pending_touches = {}
+        self._conn = self._connect()
+        self._init_schema()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.cache_path, timeout=30, check_same_thread=False)
+        # WAL lets several server processes read while one of them writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def reopen(self):
+        """Replace the connection, e.g. in a process forked after this cache was opened.
+
+        An SQLite connection must not be used across a fork. The inherited one
+        stays referenced but unused: closing it here could checkpoint or remove
+        the WAL file the parent still uses.
+        """
+        with self._lock:
+            self._inherited_conns.append(self._conn)
+            self._conn = self._connect()
+
+    def _init_schema(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != CACHE_FORMAT_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS entries")
+            self._conn.execute(f"PRAGMA user_version = {CACHE_FORMAT_VERSION}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " kind TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " digest TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (kind, path))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def _file_digest(filepath):
+        digest = hashlib.blake2b(digest_size=16)
+        with open(filepath, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def get(self, kind, filepath):
+        """Return the cached result for filepath, or None on a miss"""
+        filepath = os.path.abspath(filepath)
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            self.misses += 1
+            return None
+
+        key = (kind, filepath)
+        with self._lock:
+            pending = self._pending_puts.get(key)
+            if pending is not None:
+                row = pending[2:6]
+            else:
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns, digest, payload FROM entries WHERE kind = ? AND path = ?",
+                    key,
+                ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            size, mtime_ns, digest, payload = row
+            if (size, mtime_ns) != (st.st_size, st.st_mtime_ns):
+                # Metadata changed; the content may not have
+                try:
+                    if st.st_size != size or self._file_digest(filepath) != digest:
+                        self.misses += 1
+                        return None
+                except OSError:
+                    self.misses += 1
+                    return None
+                self._pending_mtimes[key] = st.st_mtime_ns
+
+            self._pending_touches[key] = time.time()
+            self.hits += 1
+            return json.loads(payload)
+
+    def put(self, kind, filepath, result, st=None, digest=None):
+        """Store result for filepath.
+
+        st is the os.stat taken before the file was parsed; if the file has
+        changed since then the entry is not stored, so a stale result can
+        never be attached to newer content. digest is the content_digest of
+        the bytes that were parsed, if the caller has it; otherwise the file
+        is read again to compute it.
+        """
+        filepath = os.path.abspath(filepath)
+        try:
+            if st is None:
+                st = os.stat(filepath)
+            if digest is None:
+                digest = self._file_digest(filepath)
+            current = os.stat(filepath)
+        except OSError:
+            return
+        if (current.st_size, current.st_mtime_ns) != (st.st_size, st.st_mtime_ns):
+            return
+
+        payload = json.dumps(result, separators=(",", ":"))
+        key = (kind, filepath)
+        with self._lock:
+            self._pending_puts[key] = (kind, filepath, st.st_size, st.st_mtime_ns, digest, payload, time.time())
+            self._pending_mtimes.pop(key, None)
+
+    def flush(self):
+        """Write pending entries and hits, evict least-recently-used entries over max_bytes, commit.
+
+        A write that fails (e.g. the database stays locked past the timeout)
+        is reported and dropped; the cache only loses those entries.
+        """
+        with self._lock:
+            try:
+                # One transaction, committed on success and rolled back on error
+                with self._conn:
+                    self._write_pending()
+                    self._evict()
+            except sqlite3.Error as e:
+                print(f"Error writing parse cache {self.cache_path}: {e}")
+            finally:
+                self._pending_puts.clear()
+                self._pending_mtimes.clear()
+                self._pending_touches.clear()
+
+    def _write_pending(self):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO entries (kind, path, size, mtime_ns, digest, payload, last_used)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            self._pending_puts.values(),
+        )
+        self._conn.executemany(
+            "UPDATE entries SET mtime_ns = ? WHERE kind = ? AND path = ?",
+            [(mtime_ns, kind, path) for (kind, path), mtime_ns in self._pending_mtimes.items()],
+        )
+        self._conn.executemany(
+            "UPDATE entries SET last_used = ? WHERE kind = ? AND path = ?",
+            [(used, kind, path) for (kind, path), used in self._pending_touches.items()],
+        )
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM entries").fetchone()[0]
+        if total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT kind, path, LENGTH(payload) FROM entries ORDER BY last_used"
+            ).fetchall()
+            evicted = []
+            for kind, path, length in rows:
+                if total <= self.max_bytes:
+                    break
+                evicted.append((kind, path))
+                total -= length
+            self._conn.executemany("DELETE FROM entries WHERE kind = ? AND path = ?", evicted)
+            self.evictions += len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._pending_puts.clear()
+            self._pending_mtimes.clear()
+            self._pending_touches.clear()
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM entries"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,82 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from file_watcher import walk_yaml_files
+
+
+def directory_fingerprint(directories, *extra, discovery=None, root=None):
+    """Hex fingerprint of the YAML files under directories: paths, sizes and mtimes.
+
+    One stat per file, no reads; any added, removed, resized or touched file
+    changes it. extra values (e.g. settings that affect the result) are mixed in.
+    discovery and root select the files as in YamlParser.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for value in extra:
+        digest.update(repr(value).encode("utf-8"))
+        digest.update(b"\0")
+    for directory in directories:
+        digest.update(directory.encode("utf-8", "surrogateescape"))
+        digest.update(b"\0")
+        for filepath, (size, mtime_ns) in sorted(walk_yaml_files(directory, discovery, root).items()):
+            digest.update(f"{filepath}\0{size}\0{mtime_ns}\n".encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+def payload_fingerprint(payload):
+    """Hex fingerprint of a request body"""
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """Thread-safe in-memory LRU of generated responses with a time-to-live.
+
+    Keys are fingerprints; values are whatever the caller stores (typically
+    the serialized response body). Entries older than ttl seconds count as
+    misses and are dropped on access.
+    """
+
+    def __init__(self, max_entries=64, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+            }
@@ -0,0 +1,195 @@
+"""Snapshots of a scan and the topic- and edge-level diff between two of them.
+
+    python scan_diff.py snapshot REPO [-o FILE]
+    python scan_diff.py diff BASE HEAD [--fail-on-change]
+
+BASE and HEAD are snapshot files or repo directories (scanned on the fly).
+diff prints the changes as JSON; with --fail-on-change it exits with status
+1 when any service dependency was added or removed.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+SNAPSHOT_FORMAT = "yaml-parser-snapshot"
+SNAPSHOT_VERSION = 1
+
+# Services are spread over this many buckets, each with its own digest
+BUCKET_COUNT = 256
+
+
+def _digest(parts):
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode("utf-8", "surrogateescape"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _bucket_of(service_name):
+    return hashlib.blake2b(service_name.encode("utf-8", "surrogateescape"), digest_size=2).digest()[0] % BUCKET_COUNT
+
+
+def build_snapshot(topics_map, dependencies):
+    """Snapshot of a scan: each service's topics and dependencies plus a two-level digest tree.
+
+    topics_map is YamlParser.microservice_topics_map, dependencies the dict
+    from build_dependency_graph. Every service gets a digest of its entry;
+    services are grouped into hash buckets with a digest each, and the
+    bucket digests into one root digest.
+    """
+    services = {}
+    buckets = [[] for _ in range(BUCKET_COUNT)]
+    for service_name in sorted(set(topics_map) | set(dependencies)):
+        topics = topics_map.get(service_name)
+        entry = {
+            "produces": sorted(topics.produces) if topics is not None else [],
+            "subscribes": sorted(topics.subscribes) if topics is not None else [],
+            "depends_on": sorted(dependencies.get(service_name, ())),
+        }
+        entry["digest"] = _digest([service_name, "produces", *entry["produces"], "subscribes", *entry["subscribes"],
+                                   "depends_on", *entry["depends_on"]])
+        services[service_name] = entry
+        buckets[_bucket_of(service_name)].append(service_name)
+
+    bucket_entries = [
+        {"digest": _digest(f"{name}={services[name]['digest']}" for name in names), "services": names}
+        for names in buckets
+    ]
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "root": _digest(bucket["digest"] for bucket in bucket_entries),
+        "buckets": bucket_entries,
+        "services": services,
+    }
+
+
+def snapshot_parser(parser):
+    """Snapshot of a processed YamlParser"""
+    return build_snapshot(parser.microservice_topics_map, parser.build_dependency_graph())
+
+
+def validate_snapshot(snapshot):
+    """Raise ValueError unless snapshot looks like build_snapshot output"""
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError("not a scan snapshot")
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version: {snapshot.get('version')}")
+    if len(snapshot.get("buckets", ())) != BUCKET_COUNT or not isinstance(snapshot.get("services"), dict):
+        raise ValueError("malformed snapshot")
+
+
+def _list_diff(old, new):
+    old_set, new_set = set(old), set(new)
+    return {"added": sorted(new_set - old_set), "removed": sorted(old_set - new_set)}
+
+
+def diff_snapshots(base, head):
+    """Services, topics and dependency edges added or removed between two snapshots.
+
+    Only the buckets whose digests differ are opened and only the services
+    whose digests differ are compared, so the cost follows the size of the
+    change rather than the size of the repo.
+    """
+    validate_snapshot(base)
+    validate_snapshot(head)
+    result = {
+        "changed": False,
+        "services": {"added": [], "removed": []},
+        "topics": {},
+        "edges": {"added": [], "removed": []},
+    }
+    if base["root"] == head["root"]:
+        return result
+
+    base_services, head_services = base["services"], head["services"]
+    for base_bucket, head_bucket in zip(base["buckets"], head["buckets"]):
+        if base_bucket["digest"] == head_bucket["digest"]:
+            continue
+        for service_name in sorted(set(base_bucket["services"]) | set(head_bucket["services"])):
+            old = base_services.get(service_name)
+            new = head_services.get(service_name)
+            if old is not None and new is not None and old["digest"] == new["digest"]:
+                continue
+            if old is None:
+                result["services"]["added"].append(service_name)
+            elif new is None:
+                result["services"]["removed"].append(service_name)
+            empty = {"produces": [], "subscribes": [], "depends_on": []}
+            old, new = old or empty, new or empty
+
+            topic_changes = {}
+            for kind in ("produces", "subscribes"):
+                changes = _list_diff(old[kind], new[kind])
+                if changes["added"] or changes["removed"]:
+                    topic_changes[kind] = changes
+            if topic_changes:
+                result["topics"][service_name] = topic_changes
+            edges = _list_diff(old["depends_on"], new["depends_on"])
+            result["edges"]["added"].extend([service_name, dep] for dep in edges["added"])
+            result["edges"]["removed"].extend([service_name, dep] for dep in edges["removed"])
+
+    for key in ("services", "edges"):
+        result[key]["added"].sort()
+        result[key]["removed"].sort()
+    result["topics"] = dict(sorted(result["topics"].items()))
+    result["changed"] = bool(result["services"]["added"] or result["services"]["removed"] or result["topics"]
+                             or result["edges"]["added"] or result["edges"]["removed"])
+    return result
+
+
+def load_snapshot(path, workers=1):
+    """Snapshot from a snapshot file, or from a scan when path is a repo directory"""
+    if os.path.isdir(path):
+        from yaml_parser import YamlParser
+
+        parser = YamlParser(path, workers=workers)
+        parser.process_all_microservices()
+        return snapshot_parser(parser)
+    with open(path, encoding="utf-8") as f:
+        snapshot = json.load(f)
+    validate_snapshot(snapshot)
+    return snapshot
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--workers", type=int, default=1, help="worker processes per scan (0 = one per CPU)")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    snapshot_command = commands.add_parser("snapshot", help="write the snapshot of a repo")
+    snapshot_command.add_argument("repo")
+    snapshot_command.add_argument("-o", "--output", help="file to write (default: stdout)")
+    diff_command = commands.add_parser("diff", help="compare two snapshots or repos")
+    diff_command.add_argument("base")
+    diff_command.add_argument("head")
+    diff_command.add_argument("--fail-on-change", action="store_true",
+                              help="exit with status 1 when a dependency edge was added or removed")
+    args = arg_parser.parse_args(argv)
+
+    if args.command == "snapshot":
+        if not os.path.isdir(args.repo):
+            arg_parser.error(f"Directory not found: {args.repo}")
+        text = json.dumps(load_snapshot(args.repo, args.workers), separators=(",", ":"))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text)
+        else:
+            sys.stdout.write(text + "\n")
+        return 0
+
+    try:
+        diff = diff_snapshots(load_snapshot(args.base, args.workers), load_snapshot(args.head, args.workers))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    print(json.dumps(diff, indent=2))
+    if args.fail_on_change and (diff["edges"]["added"] or diff["edges"]["removed"]):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def dependency_record(service, dep):
+    """A /parse dependency entry: service depends on dep"""
+    return {
+        "name": dep,
+        "type": "microservice_dependency",
+        "description": f"{service} depends on {dep}",
+        "service": service,
+        "version": "",
+        "category": "microservice"
+    }
+
+
+def scan_result(microservice_parser):
+    """The /parse result for a processed parser"""
+    all_dependencies = []
+    microservices_data = []
+    total_dependency_count = 0
+    total_publish_subscribe_events = 0
+
+    try:
+        ms_dependencies = microservice_parser.build_dependency_graph()
+        ms_topic_map = microservice_parser.get_microservice_topic_map()
+
+        # Calculate total publish/subscribe events (all produced and subscribed topics)
+        for service_name, topics in ms_topic_map.items():
+            microservices_data.append({
+                "name": service_name,
+                "produces": list(topics.produces),
+                "subscribes": list(topics.subscribes)
+            })
+            # Count all produced and subscribed topics for this service
+            total_publish_subscribe_events += len(topics.produces) + len(topics.subscribes)
+
+        # Create direct dependency arrows - service -> dependency
+        for service, deps in ms_dependencies.items():
+            for dep in deps:
+                all_dependencies.append(dependency_record(service, dep))
+        # Topic-based communication dependencies are already handled in the parser
+        # The parser's build_dependency_graph() method creates dependencies based on topic matching
+        # So we don't need to duplicate that logic here
+    except Exception as e:
+        pass
+
+    # Answered from the parser's cached graph; no rebuild
+    total_dependency_count = microservice_parser.get_total_dependency_count()
+    logger.debug("All dependencies: %d", len(all_dependencies))
+    logger.debug("Dependencies from parser.get_total_dependency_count(): %d", total_dependency_count)
+    logger.debug("Total publish/subscribe events: %d", total_publish_subscribe_events)
+
+    return {
+        "dependencies": all_dependencies,
+        "total_dependencies": total_publish_subscribe_events,
+        "microservices": microservices_data,
+        "total_dependency_count": total_dependency_count
+
+    }
+
+
+class DetachedScan:
+    """The services and dependency graph of a processed parser, copied.
+
+    Has the iter_microservices and iter_dependency_edges of a parser, so
+    iter_scan_records can walk it after the parser's lock is released while
+    the watcher keeps updating the parser itself.
+    """
+
+    def __init__(self, microservice_parser):
+        self.microservices = [(service_name, list(produces), list(subscribes))
+                              for service_name, produces, subscribes in microservice_parser.iter_microservices()]
+        self.dependencies = [(service, list(deps))
+                             for service, deps in microservice_parser.build_dependency_graph().items()]
+
+    def iter_microservices(self):
+        return iter(self.microservices)
+
+    def iter_dependency_edges(self):
+        for service, deps in self.dependencies:
+            for dep in deps:
+                yield service, dep
+
+
+def iter_scan_records(microservice_parser):
+    """Yield the /parse/stream records of a processed parser (or a DetachedScan).
+
+    One "microservice" record per service, one "dependency" record per edge,
+    then a "summary" record with the totals.
+    """
+    total_dependency_count = 0
+    total_publish_subscribe_events = 0
+    for service_name, produces, subscribes in microservice_parser.iter_microservices():
+        total_publish_subscribe_events += len(produces) + len(subscribes)
+        yield {
+            "record": "microservice",
+            "name": service_name,
+            "produces": list(produces),
+            "subscribes": list(subscribes)
+        }
+    for service, dep in microservice_parser.iter_dependency_edges():
+        total_dependency_count += 1
+        yield {"record": "dependency", **dependency_record(service, dep)}
+    yield {
+        "record": "summary",
+        "total_dependencies": total_publish_subscribe_events,
+        "total_dependency_count": total_dependency_count
+    }
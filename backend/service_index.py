@@ -0,0 +1,148 @@
+import re
+from functools import lru_cache
+
+NON_ALNUM_PATTERN = re.compile(r'[^a-z0-9]')
+WORD_PATTERN = re.compile(r'[a-z]+')
+
+
+@lru_cache(maxsize=16384)
+def normalize_service_name(name):
+    """Lowercase and drop every separator, e.g. 'Order-Service' -> 'orderservice'"""
+    return NON_ALNUM_PATTERN.sub('', name.lower())
+
+
+def name_words(name):
+    """Alphabetic words of a name, lowercased"""
+    return WORD_PATTERN.findall(name.lower())
+
+
+class ServiceNameIndex:
+    """Precomputed lookups over the known microservice names for doc matching.
+
+    Built once per scan so that matching a doc costs roughly its own token
+    count instead of a regex pass over every service name. Every service gets
+    a rank from the iteration order of known_microservices; each lookup
+    returns the lowest-ranked match, which is what a linear scan over the same
+    collection would have returned first.
+    """
+
+    # Substring lengths kept in the gram index for partial matching
+    GRAM_SIZE = 3
+
+    def __init__(self, known_microservices):
+        self.names = list(known_microservices)
+        self._by_normalized = {}     # normalized name -> ranks
+        self._by_lower = {}          # lowercased name -> ranks
+        self._by_initials = {}       # initials of name words (<= 4 letters) -> ranks
+        self._by_word = {}           # significant word (> 2 letters) -> ranks
+        self._by_short_word = {}     # short word (<= 4 letters) -> ranks
+        self._by_gram = {}           # 1..GRAM_SIZE-letter substring of a long normalized name -> ranks
+        self._normalized = []
+        self._significant_counts = []
+        self._wordless = []          # ranks with no significant words
+        self._partial = []           # ranks whose normalized name is longer than 3
+
+        for rank, name in enumerate(self.names):
+            normalized = normalize_service_name(name)
+            words = name_words(name)
+            significant = {w for w in words if len(w) > 2}
+
+            self._normalized.append(normalized)
+            self._significant_counts.append(len([w for w in words if len(w) > 2]))
+            self._by_normalized.setdefault(normalized, []).append(rank)
+            self._by_lower.setdefault(name.lower(), []).append(rank)
+            if len(words) <= 4:
+                initials = ''.join(w[0] for w in words)
+                self._by_initials.setdefault(initials, []).append(rank)
+            for word in significant:
+                self._by_word.setdefault(word, []).append(rank)
+            for word in {w for w in words if len(w) <= 4}:
+                self._by_short_word.setdefault(word, []).append(rank)
+            if not significant:
+                self._wordless.append(rank)
+
+            if len(normalized) > 3:
+                self._partial.append(rank)
+                grams = set()
+                for size in range(1, self.GRAM_SIZE + 1):
+                    for i in range(len(normalized) - size + 1):
+                        grams.add(normalized[i:i + size])
+                for gram in grams:
+                    self._by_gram.setdefault(gram, set()).add(rank)
+
+    def _first(self, ranks):
+        return self.names[min(ranks)] if ranks else None
+
+    def match_normalized(self, normalized):
+        """Service whose normalized name equals normalized"""
+        return self._first(self._by_normalized.get(normalized))
+
+    def match_partial(self, normalized):
+        """Service (normalized name > 3 chars) containing or contained in normalized"""
+        if not normalized:
+            # '' is a substring of every name
+            return self._first(self._partial)
+
+        candidates = set()
+        # Names contained in the query: look up every substring longer than 3
+        for start in range(len(normalized)):
+            for end in range(start + 4, len(normalized) + 1):
+                for rank in self._by_normalized.get(normalized[start:end], ()):
+                    candidates.add(rank)
+
+        # Names containing the query: intersect gram postings, then verify
+        size = min(self.GRAM_SIZE, len(normalized))
+        postings = sorted(
+            (self._by_gram.get(normalized[i:i + size], set()) for i in range(len(normalized) - size + 1)),
+            key=len,
+        )
+        containing = set(postings[0])
+        for posting in postings[1:]:
+            if not containing:
+                break
+            containing &= posting
+        candidates.update(rank for rank in containing if normalized in self._normalized[rank])
+
+        candidates = [rank for rank in candidates if len(self._normalized[rank]) > 3]
+        return self._first(candidates)
+
+    def match_words(self, words):
+        """Word/abbreviation match of filename words; shortest name first.
+
+        A service matches when a short word (<= 4 letters) equals its whole
+        name or its initials, when it shares a significant word with words,
+        or when it has no significant words at all.
+        """
+        candidates = set(self._wordless)
+        for word in words:
+            if len(word) <= 4:
+                candidates.update(self._by_lower.get(word, ()))
+                candidates.update(self._by_initials.get(word, ()))
+            if len(word) > 2:
+                candidates.update(self._by_word.get(word, ()))
+        if not candidates:
+            return None
+        best = min(candidates, key=lambda rank: (len(self.names[rank]), rank))
+        return self.names[best]
+
+    def match_title_words(self, title_words):
+        """Abbreviation or word-overlap match of document title words.
+
+        A service matches when the initials of the first three title words are
+        one of its short words, or when it shares at least
+        min(2, its significant word count) significant words with the title.
+        """
+        candidates = set(self._wordless)
+        if len(title_words) >= 3:
+            potential_abbrev = ''.join(word[0] for word in title_words[:3])
+            candidates.update(self._by_short_word.get(potential_abbrev, ()))
+
+        shared_counts = {}
+        for word in {w for w in title_words if len(w) > 2}:
+            for rank in self._by_word.get(word, ()):
+                shared_counts[rank] = shared_counts.get(rank, 0) + 1
+        candidates.update(
+            rank for rank, shared in shared_counts.items()
+            if shared >= min(2, self._significant_counts[rank])
+        )
+        return self._first(candidates)
@@ -0,0 +1,79 @@
+import json
+import os
+import shutil
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+import file_watcher
+from parse_cache import ParseCache
+
+TEST_REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test1")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, "PARSE_WATCH", True)
+    monkeypatch.setattr(app_module, "parse_cache", ParseCache(str(tmp_path / "cache")))
+    monkeypatch.setattr(file_watcher, "create_watcher",
+                        lambda directories, poll_interval, discovery, root:
+                        file_watcher.PollingWatcher(directories, 0.05, discovery, root))
+    app_module.result_cache.clear()
+    yield app_module.app.test_client()
+    for watched in app_module.parser.watched_parsers.values():
+        watched.stop()
+    app_module.parser.watched_parsers.clear()
+    app_module.parse_cache.close()
+
+
+def post_parse(client, repo):
+    response = client.post('/parse', json={"directory_path": repo})
+    assert response.status_code == 200
+    return response
+
+
+def subscribes(response, service):
+    return next(ms["subscribes"] for ms in response.get_json()["microservices"] if ms["name"] == service)
+
+
+def test_watch_mode_etag_follows_parser_state(client, tmp_path):
+    repo = str(tmp_path / "repo")
+    shutil.copytree(TEST_REPO, repo)
+
+    first = post_parse(client, repo)
+    assert first.headers["X-Result-Cache"] == "miss"
+    second = post_parse(client, repo)
+    assert second.headers["X-Result-Cache"] == "hit"
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+    with open(os.path.join(repo, "deployment", "config", "cart", "cart.yml"), "a", encoding="utf-8") as f:
+        f.write("      - ecommerce.wishlist.event\n")
+    deadline = time.monotonic() + 10
+    while True:
+        third = post_parse(client, repo)
+        if third.headers["ETag"] != first.headers["ETag"] or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert third.headers["X-Result-Cache"] == "miss"
+    assert "ecommerce.wishlist.event" in subscribes(third, "cart")
+
+
+def test_cache_hit_gets_fresh_request_fields(client, tmp_path):
+    repo = str(tmp_path / "repo")
+    shutil.copytree(TEST_REPO, repo)
+
+    miss = post_parse(client, repo)
+    cached = json.loads(app_module.result_cache.get(miss.headers["ETag"].strip('"')))
+    assert "timings" not in cached and "cache_stats" not in cached
+
+    hit = post_parse(client, repo)
+    assert hit.headers["X-Result-Cache"] == "hit"
+    body = hit.get_json()
+    assert body["cache_stats"] == app_module.parse_cache.stats()
+    # Only this request's own stage; the scan ran for the first request
+    assert set(body["timings"]["stages_ms"]) == {"request"}
+    assert set(miss.get_json()["timings"]["stages_ms"]) > {"request"}
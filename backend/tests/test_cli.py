@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cli
+
+TEST_REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test1")
+
+
+def test_missing_repo_is_a_usage_error(tmp_path):
+    with pytest.raises(SystemExit) as exc_info:
+        cli.main([str(tmp_path / "missing")])
+    assert exc_info.value.code == 2
+
+
+def test_writes_output_file(tmp_path):
+    output = tmp_path / "graph.dot"
+    assert cli.main([TEST_REPO, "--format", "dot", "-o", str(output)]) == 0
+    assert output.read_text(encoding="utf-8").startswith("digraph dependencies {")
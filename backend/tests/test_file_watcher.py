@@ -0,0 +1,131 @@
+import os
+import shutil
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import file_watcher
+from file_watcher import PollingWatcher, WatchedParser
+from yaml_parser import YamlParser
+
+TEST_REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test1")
+
+NEW_SERVICE = """consumers:
+  wishlist:
+    topics:
+      - ecommerce.cart.event
+      - ${topics.wishlist.event}
+topics:
+  wishlist:
+    event: ecommerce.wishlist.event
+"""
+
+
+def parser_state(parser):
+    topics = {name: (sorted(t.produces), sorted(t.subscribes)) for name, t in parser.microservice_topics_map.items()}
+    graph = {name: sorted(deps) for name, deps in parser.build_dependency_graph().items()}
+    return topics, graph
+
+
+def full_scan_state(repo):
+    parser = YamlParser(repo)
+    parser.process_all_microservices()
+    return parser_state(parser)
+
+
+def wait_for_full_scan_state(watched, repo, timeout=10.0):
+    """Wait until the watched parser has caught up with a full rescan of repo"""
+    expected = full_scan_state(repo)
+    deadline = time.monotonic() + timeout
+    while True:
+        with watched.lock:
+            state = parser_state(watched.parser)
+        if state == expected or time.monotonic() > deadline:
+            return state, expected
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    shutil.copytree(TEST_REPO, path)
+    return str(path)
+
+
+@pytest.fixture
+def watched(repo, monkeypatch):
+    monkeypatch.setattr(file_watcher, "create_watcher", PollingWatcher)
+    watched = WatchedParser(repo, poll_interval=0.05)
+    yield watched
+    watched.stop()
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def test_added_config(watched, repo):
+    write(os.path.join(repo, "deployment", "config", "wishlist", "wishlist.yml"), NEW_SERVICE)
+    state, expected = wait_for_full_scan_state(watched, repo)
+    assert "wishlist" in state[0]
+    assert state == expected
+
+
+def test_deleted_config_and_doc(watched, repo):
+    os.remove(os.path.join(repo, "deployment", "config", "cart", "cart.yml"))
+    os.remove(os.path.join(repo, "doc", "payment.yml"))
+    state, expected = wait_for_full_scan_state(watched, repo)
+    assert "cart" not in state[0]
+    assert state == expected
+
+
+def test_replaced_config_root(watched, repo, tmp_path):
+    config = os.path.join(repo, "deployment", "config")
+    replacement = str(tmp_path / "config")
+    shutil.copytree(config, replacement)
+    shutil.rmtree(os.path.join(replacement, "order"))
+    write(os.path.join(replacement, "wishlist", "wishlist.yml"), NEW_SERVICE)
+    os.rename(config, str(tmp_path / "old-config"))
+    os.rename(replacement, config)
+    state, expected = wait_for_full_scan_state(watched, repo)
+    assert "wishlist" in state[0]
+    assert state == expected
+
+
+def test_gitignore_edits(watched, repo):
+    gitignore = os.path.join(repo, ".gitignore")
+    write(gitignore, "deployment/config/cart/\n")
+    state, expected = wait_for_full_scan_state(watched, repo)
+    assert "cart" not in state[0]
+    assert state == expected
+
+    os.remove(gitignore)
+    state, expected = wait_for_full_scan_state(watched, repo)
+    assert "cart" in state[0]
+    assert state == expected
+
+
+def test_watcher_failure_falls_back_to_polling(watched, repo, monkeypatch):
+    starts = []
+
+    def flaky_polling_watcher(*args):
+        starts.append(args)
+        if len(starts) == 1:
+            raise OSError("directory removed mid-walk")
+        return PollingWatcher(*args)
+
+    def failing_wait(timeout=None):
+        raise OSError("inotify watch limit reached")
+
+    monkeypatch.setattr(file_watcher, "PollingWatcher", flaky_polling_watcher)
+    watched._watcher.wait_for_changes = failing_wait
+    write(os.path.join(repo, "deployment", "config", "wishlist", "wishlist.yml"), NEW_SERVICE)
+    state, expected = wait_for_full_scan_state(watched, repo)
+    assert watched._thread.is_alive()
+    assert len(starts) >= 2
+    assert state == expected
@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph_analytics import DependencyGraph
+
+
+def component_names(graph):
+    return [sorted(graph.names[node] for node in component) for component in graph.strongly_connected_components()]
+
+
+def test_cycle_is_one_component_after_its_dependencies():
+    # a -> b -> c -> a, and the cycle depends on d
+    graph = DependencyGraph({"a": {"b"}, "b": {"c"}, "c": {"a", "d"}, "d": set()})
+    assert component_names(graph) == [["d"], ["a", "b", "c"]]
+    assert graph.cycles() == [["a", "b", "c"]]
+    assert graph.analysis()["has_cycles"]
+
+
+def test_self_loop_is_a_cycle():
+    graph = DependencyGraph({"a": {"a"}, "b": {"a"}})
+    assert graph.cycles() == [["a"]]
+    assert graph.impact("a", "upstream") == {"a": 1}
+
+
+def test_acyclic_graph_has_no_cycles():
+    graph = DependencyGraph({"a": {"b"}, "b": set()})
+    assert graph.cycles() == []
+    assert not graph.analysis()["has_cycles"]
+
+
+def test_dag_layers():
+    graph = DependencyGraph({
+        "api": {"orders", "users"},
+        "orders": {"db", "users"},
+        "users": {"db"},
+        "db": set(),
+        "audit": set(),
+    })
+    assert graph.layers() == [["audit", "db"], ["users"], ["orders"], ["api"]]
+
+
+def test_cycle_members_share_a_layer():
+    graph = DependencyGraph({"a": {"b"}, "b": {"a", "c"}, "c": set()})
+    assert graph.layers() == [["c"], ["a", "b"]]
+
+
+def test_impact_with_depth_limit():
+    # chain: d depends on c, c on b, b on a
+    graph = DependencyGraph({"b": {"a"}, "c": {"b"}, "d": {"c"}, "e": {"b"}})
+    assert graph.impact("a") == {"b": 1, "c": 2, "e": 2, "d": 3}
+    assert list(graph.impact("a")) == ["b", "c", "e", "d"]
+    assert graph.impact("a", max_depth=2) == {"b": 1, "c": 2, "e": 2}
+    assert graph.impact("a", max_depth=0) == {}
+    assert graph.impact("d", "upstream", max_depth=1) == {"c": 1}
+
+
+def test_impact_rejects_unknown_service_and_direction():
+    graph = DependencyGraph({"a": {"b"}})
+    with pytest.raises(KeyError):
+        graph.impact("missing")
+    with pytest.raises(ValueError):
+        graph.impact("a", "sideways")
+
+
+def test_long_chain_needs_no_recursion():
+    count = 5 * sys.getrecursionlimit()
+    graph = DependencyGraph({f"s{i}": {f"s{i + 1}"} for i in range(count)})
+    assert len(graph.strongly_connected_components()) == count + 1
+    assert len(graph.layers()) == count + 1
@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yaml_parser import YamlParser
+
+SHARED_TOPICS = """topics:
+  payment:
+    event: ecommerce.payment.event
+  refund:
+    event: ecommerce.refund.event
+"""
+
+ORDER_CONFIG = """consumers:
+  order:
+    topics:
+      - ${topics.payment.event}
+      - ecommerce.cart.event
+listeners:
+  refunds: ${topics.refund.event}
+"""
+
+
+@pytest.fixture
+def repo(tmp_path):
+    config = tmp_path / "deployment" / "config"
+    for relpath, content in (("shared/topics.yml", SHARED_TOPICS), ("order/order.yml", ORDER_CONFIG)):
+        (config / relpath).parent.mkdir(parents=True, exist_ok=True)
+        (config / relpath).write_text(content, encoding="utf-8")
+    (tmp_path / "doc").mkdir()
+    return tmp_path
+
+
+def subscriptions(parser):
+    return {name: sorted(topics.subscribes) for name, topics in parser.microservice_topics_map.items()}
+
+
+EXPECTED = {"order": ["ecommerce.cart.event", "ecommerce.payment.event", "ecommerce.refund.event"]}
+
+
+def test_shared_topics_file_resolves_other_services(repo):
+    parser = YamlParser(str(repo))
+    parser.process_all_microservices()
+    assert subscriptions(parser) == EXPECTED
+
+
+@pytest.mark.parametrize("order", [
+    ["shared/topics.yml", "order/order.yml"],
+    ["order/order.yml", "shared/topics.yml"],
+])
+def test_single_file_processing_does_not_depend_on_call_order(repo, order):
+    parser = YamlParser(str(repo))
+    for relpath in order:
+        parser.process_subscription_config(str(repo / "deployment" / "config" / relpath))
+    assert subscriptions(parser) == EXPECTED
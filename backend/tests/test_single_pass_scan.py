@@ -0,0 +1,239 @@
+"""The single-pass config and doc scanners against the multi-pass extraction they replaced.
+
+The legacy_* functions are the original YamlParser helpers, kept here as
+the reference; benchmarks/bench_config_scan.py and
+benchmarks/bench_doc_classification.py time them against the scanners.
+"""
+import glob
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yaml_parser import YamlParser
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILES = sorted(glob.glob(os.path.join(TESTS_DIR, "test*", "deployment", "config", "**", "*.y*ml"),
+                             recursive=True))
+DOC_FILES = sorted(glob.glob(os.path.join(TESTS_DIR, "test*", "doc", "**", "*.y*ml"), recursive=True))
+
+TRICKY_CONFIG = """spring:
+  kafka:
+    topics:
+      ignored:
+        event: not.a.definition
+topics:
+  order:
+    created:
+      event: ecommerce.order.created.event
+    event: ecommerce.order.event
+  payment:
+    event: ecommerce.payment.event
+consumers:
+  billing:
+    topics:
+      - ${topics.order.created.event}
+      - ecommerce.cart.event
+    group-id: billing
+  topics:
+    - ecommerce.loose.event
+listeners:
+  a: ${topics.payment.event} and ${topics.unknown.event}
+  b: ${topics.order.created.event}
+"""
+
+TRICKY_DOC = """openapi: 3.0.0
+paths:
+  /orders:
+    post:
+      tags:
+        - Domain Event
+      description: |
+        **topic:** `ecommerce.order.created`
+  /internal:
+    post:
+      tags:
+        - Internal
+      description: |
+        **Topic:** `ecommerce.internal.audit.event`
+        **topic:** `ecommerce.internal.audit`
+"""
+
+
+def legacy_build_topic_map(lines, topic_map):
+    """Extract topic definitions from the topics section, preserving full nested path"""
+    in_topic_definition_section = False
+    topics_indent = None
+    # Stack of tuples: (indent, key)
+    path_stack = []
+
+    for raw_line in lines:
+        stripped = raw_line.strip()
+        indent = len(raw_line) - len(raw_line.lstrip(' '))
+
+        if not stripped:
+            continue
+
+        if stripped.startswith("spring:"):
+            in_topic_definition_section = False
+            topics_indent = None
+            path_stack = []
+            continue
+
+        if stripped == "topics:":
+            in_topic_definition_section = True
+            topics_indent = indent
+            path_stack = []
+            continue
+
+        if not in_topic_definition_section:
+            continue
+
+        # Exit section when indentation goes back to or above topics level
+        if indent <= (topics_indent or 0):
+            in_topic_definition_section = False
+            topics_indent = None
+            path_stack = []
+            continue
+
+        # Maintain nested key stack (lines that end with ':')
+        if stripped.endswith(":"):
+            key = stripped[:-1].strip()
+            # Pop until current indent is greater than top
+            while path_stack and indent <= path_stack[-1][0]:
+                path_stack.pop()
+            path_stack.append((indent, key))
+            continue
+
+        # Map event definitions to their full topic variable path
+        if "event:" in stripped:
+            topic_path = stripped.split(":", 1)[1].strip()
+            keys_only = [k for _, k in path_stack]
+            full_var = "topics." + (".".join(keys_only + ["event"]) if keys_only else "event")
+            topic_map[full_var] = topic_path
+
+
+def legacy_extract_consumed_topics(lines, consumed_topics):
+    """Extract topics from consumers section"""
+    in_consumer_section = False
+    in_topics_section = False
+    consumers_indent = None
+    topics_indent = None
+
+    for raw_line in lines:
+        stripped = raw_line.strip()
+        indent = len(raw_line) - len(raw_line.lstrip(' '))
+
+        if stripped.startswith("consumers:"):
+            in_consumer_section = True
+            consumers_indent = indent
+            in_topics_section = False
+            topics_indent = None
+            continue
+
+        if in_consumer_section:
+            # Exit consumers section if indentation goes back
+            if (stripped and consumers_indent is not None and indent <= consumers_indent
+                    and not stripped.startswith("consumers:")):
+                in_consumer_section = False
+                in_topics_section = False
+                topics_indent = None
+                # do not continue; evaluate line in outer loop context
+
+            if stripped.startswith("topics:"):
+                in_topics_section = True
+                topics_indent = indent
+                continue
+
+            if in_topics_section:
+                # Exit topics section if indentation goes back
+                if (stripped and topics_indent is not None and indent <= topics_indent
+                        and not stripped.startswith("-")):
+                    in_topics_section = False
+                elif stripped.startswith("-"):
+                    consumed_topics.append(stripped[1:].strip())
+
+
+def legacy_extract_placeholder_topics(content, topic_map, consumed_topics):
+    """Extract topics from ${topics.xxx.event} placeholders"""
+    for topic_match in YamlParser.PLACEHOLDER_PATTERN.finditer(content):
+        topic_key = topic_match.group(1)[2:-1]  # Remove ${ and }
+        actual_topic = topic_map.get(topic_key, topic_key)
+        if actual_topic and actual_topic not in consumed_topics:
+            consumed_topics.append(actual_topic)
+
+
+def legacy_config_scan(content):
+    """(topic_map, consumed_topics) of a config file, three passes over it"""
+    topic_map = {}
+    consumed_topics = []
+    lines = content.splitlines()
+    legacy_build_topic_map(lines, topic_map)
+    legacy_extract_consumed_topics(lines, consumed_topics)
+    legacy_extract_placeholder_topics(content, topic_map, consumed_topics)
+    return topic_map, consumed_topics
+
+
+def legacy_is_domain_event_topic(content, topic_position):
+    """Check if topic is a domain event by examining surrounding context"""
+    lines_before = content[:topic_position].split('\n')
+    lines_after = content[topic_position:].split('\n')
+
+    # Check the path/endpoint context (lines before)
+    for i in range(len(lines_before) - 1, max(-1, len(lines_before) - 10), -1):
+        # Look for path definitions that might indicate events
+        if YamlParser.DOC_PATH_PATTERN.match(lines_before[i]):
+            # Found a path, now look for tags section
+            combined_lines = lines_before[i:] + lines_after[:20]  # Look ahead a bit
+
+            in_tags_section = False
+            for line_text in combined_lines:
+                line_stripped = line_text.strip()
+
+                if line_stripped == "tags:":
+                    in_tags_section = True
+                    continue
+
+                if in_tags_section:
+                    if line_text and not line_text.startswith((' ', '\t')):
+                        break
+                    lowered = line_stripped.lower()
+                    if 'domainevent' in lowered.replace(' ', '') or 'domain event' in lowered:
+                        return True
+            break
+
+    # Fallback: if topic ends with .event, likely a domain event
+    lines_around_topic = lines_after[0] if lines_after else ""
+    return '.event' in lines_around_topic
+
+
+def legacy_doc_topics(content):
+    """[(topic, is_domain_event), ...] of a doc, classifying each match on its own"""
+    return [
+        (match.group(1), legacy_is_domain_event_topic(content, match.start()))
+        for match in YamlParser.DOC_TOPIC_PATTERN.finditer(content)
+    ]
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def single_pass_config_scan(content):
+    topic_map = {}
+    consumed_topics = []
+    YamlParser("")._scan_config_lines(content.splitlines(), topic_map, consumed_topics)
+    return topic_map, consumed_topics
+
+
+@pytest.mark.parametrize("content", [TRICKY_CONFIG] + [read(path) for path in CONFIG_FILES])
+def test_config_scan_matches_three_passes(content):
+    assert single_pass_config_scan(content) == legacy_config_scan(content)
+
+
+@pytest.mark.parametrize("content", [TRICKY_DOC] + [read(path) for path in DOC_FILES])
+def test_doc_classification_matches_per_match_scan(content):
+    assert YamlParser("")._classify_doc_topics(content) == legacy_doc_topics(content)
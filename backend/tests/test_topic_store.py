@@ -0,0 +1,46 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from topic_store import TOPIC_TABLE, MicroserviceTopics, TopicTable
+from yaml_parser import YamlParser
+
+CONFIG = """consumers:
+  {name}:
+    topics:
+      - ecommerce.shared.event
+      - ecommerce.{name}.event
+"""
+
+
+def test_sets_convert_into_their_own_table():
+    table = TopicTable()
+    topics = MicroserviceTopics(table)
+    topics.subscribes = MicroserviceTopics().subscribes | {"a.b.event"}
+    topics.produces = ["a.c.event"]
+    assert sorted(topics.subscribes) == ["a.b.event"]
+    assert len(table) == 2
+    assert TOPIC_TABLE.lookup("a.c.event") is None
+
+
+def test_watched_updates_compact_the_topic_table(tmp_path, monkeypatch):
+    monkeypatch.setattr(YamlParser, "MIN_COMPACTED_TABLE_SIZE", 4)
+    config = tmp_path / "deployment" / "config"
+    config.mkdir(parents=True)
+    (tmp_path / "doc").mkdir()
+    (config / "keep.yml").write_text(CONFIG.format(name="keep"), encoding="utf-8")
+    parser = YamlParser(str(tmp_path))
+    parser.process_all_microservices()
+
+    for i in range(50):
+        path = config / f"temp{i}.yml"
+        path.write_text(CONFIG.format(name=f"temp{i}"), encoding="utf-8")
+        parser.apply_file_changes([str(path)])
+        path.unlink()
+        parser.apply_file_changes([str(path)])
+
+    assert list(parser.microservice_topics_map) == ["keep"]
+    assert sorted(parser.microservice_topics_map["keep"].subscribes) == ["ecommerce.keep.event",
+                                                                         "ecommerce.shared.event"]
+    assert len(parser.topic_table) <= 8
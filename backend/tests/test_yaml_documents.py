@@ -0,0 +1,44 @@
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yaml_documents import iter_yaml_documents, split_document_marker
+from yaml_parser import YamlParser
+
+CONFIG = """consumers:
+  c:
+    topics:
+      - a.b.c
+--- ${topics.m.n.event}
+...\t${topics.x.y.event}
+---
+"""
+
+
+def test_split_document_marker():
+    assert split_document_marker("---") == ""
+    assert split_document_marker("--- ") == ""
+    assert split_document_marker("--- ${topics.m.n.event}") == "${topics.m.n.event}"
+    assert split_document_marker("...\t # end") == "# end"
+    assert split_document_marker("----") is None
+    assert split_document_marker("  ---") is None
+
+
+def test_marker_line_content_starts_next_document():
+    documents = list(iter_yaml_documents(io.StringIO(CONFIG), block_size=7))
+    assert documents == [
+        ["consumers:", "  c:", "    topics:", "      - a.b.c"],
+        ["${topics.m.n.event}"],
+        ["${topics.x.y.event}"],
+    ]
+
+
+def test_streamed_config_matches_whole_file(tmp_path):
+    filepath = tmp_path / "svc-service.yml"
+    filepath.write_text(CONFIG, encoding="utf-8")
+    whole = YamlParser("", stream_min_bytes=float("inf"))._parse_subscription_config(str(filepath))
+    streamed = YamlParser("", stream_min_bytes=0)._parse_subscription_config(str(filepath))
+    assert streamed == whole
+    assert streamed[2] == ["a.b.c", "topics.m.n.event", "topics.x.y.event"]
@@ -0,0 +1,88 @@
+import re
+
+# A placeholder key as left in consumed topics when its file does not define it
+PLACEHOLDER_KEY_PATTERN = re.compile(r"topics\.[\w.-]+\.event")
+
+# Slot of a trie node holding the value defined at that path
+_VALUE = None
+
+
+def placeholder_key(value):
+    """The key inside a ${topics...} placeholder, or None if value is not one"""
+    if value.startswith("${topics.") and value.endswith("}"):
+        return value[2:-1]
+    return None
+
+
+def is_placeholder_key(topic):
+    return topic.startswith("topics.") and PLACEHOLDER_KEY_PATTERN.fullmatch(topic) is not None
+
+
+class TopicDefinitionIndex:
+    """Repo-wide index of topic definitions (topics.<path>.event -> topic) from every config file.
+
+    Keys are stored in a trie over their dotted path segments, so a lookup
+    costs one step per segment. A definition whose value is itself a
+    ${topics...} placeholder is followed to the final topic; resolved chains
+    are memoized until the next add(). When several files define the same
+    key the first one added wins.
+    """
+
+    def __init__(self):
+        self._root = {}
+        self._resolved = {}
+        self.definition_count = 0
+
+    @classmethod
+    def from_topic_maps(cls, topic_maps):
+        index = cls()
+        for topic_map in topic_maps:
+            index.add(topic_map)
+        return index
+
+    def add(self, topic_map):
+        """Index the definitions of one file's topic_map"""
+        for key, value in topic_map.items():
+            node = self._root
+            for segment in key.split("."):
+                node = node.setdefault(segment, {})
+            if _VALUE not in node:
+                node[_VALUE] = value
+                self.definition_count += 1
+        self._resolved.clear()
+
+    def lookup(self, key):
+        """The value defined for key, unresolved, or None"""
+        node = self._root
+        for segment in key.split("."):
+            node = node.get(segment)
+            if node is None:
+                return None
+        return node.get(_VALUE)
+
+    def resolve(self, key):
+        """The topic key finally stands for, following chained placeholders.
+
+        Returns None when key (or a key along its chain) is undefined or the
+        chain loops.
+        """
+        if key in self._resolved:
+            return self._resolved[key]
+        chain = []
+        current = key
+        while True:
+            if current in self._resolved:
+                value = self._resolved[current]
+                break
+            if current in chain:
+                value = None
+                break
+            chain.append(current)
+            value = self.lookup(current)
+            next_key = placeholder_key(value) if value else None
+            if next_key is None:
+                break
+            current = next_key
+        for chained_key in chain:
+            self._resolved[chained_key] = value
+        return value
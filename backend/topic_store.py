@@ -0,0 +1,146 @@
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableSet
+
+
+class TopicTable:
+    """Intern table mapping each distinct topic string to a small integer ID.
+
+    Every topic of the sets using the table is stored once here; the sets
+    only keep the IDs. A table only grows, so each YamlParser has its own,
+    dropped with the parser and compacted when a long-lived (watched)
+    parser's services change.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._topics = []
+        self._lock = threading.Lock()
+
+    def intern(self, topic):
+        topic_id = self._ids.get(topic)
+        if topic_id is None:
+            with self._lock:
+                topic_id = self._ids.get(topic)
+                if topic_id is None:
+                    topic_id = len(self._topics)
+                    self._topics.append(topic)
+                    self._ids[topic] = topic_id
+        return topic_id
+
+    def lookup(self, topic):
+        """ID of topic, or None if it was never interned"""
+        return self._ids.get(topic)
+
+    def topic(self, topic_id):
+        return self._topics[topic_id]
+
+    def __len__(self):
+        return len(self._topics)
+
+
+# Default table for TopicSets created outside a parser
+TOPIC_TABLE = TopicTable()
+
+
+class TopicSet(MutableSet):
+    """Set of topic strings stored as a sorted array of interned topic IDs.
+
+    Behaves like a set of str for membership, iteration (in ID order), len,
+    add/discard/update and comparisons, at 4 bytes per member.
+    """
+
+    __slots__ = ("_ids", "_table")
+
+    def __init__(self, topics=(), table=TOPIC_TABLE):
+        self._table = table
+        self._ids = array("I")
+        if topics:
+            self.update(topics)
+
+    def _index(self, topic_id):
+        i = bisect_left(self._ids, topic_id)
+        return i, i < len(self._ids) and self._ids[i] == topic_id
+
+    def __contains__(self, topic):
+        topic_id = self._table.lookup(topic)
+        return topic_id is not None and self._index(topic_id)[1]
+
+    def __iter__(self):
+        topic = self._table.topic
+        return (topic(topic_id) for topic_id in self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, topic):
+        topic_id = self._table.intern(topic)
+        i, present = self._index(topic_id)
+        if not present:
+            self._ids.insert(i, topic_id)
+
+    def discard(self, topic):
+        topic_id = self._table.lookup(topic)
+        if topic_id is not None:
+            i, present = self._index(topic_id)
+            if present:
+                del self._ids[i]
+
+    def update(self, topics):
+        intern = self._table.intern
+        merged = set(self._ids)
+        merged.update(intern(topic) for topic in topics)
+        self._ids = array("I", sorted(merged))
+
+    def clear(self):
+        self._ids = array("I")
+
+    def ids(self):
+        """The member topic IDs, ascending"""
+        return self._ids
+
+    def __repr__(self):
+        return f"TopicSet({sorted(self)!r})"
+
+
+class MicroserviceTopics:
+    """Topics a microservice produces and subscribes to.
+
+    produces and subscribes are TopicSets over table; assigning any iterable
+    of topic strings to either converts it (TopicSets of another table too).
+    """
+
+    __slots__ = ("_produces", "_subscribes", "_table")
+
+    def __init__(self, table=TOPIC_TABLE):
+        self._table = table
+        self._produces = TopicSet(table=table)
+        self._subscribes = TopicSet(table=table)
+
+    def _topic_set(self, topics):
+        if isinstance(topics, TopicSet) and topics._table is self._table:
+            return topics
+        return TopicSet(topics, self._table)
+
+    @property
+    def produces(self):
+        return self._produces
+
+    @produces.setter
+    def produces(self, topics):
+        self._produces = self._topic_set(topics)
+
+    @property
+    def subscribes(self):
+        return self._subscribes
+
+    @subscribes.setter
+    def subscribes(self, topics):
+        self._subscribes = self._topic_set(topics)
+
+    def move_to(self, table):
+        """Re-intern both sets into table"""
+        self._table = table
+        self._produces = TopicSet(self._produces, table)
+        self._subscribes = TopicSet(self._subscribes, table)
@@ -0,0 +1,20 @@
+"""Production WSGI entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Importing this module warms the service up (see app.warmup). With the
+bundled gunicorn.conf.py the import happens once in the master process, so
+every forked worker starts with compiled patterns, a filled result cache and
+the on-disk parse cache that all workers share. Unless PARSE_CACHE_DIR is
+set, that cache lives in the system temp directory.
+"""
+import os
+import tempfile
+
+os.environ.setdefault("PARSE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "yaml-parser-cache"))
+
+from app import app, warmup
+
+warmup()
+
+application = app
@@ -0,0 +1,57 @@
+# Characters str.splitlines() ends a line at
+LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+
+def split_document_marker(line):
+    """The rest of a line starting with a YAML document start (---) or end (...) marker.
+
+    Returns "" for a bare marker, the text after the marker for a line such as
+    "--- !tag" and None when line does not start with a marker.
+    """
+    if line[:3] in ("---", "...") and (len(line) == 3 or line[3] in " \t"):
+        return line[4:].lstrip(" \t")
+    return None
+
+
+def iter_yaml_documents(stream, block_size=1 << 20):
+    """Split a text stream, such as an open file, into YAML documents.
+
+    Yields each document as a list of lines without line endings, split as
+    str.splitlines() splits the whole text; markers are dropped, text after a
+    marker on its line starts the next document, and empty documents are
+    skipped. The stream is read in blocks of block_size
+    characters, so only one block and the current document are held in memory.
+    """
+    document = []
+    partial = ""
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        while block[-1] == "\r":
+            # Keep a \r\n pair in one block
+            extra = stream.read(1)
+            if not extra:
+                break
+            block += extra
+        lines = (partial + block).splitlines()
+        # The last line continues in the next block unless the block ends one
+        partial = "" if block[-1] in LINE_BREAKS else lines.pop()
+        for line in lines:
+            rest = split_document_marker(line)
+            if rest is None:
+                document.append(line)
+                continue
+            if document:
+                yield document
+            document = [rest] if rest else []
+    if partial:
+        rest = split_document_marker(partial)
+        if rest is None:
+            document.append(partial)
+        else:
+            if document:
+                yield document
+            document = [rest] if rest else []
+    if document:
+        yield document
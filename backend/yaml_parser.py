@@ -1,34 +1,297 @@
+import asyncio
+import logging
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 
-class MicroserviceTopics:
-    def __init__(self):
-        self.produces = set()
-        self.subscribes = set()
+from async_reader import iter_file_contents
+from discovery import DEFAULT_DISCOVERY
+from metrics import NULL_METRICS, ParseMetrics
+from parse_cache import content_digest
+from mmap_scan import SECTION_START_PATTERN, is_plain_ascii, line_window, mapped_file, section_end
+from service_index import ServiceNameIndex, name_words, normalize_service_name
+from topic_index import TopicDefinitionIndex, is_placeholder_key, placeholder_key
+from topic_store import MicroserviceTopics, TopicTable
+from yaml_documents import iter_yaml_documents
+
+logger = logging.getLogger(__name__)
+
+# Patterns used on hot paths, compiled once at import
+ENV_SUFFIX_PATTERN = re.compile(r"-(dev|runtime-config|persistence)$", re.IGNORECASE)
+SERVICE_SUFFIX_PATTERN = re.compile(r"-service$", re.IGNORECASE)
+DOC_FILENAME_SUFFIX_PATTERN = re.compile(r'\s+(api|service|openapi|swagger)$')
+TITLE_PATTERN = re.compile(r'title:\s*([^\n]+)', re.IGNORECASE)
+TITLE_SUFFIX_PATTERN = re.compile(r'\s+(api|service)$', re.IGNORECASE)
+CAMEL_BOUNDARY_PATTERN = re.compile(r'([a-z0-9])([A-Z])')
+ACRONYM_BOUNDARY_PATTERN = re.compile(r'([A-Z])([A-Z][a-z])')
+NON_ALNUM_PATTERN = re.compile(r'[^a-z0-9]')
+# Bytes twins of the YamlParser patterns, for the mmap scanning mode
+TITLE_BYTES_PATTERN = re.compile(rb'title:\s*([^\n]+)', re.IGNORECASE)
+DOC_TOPIC_BYTES_PATTERN = re.compile(rb"\*\*[Tt]opic:\*\*\s*`([^`]+)`", re.IGNORECASE)
+PLACEHOLDER_BYTES_PATTERN = re.compile(rb"(\$\{topics\.[\w.-]+\.event\})")
+
+GENERIC_CONFIG_NAMES = frozenset({"application", "config", "settings", "dockerfile", "topics"})
+
+
+@lru_cache(maxsize=65536)
+def _normalize_topic_name(name):
+    # Better camelCase to hyphen conversion
+    # Handle sequences like "c2ResourceManagement" -> "c2-resource-management"
+    # First pass: insert hyphens before uppercase letters that follow lowercase/digits
+    name = CAMEL_BOUNDARY_PATTERN.sub(r'\1-\2', name)
+    # Second pass: handle consecutive uppercase letters like "XMLHttpRequest" -> "XML-Http-Request"
+    name = ACRONYM_BOUNDARY_PATTERN.sub(r'\1-\2', name)
+    # Remove all separators and convert to lowercase
+    lowered = name.lower()
+    normalized = NON_ALNUM_PATTERN.sub('', lowered)
+
+    # Debug output for c2ResourceManagement case
+    if 'c2resource' in lowered or 'c2-resource' in lowered:
+        logger.debug("NORMALIZE: '%s' -> '%s'", name, normalized)
+
+    return normalized
 
 class YamlParser:
     TOPIC_PATTERN = re.compile(r"([^.]+)\.([^.]+)\.(.*?)(?:\.event|$)")
     DOC_TOPIC_PATTERN = re.compile(r"\*\*[Tt]opic:\*\*\s*`([^`]+)`", re.IGNORECASE)
+    DOC_PATH_PATTERN = re.compile(r'^\s*/[^:]*:\s*$')
+    # Same language as the legacy r"(\$\{topics\.[\w.-]+(?:\.[\w.-]+)*\.event\})" without the nested repeat
+    PLACEHOLDER_PATTERN = re.compile(r"(\$\{topics\.[\w.-]+\.event\})")
+
+    # Below this many files a process pool costs more than it saves
+    PARALLEL_MIN_FILES = 32
+
+    # Config files of at least this many bytes are read one YAML document at a time
+    STREAM_MIN_BYTES = 32 * 1024 * 1024
 
-    def __init__(self, base_dir):
+    def __init__(self, base_dir, workers=1, cache=None, metrics=None, use_mmap=False, executor=None,
+                 discovery=None, stream_min_bytes=None):
         self.base_directory = base_dir
         self.config_directory = os.path.join(base_dir, "deployment", "config")
         self.doc_directory = os.path.join(base_dir, "doc")
         self.microservice_topics_map = {}
+        # Interns this parser's topics; see _compact_topic_table
+        self.topic_table = TopicTable()
+        self._compacted_table_size = 0
+        # Number of worker processes for per-file parsing (0 = one per CPU)
+        self.workers = workers
+        # Optional parse_cache.ParseCache reused across scans
+        self.cache = cache
+        # Bumped on every change to microservice_topics_map; keys the graph cache
+        self.topics_version = 0
+        self._graph_cache = None
+        # Per-file extraction results, kept so apply_file_changes can update
+        # only the services a changed file contributes to
+        self.config_file_results = {}
+        self.doc_file_results = {}
+        # Topic definitions of every config file; placeholders a file does not
+        # define itself are resolved here once all configs are scanned
+        self.topic_index = TopicDefinitionIndex()
+        self._graph_keys = None
+        # Optional metrics.ParseMetrics; the null stand-in makes every call a no-op
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        # Scan files as memory-mapped bytes, decoding only the matched slices
+        self.use_mmap = use_mmap
+        # Optional process pool shared with other parsers; otherwise the parser
+        # starts its own on first use and keeps it until close()
+        self.executor = executor
+        self._pool = None
+        # discovery.Discovery deciding which files are scanned (ignore globs,
+        # .gitignore, symlinks) and keeping their inventory between scans
+        self.discovery = discovery if discovery is not None else DEFAULT_DISCOVERY
+        # Config files this large are streamed, so memory is bounded by their
+        # largest document instead of their size
+        self.stream_min_bytes = stream_min_bytes if stream_min_bytes is not None else self.STREAM_MIN_BYTES
 
-    def process_all_microservices(self):
-        self.process_subscription_configs()
-        self.process_producer_docs()
+    def process_all_microservices(self, workers=None):
+        # Both stages share one worker pool, shut down once the scan is done
+        try:
+            self.process_subscription_configs(workers)
+            self.process_producer_docs(workers)
+        finally:
+            self.close()
+
+    def close(self):
+        """Shut down the worker pool the parser started, if any; a later parse starts a new one"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    async def process_all_microservices_async(self, concurrency=16):
+        """Async process_all_microservices for high-latency (e.g. NFS) file systems.
+
+        Files are read on a pool of concurrency threads, ahead of the
+        extraction, which runs on the event loop. Each doc is read at most once,
+        for both title matching and topic extraction. The results are the same
+        as process_all_microservices().
+        """
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="yaml-read") as executor:
+            await self.process_subscription_configs_async(concurrency, executor)
+            await self.process_producer_docs_async(concurrency, executor)
 
-    def process_subscription_configs(self):
+    def process_subscription_configs(self, workers=None):
         if not os.path.isdir(self.config_directory):
             raise IOError(f"Config directory does not exist: {self.config_directory}")
-        
-        for root, _, files in os.walk(self.config_directory):
-            for filename in files:
-                if filename.endswith((".yaml", ".yml")):
-                    filepath = os.path.join(root, filename)
-                    self.process_subscription_config(filepath)
+
+        with self.metrics.stage("discover_configs"):
+            filepaths = self._collect_yaml_files(self.config_directory)
+        with self.metrics.stage("parse_configs"):
+            results = self._map_files("_parse_subscription_config", filepaths, workers)
+            for filepath, result in zip(filepaths, results):
+                if result:
+                    self.config_file_results[filepath] = result
+        self._add_config_results(zip(filepaths, results))
+
+    async def process_subscription_configs_async(self, concurrency=16, executor=None):
+        if not os.path.isdir(self.config_directory):
+            raise IOError(f"Config directory does not exist: {self.config_directory}")
+
+        loop = asyncio.get_running_loop()
+        with self.metrics.stage("discover_configs"):
+            filepaths = await loop.run_in_executor(executor, self._collect_yaml_files, self.config_directory)
+
+        with self.metrics.stage("parse_configs"):
+            self.metrics.count("files_scanned", len(filepaths))
+            kind = "_parse_subscription_config"
+            results = [self._cached_result(kind, filepath) for filepath in filepaths]
+            to_read = [filepath for filepath, result in zip(filepaths, results) if result is None]
+            parsed = {}
+            contents = iter_file_contents(to_read, concurrency, executor, max_size=self.stream_min_bytes - 1,
+                                          digest=self._cache_digest)
+            async for filepath, content, st, file_digest, error in contents:
+                if error is not None:
+                    print(f"Error processing config file {filepath}: {error}")
+                    continue
+                if content is None:
+                    # Too large to read whole: stream it
+                    result = self._parse_subscription_config(filepath)
+                else:
+                    self.metrics.count("bytes_read", st.st_size)
+                    result = self._parse_subscription_content(filepath, content)
+                parsed[filepath] = result
+                self._store_result(kind, filepath, result, st, file_digest)
+            if self.cache is not None:
+                self.cache.flush()
+
+            for index, filepath in enumerate(filepaths):
+                if results[index] is None:
+                    results[index] = parsed.get(filepath)
+                if results[index]:
+                    self.config_file_results[filepath] = results[index]
+        self._add_config_results(zip(filepaths, results))
+
+    def _add_config_results(self, results):
+        """Index every file's topic definitions, then resolve and merge the consumed topics.
+
+        Services merged before whose placeholders go through the index are
+        resolved again, so the outcome does not depend on the order in which
+        config files were added.
+        """
+        with self.metrics.stage("resolve_placeholders"):
+            self._index_topic_definitions()
+            stale = {
+                service_name
+                for service_name, topic_map, consumed_topics in self.config_file_results.values()
+                if service_name in self.microservice_topics_map and consumed_topics
+                and self._uses_topic_index(topic_map, consumed_topics)
+            }
+            if stale:
+                # Rebuilt from config_file_results, which already holds the new results
+                self._rebuild_service_entries(stale)
+            for _, result in results:
+                if result and result[0] not in stale:
+                    self._add_subscribed_topics(*result)
+
+    def _index_topic_definitions(self):
+        """Rebuild topic_index from config_file_results, in path order so the winner
+        of a duplicate definition does not depend on scan history"""
+        self.topic_index = TopicDefinitionIndex.from_topic_maps(
+            self.config_file_results[filepath][1] for filepath in sorted(self.config_file_results))
+
+    def _cached_result(self, kind, filepath):
+        return self.cache.get(kind, filepath) if self.cache is not None else None
+
+    def _store_result(self, kind, filepath, result, st, digest=None):
+        if self.cache is not None and result is not None:
+            self.cache.put(kind, filepath, result, st, digest)
+
+    @property
+    def _cache_digest(self):
+        """Digest to take of file bytes read for parsing, or None without a cache"""
+        return content_digest if self.cache is not None else None
+
+    def _collect_yaml_files(self, directory):
+        """List the YAML files under directory that discovery keeps, in os.walk order"""
+        return self.discovery.yaml_files(directory, self.base_directory)
+
+    def _resolve_workers(self, workers):
+        if workers is None:
+            workers = self.workers
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        return max(1, workers)
+
+    def _map_files(self, method_name, filepaths, workers=None):
+        """Apply a per-file parse method to filepaths, in order.
+
+        The method's result must depend only on the file's content. Results
+        found in the parse cache are reused; the remaining files are parsed
+        serially for a single worker or small batches, otherwise in chunks on a
+        process pool. Results always come back in filepaths order so merging
+        is deterministic.
+        """
+        self.metrics.count("files_scanned", len(filepaths))
+        if self.cache is None:
+            return self._parse_files(method_name, filepaths, workers)
+
+        results = [None] * len(filepaths)
+        pending = []
+        for i, filepath in enumerate(filepaths):
+            cached = self.cache.get(method_name, filepath)
+            if cached is not None:
+                results[i] = cached
+            else:
+                try:
+                    pending.append((i, filepath, os.stat(filepath)))
+                except OSError:
+                    pending.append((i, filepath, None))
+
+        parsed = self._parse_files(method_name, [filepath for _, filepath, _ in pending], workers)
+        for (i, filepath, st), result in zip(pending, parsed):
+            results[i] = result
+            if result is not None and st is not None:
+                self.cache.put(method_name, filepath, result, st)
+        self.cache.flush()
+        return results
+
+    def _parse_files(self, method_name, filepaths, workers=None):
+        workers = self._resolve_workers(workers)
+        if workers <= 1 or len(filepaths) < self.PARALLEL_MIN_FILES:
+            parse = getattr(self, method_name)
+            return [parse(filepath) for filepath in filepaths]
+
+        chunk_size = max(1, -(-len(filepaths) // (workers * 4)))
+        chunks = [filepaths[i:i + chunk_size] for i in range(0, len(filepaths), chunk_size)]
+        results = []
+        executor = self._process_pool(workers)
+        futures = [executor.submit(_parse_file_chunk, method_name, chunk, self.metrics.enabled, self.use_mmap,
+                                   self.stream_min_bytes)
+                   for chunk in chunks]
+        for future in futures:
+            chunk_results, counters = future.result()
+            results.extend(chunk_results)
+            if counters:
+                self.metrics.merge_counters(counters)
+        return results
+
+    def _process_pool(self, workers):
+        """The shared executor, else the parser's own pool, started with workers processes on first use"""
+        if self.executor is not None:
+            return self.executor
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=workers)
+        return self._pool
 
     def _derive_service_name(self, filepath: str) -> str:
         """Derive microservice name from filename or containing folder.
@@ -39,11 +302,12 @@ class YamlParser:
         """
         base_name = os.path.splitext(os.path.basename(filepath))[0]
         # Remove trailing known suffixes
-        base_name = re.sub(r"-(dev|runtime-config|persistence)$", "", base_name, flags=re.IGNORECASE)
-        base_name = re.sub(r"-service$", "", base_name, flags=re.IGNORECASE)
+        if "-" in base_name:
+            base_name = ENV_SUFFIX_PATTERN.sub("", base_name)
+            base_name = SERVICE_SUFFIX_PATTERN.sub("", base_name)
 
         # Fallbacks for generic filenames
-        if base_name.lower() in {"application", "config", "settings", "dockerfile", "topics"} or not base_name:
+        if not base_name or base_name.lower() in GENERIC_CONFIG_NAMES:
             base_name = os.path.basename(os.path.dirname(filepath))
 
         # Normalize underscores to hyphens for consistency
@@ -51,345 +315,568 @@ class YamlParser:
         return base_name
 
     def process_subscription_config(self, filepath):
-        filename = os.path.basename(filepath)
+        result = self._parse_subscription_config(filepath)
+        if result:
+            self.config_file_results[filepath] = result
+        self._add_config_results([(filepath, result)])
+
+    def _parse_subscription_config(self, filepath):
+        """Extract (service_name, topic_map, consumed_topics) from a config file.
+
+        Does not touch parser state, so it can run in a worker process.
+        Returns None if the file cannot be read.
+        """
+        if self.use_mmap:
+            try:
+                with mapped_file(filepath) as buf:
+                    if buf is not None and is_plain_ascii(buf):
+                        self.metrics.count("bytes_read", len(buf))
+                        topic_map = {}
+                        consumed_topics = []
+                        self._scan_config_buffer(buf, topic_map, consumed_topics)
+                        return self._derive_service_name(filepath), topic_map, consumed_topics
+            except Exception as e:
+                print(f"Error processing config file {filepath}: {e}")
+                return None
+            # Empty or not plain ASCII: fall back to the text path
+
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                size = os.fstat(f.fileno()).st_size
+                self.metrics.count("bytes_read", size)
+                if size >= self.stream_min_bytes:
+                    return self._parse_subscription_stream(filepath, f)
+                content = f.read()
+        except Exception as e:
+            print(f"Error processing config file {filepath}: {e}")
+            return None
+        return self._parse_subscription_content(filepath, content)
+
+    def _parse_subscription_content(self, filepath, content):
+        """_parse_subscription_config for a config file whose content is already read"""
         service_name = self._derive_service_name(filepath)
-        
         consumed_topics = []
         topic_map = {}
 
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                content = f.read()
-                lines = content.splitlines()
+            # Topic definitions, consumer topics and placeholders in one walk
+            self._scan_config_lines(content.splitlines(), topic_map, consumed_topics)
+        except Exception as e:
+            print(f"Error processing config file {filepath}: {e}")
+            return None
 
-            # Build topic map from topic definitions
-            self._build_topic_map(lines, topic_map)
-            
-            # Extract consumed topics from consumers section
-            self._extract_consumed_topics(lines, consumed_topics)
-            
-            # Extract topics from placeholders using regex
-            self._extract_placeholder_topics(content, topic_map, consumed_topics)
+        return service_name, topic_map, consumed_topics
 
-            # Add consumed topics to microservice
-            if service_name and consumed_topics:
-                if service_name not in self.microservice_topics_map:
-                    self.microservice_topics_map[service_name] = MicroserviceTopics()
+    def _parse_subscription_stream(self, filepath, f):
+        """_parse_subscription_content for an open config file, one YAML document at a time.
 
-                for topic in consumed_topics:
-                    actual_topic = self._resolve_topic_placeholder(topic, topic_map)
-                    if actual_topic:
-                        self.microservice_topics_map[service_name].subscribes.add(actual_topic)
+        A document marker is an unindented line, so it ends every topics: and
+        consumers: section; scanning the documents separately and resolving
+        placeholders once at the end matches the whole-file scan.
+        """
+        topic_map = {}
+        consumed_topics = []
+        placeholder_keys = []
+        for document in iter_yaml_documents(f):
+            self._scan_config_sections(document, topic_map, consumed_topics, placeholder_keys)
+        self._append_placeholder_topics(placeholder_keys, topic_map, consumed_topics)
+        return self._derive_service_name(filepath), topic_map, consumed_topics
 
-        except Exception as e:
-            print(f"Error processing config file {filepath}: {e}")
+    def _count_bytes_read(self, f):
+        """Record a fully read file's size; skips the fstat when metrics are off"""
+        if self.metrics.enabled:
+            self.metrics.count("bytes_read", os.fstat(f.fileno()).st_size)
+
+    def _add_subscribed_topics(self, service_name, topic_map, consumed_topics):
+        """Merge a config file's consumed topics into the microservice map"""
+        if not (service_name and consumed_topics):
+            return
+
+        if service_name not in self.microservice_topics_map:
+            self.microservice_topics_map[service_name] = MicroserviceTopics(self.topic_table)
+        self.topics_version += 1
+
+        for topic in consumed_topics:
+            actual_topic = self._resolve_topic_placeholder(topic, topic_map)
+            if actual_topic:
+                self.microservice_topics_map[service_name].subscribes.add(actual_topic)
+
+    def _scan_config_lines(self, lines, topic_map, consumed_topics):
+        """Single-pass scan of a config file.
+
+        Runs the topic-definition, consumer-topic and placeholder extraction in
+        one walk over the lines. Produces the same topic_map and consumed_topics
+        as the three separate passes it replaced (kept as the reference in
+        tests/test_single_pass_scan.py).
+        """
+        # Placeholders are resolved after the walk, once topic_map is complete
+        placeholder_keys = []
+        self._scan_config_sections(lines, topic_map, consumed_topics, placeholder_keys)
+        self._append_placeholder_topics(placeholder_keys, topic_map, consumed_topics)
 
-    def _build_topic_map(self, lines, topic_map):
-        """Extract topic definitions from the topics section, preserving full nested path"""
+    def _scan_config_sections(self, lines, topic_map, consumed_topics, placeholder_keys=None):
+        """The line walk of _scan_config_lines; placeholders are only collected
+        into placeholder_keys when it is given"""
+        # topics: definition section state
         in_topic_definition_section = False
-        topics_indent = None
-        # Stack of tuples: (indent, key)
+        definition_indent = None
         path_stack = []
-        
-        for i, raw_line in enumerate(lines):
+        # consumers: -> topics: list state
+        in_consumer_section = False
+        in_topics_section = False
+        consumers_indent = None
+        topics_indent = None
+
+        for raw_line in lines:
             stripped = raw_line.strip()
-            indent = len(raw_line) - len(raw_line.lstrip(' '))
-            
             if not stripped:
                 continue
-            
+            indent = len(raw_line) - len(raw_line.lstrip(' '))
+
+            # Topic definitions
             if stripped.startswith("spring:"):
                 in_topic_definition_section = False
-                topics_indent = None
+                definition_indent = None
                 path_stack = []
-                continue
-            
-            if stripped == "topics:":
+            elif stripped == "topics:":
                 in_topic_definition_section = True
-                topics_indent = indent
-                path_stack = []
-                continue
-            
-            if not in_topic_definition_section:
-                continue
-            
-            # Exit section when indentation goes back to or above topics level
-            if indent <= (topics_indent or 0):
-                in_topic_definition_section = False
-                topics_indent = None
+                definition_indent = indent
                 path_stack = []
-                continue
-            
-            # Maintain nested key stack (lines that end with ':')
-            if stripped.endswith(":"):
-                key = stripped[:-1].strip()
-                # Pop until current indent is greater than top
-                while path_stack and indent <= path_stack[-1][0]:
-                    path_stack.pop()
-                path_stack.append((indent, key))
-                continue
-            
-            # Map event definitions to their full topic variable path
-            if "event:" in stripped:
-                # Extract the mapping value on the right of the first ':'
-                topic_path = stripped.split(":", 1)[1].strip()
-                # Build full path under topics
-                keys_only = [k for _, k in path_stack]
-                full_var = "topics." + (".".join(keys_only + ["event"]) if keys_only else "event")
-                topic_map[full_var] = topic_path
-        
-        # No explicit return; topic_map is mutated in place
+            elif in_topic_definition_section:
+                if indent <= (definition_indent or 0):
+                    in_topic_definition_section = False
+                    definition_indent = None
+                    path_stack = []
+                elif stripped.endswith(":"):
+                    key = stripped[:-1].strip()
+                    while path_stack and indent <= path_stack[-1][0]:
+                        path_stack.pop()
+                    path_stack.append((indent, key))
+                elif "event:" in stripped:
+                    topic_path = stripped.split(":", 1)[1].strip()
+                    keys_only = [k for _, k in path_stack]
+                    full_var = "topics." + (".".join(keys_only + ["event"]) if keys_only else "event")
+                    topic_map[full_var] = topic_path
 
-    def _find_parent_context(self, lines, current_index):
-        """Find parent context for topic definition (immediate parent key)"""
-        current_indent = len(lines[current_index]) - len(lines[current_index].lstrip(' '))
-        
-        for j in range(current_index - 1, -1, -1):
-            prev_line = lines[j]
-            prev_stripped = prev_line.strip()
-            prev_indent = len(prev_line) - len(prev_line.lstrip(' '))
-            
-            if prev_stripped.endswith(":") and prev_indent < current_indent:
-                # return the key without trailing ':'
-                return prev_stripped.rstrip(":")
-        return ""
-
-    def _extract_consumed_topics(self, lines, consumed_topics):
-        """Extract topics from consumers section"""
-        in_consumer_section = False
-        in_topics_section = False
-        consumers_indent = None
-        topics_indent = None
-        
-        for raw_line in lines:
-            stripped = raw_line.strip()
-            indent = len(raw_line) - len(raw_line.lstrip(' '))
-            
+            # Consumer topic lists
             if stripped.startswith("consumers:"):
                 in_consumer_section = True
                 consumers_indent = indent
                 in_topics_section = False
                 topics_indent = None
-                continue
-
-            if in_consumer_section:
-                # Exit consumers section if indentation goes back
-                if stripped and consumers_indent is not None and indent <= consumers_indent and not stripped.startswith("consumers:"):
+            elif in_consumer_section:
+                if consumers_indent is not None and indent <= consumers_indent:
                     in_consumer_section = False
                     in_topics_section = False
                     topics_indent = None
-                    # do not continue; evaluate line in outer loop context
-                
+
                 if stripped.startswith("topics:"):
                     in_topics_section = True
                     topics_indent = indent
-                    continue
-                
-                if in_topics_section:
-                    # Exit topics section if indentation goes back
-                    if stripped and topics_indent is not None and indent <= topics_indent and not stripped.startswith("-"):
+                elif in_topics_section:
+                    if topics_indent is not None and indent <= topics_indent and not stripped.startswith("-"):
                         in_topics_section = False
                     elif stripped.startswith("-"):
-                        topic = stripped[1:].strip()
-                        consumed_topics.append(topic)
-
-    def _extract_placeholder_topics(self, content, topic_map, consumed_topics):
-        """Extract topics from ${topics.xxx.event} placeholders"""
-        for topic_match in re.finditer(r"(\$\{topics\.[\w.-]+(?:\.[\w.-]+)*\.event\})", content):
-            topic_placeholder = topic_match.group(1)
-            topic_key = topic_placeholder[2:-1]  # Remove ${ and }
+                        consumed_topics.append(stripped[1:].strip())
+
+            # ${topics...event} placeholders (never span lines)
+            if placeholder_keys is not None and "${topics." in raw_line:
+                for topic_match in self.PLACEHOLDER_PATTERN.finditer(raw_line):
+                    placeholder_keys.append(topic_match.group(1)[2:-1])
+
+    def _append_placeholder_topics(self, placeholder_keys, topic_map, consumed_topics):
+        """Resolve placeholder keys against topic_map and append the new topics"""
+        self.metrics.count("regex_matches", len(placeholder_keys))
+        seen_topics = set(consumed_topics)
+        for topic_key in placeholder_keys:
             actual_topic = topic_map.get(topic_key, topic_key)
-            
-            if actual_topic and actual_topic not in consumed_topics:
+            if actual_topic and actual_topic not in seen_topics:
                 consumed_topics.append(actual_topic)
+                seen_topics.add(actual_topic)
+
+    def _scan_config_buffer(self, buf, topic_map, consumed_topics):
+        """_scan_config_lines over a plain-ASCII bytes buffer such as an mmap.
+
+        Lines outside topics: and consumers: sections never change the scan
+        state, so only those sections are located (by bytes regex), decoded and
+        walked. Each section runs until the next non-blank line indented no
+        deeper than its header, exactly where the line walk leaves it.
+        Placeholders are found by a bytes regex over the whole buffer.
+        """
+        placeholder_keys = [key[2:-1].decode("ascii") for key in PLACEHOLDER_BYTES_PATTERN.findall(buf)]
+
+        position = 0
+        while True:
+            match = SECTION_START_PATTERN.search(buf, position)
+            if match is None:
+                break
+            header = match.group(0)
+            start = match.start()
+            position = section_end(buf, start, len(header) - len(header.lstrip(b" ")))
+            self._scan_config_sections(buf[start:position].decode("ascii").splitlines(),
+                                       topic_map, consumed_topics)
+
+        self._append_placeholder_topics(placeholder_keys, topic_map, consumed_topics)
 
     def _resolve_topic_placeholder(self, topic, topic_map):
-        """Resolve topic placeholder to actual topic"""
+        """Resolve topic placeholder to actual topic.
+
+        Keys the file does not define itself, left as ${...} or as the bare
+        topics...event key, are looked up in the repo-wide topic_index.
+        """
         if topic.startswith("${") and topic.endswith("}"):
             topic_var = topic[2:-1]
-            return topic_map.get(topic_var, "")
+            return self._lookup_topic(topic_var, topic_map) or ""
+        if topic not in topic_map and is_placeholder_key(topic):
+            return self.topic_index.resolve(topic) or topic
         return topic
 
-    def process_producer_docs(self):
+    def _lookup_topic(self, key, topic_map):
+        """The topic key stands for: the file's own definition first, then the
+        index; definitions that are placeholders themselves are followed, each
+        step again preferring the file's own definition. None if the chain loops."""
+        seen = set()
+        while key not in seen:
+            seen.add(key)
+            value = topic_map.get(key)
+            if value is None:
+                return self.topic_index.resolve(key)
+            chained_key = placeholder_key(value)
+            if chained_key is None:
+                return value
+            key = chained_key
+        return None
+
+    def _uses_topic_index(self, topic_map, consumed_topics):
+        """Whether resolving consumed_topics needs definitions from other files"""
+        for topic in consumed_topics:
+            key = placeholder_key(topic) or (topic if is_placeholder_key(topic) else None)
+            if key is not None:
+                value = topic_map.get(key)
+                if value is None or placeholder_key(value):
+                    return True
+        return False
+
+    def process_producer_docs(self, workers=None):
         if not os.path.isdir(self.doc_directory):
             raise IOError(f"Documentation directory does not exist: {self.doc_directory}")
         
-        known_microservices = set(self.microservice_topics_map.keys())
-        
-        for root, _, files in os.walk(self.doc_directory):
-            for filename in files:
-                if filename.endswith((".yaml", ".yml")):
-                    filepath = os.path.join(root, filename)
-                    matched_service = self._find_matching_microservice(filepath, known_microservices)
-                    if matched_service:
-                        self.process_producer_doc(filepath, matched_service)
-
-    def _find_matching_microservice(self, doc_filepath, known_microservices):
-        """Find matching microservice using multiple strategies with improved word matching"""
+        with self.metrics.stage("discover_docs"):
+            filepaths = self._collect_yaml_files(self.doc_directory)
+
+        with self.metrics.stage("match_docs"):
+            known_microservices = set(self.microservice_topics_map.keys())
+            service_index = ServiceNameIndex(known_microservices)
+
+            matched_docs = []
+            for filepath in filepaths:
+                matched_service = self._find_matching_microservice(filepath, known_microservices, service_index)
+                if matched_service:
+                    matched_docs.append((filepath, matched_service))
+                else:
+                    self.doc_file_results[filepath] = (None, None)
+
+        with self.metrics.stage("parse_docs"):
+            doc_results = self._map_files("_extract_doc_topics", [filepath for filepath, _ in matched_docs], workers)
+            for (filepath, service_name), doc_topics in zip(matched_docs, doc_results):
+                self.doc_file_results[filepath] = (service_name, doc_topics)
+                self._add_produced_topics(service_name, doc_topics)
+
+    async def process_producer_docs_async(self, concurrency=16, executor=None):
+        if not os.path.isdir(self.doc_directory):
+            raise IOError(f"Documentation directory does not exist: {self.doc_directory}")
+
+        loop = asyncio.get_running_loop()
+        with self.metrics.stage("discover_docs"):
+            filepaths = await loop.run_in_executor(executor, self._collect_yaml_files, self.doc_directory)
+
+        kind = "_extract_doc_topics"
+        with self.metrics.stage("match_docs"):
+            known_microservices = set(self.microservice_topics_map.keys())
+            service_index = ServiceNameIndex(known_microservices)
+            # (filepath, service matched by filename, cached doc topics)
+            plan = []
+            for filepath in filepaths:
+                matched_service = self._match_by_filename(filepath, service_index)
+                cached = self._cached_result(kind, filepath) if matched_service else None
+                plan.append((filepath, matched_service, cached))
+
+        with self.metrics.stage("parse_docs"):
+            # Only docs still needing a title match or an extraction are read
+            contents = iter_file_contents(
+                [filepath for filepath, _, cached in plan if cached is None], concurrency, executor,
+                digest=self._cache_digest)
+            for filepath, matched_service, doc_topics in plan:
+                if doc_topics is None:
+                    _, content, st, file_digest, error = await contents.__anext__()
+                    if error is None:
+                        self.metrics.count("bytes_read", st.st_size)
+                    if not matched_service:
+                        if error is not None:
+                            print(f"Error reading title from {filepath}: {error}")
+                        else:
+                            matched_service = self._match_title_content(filepath, content, service_index)
+                    if not matched_service:
+                        self.doc_file_results[filepath] = (None, None)
+                        continue
+                    self.metrics.count("files_scanned")
+                    if error is not None:
+                        print(f"Error processing doc file {filepath}: {error}")
+                    else:
+                        doc_topics = self._doc_topics_from_content(filepath, content)
+                        self._store_result(kind, filepath, doc_topics, st, file_digest)
+                else:
+                    self.metrics.count("files_scanned")
+
+                self.doc_file_results[filepath] = (matched_service, doc_topics)
+                self._add_produced_topics(matched_service, doc_topics)
+            if self.cache is not None:
+                self.cache.flush()
+
+    def _find_matching_microservice(self, doc_filepath, known_microservices, service_index=None):
+        """Find matching microservice using multiple strategies with improved word matching.
+
+        Pass a ServiceNameIndex built from known_microservices to avoid
+        rebuilding it for every doc.
+        """
+        if service_index is None:
+            service_index = ServiceNameIndex(known_microservices)
+
+        matched = self._match_by_filename(doc_filepath, service_index)
+        if matched:
+            return matched
+
+        # Strategy 4: Title-based matching
+        return self._match_by_title(doc_filepath, known_microservices, service_index)
+
+    def _match_by_filename(self, doc_filepath, service_index):
+        """Matching strategies 1-3, which only look at the doc's filename"""
         filename = os.path.basename(doc_filepath)
         base_filename = filename[:filename.rfind(".")].lower()
         
         # Remove common API/service suffixes
-        base_filename = re.sub(r'\s+(api|service|openapi|swagger)$', '', base_filename)
+        base_filename = DOC_FILENAME_SUFFIX_PATTERN.sub('', base_filename)
         
         # Strategy 1: Direct normalized match (remove all separators)
-        normalized_filename = re.sub(r'[^a-z0-9]', '', base_filename)
-        for ms_name in known_microservices:
-            normalized_ms = re.sub(r'[^a-z0-9]', '', ms_name.lower())
-            if normalized_ms == normalized_filename:
-                return ms_name
+        normalized_filename = normalize_service_name(base_filename)
+        matched = service_index.match_normalized(normalized_filename)
+        if matched:
+            return matched
 
         # Strategy 2: Partial match
-        for ms_name in known_microservices:
-            normalized_ms = re.sub(r'[^a-z0-9]', '', ms_name.lower())
-            if normalized_ms and len(normalized_ms) > 3 and (normalized_ms in normalized_filename or normalized_filename in normalized_ms):
-                return ms_name
+        matched = service_index.match_partial(normalized_filename)
+        if matched:
+            return matched
         
-        # Strategy 3: Smart word matching - handle abbreviations
-        filename_words = re.findall(r'[a-z]+', base_filename)
-        
-        # Sort microservices by length to check shorter names first (more likely to be exact matches)
-        sorted_microservices = sorted(known_microservices, key=len)
-        
-        for ms_name in sorted_microservices:
-            ms_words = re.findall(r'[a-z]+', ms_name.lower())
-            
-            # Check for abbreviation match (e.g., "aap" matches "area air picture")
-            # Look for single short words that could be abbreviations
-            for word in filename_words:
-                if len(word) <= 4:
-                    # Try direct match first (e.g., "aap" matches "aap")
-                    if word == ms_name.lower():
-                        return ms_name
-                    # Try abbreviation match
-                    if self._matches_abbreviation(word, ms_words):
-                        return ms_name
-            
-            # Also check if the full microservice name appears as a single word in filename
-            for ms_word in ms_words:
-                if ms_word in filename_words and len(ms_word) > 2:
-                    return ms_name
-            
-            # Check for significant word overlap
-            significant_ms_words = [w for w in ms_words if len(w) > 2]
-            significant_filename_words = [w for w in filename_words if len(w) > 2]
-            shared = set(significant_ms_words) & set(significant_filename_words)
-            if len(shared) >= min(2, len(significant_ms_words)):
-                return ms_name
-        
-        # Strategy 4: Title-based matching
-        return self._match_by_title(doc_filepath, known_microservices)
-
-    def _matches_abbreviation(self, abbrev, words):
-        """Check if abbreviation matches first letters of words"""
-        if len(abbrev) != len(words):
-            return False
-        return all(abbrev[i] == word[0] for i, word in enumerate(words))
+        # Strategy 3: Smart word matching - handle abbreviations (e.g., "aap" matches
+        # "area air picture"); shorter names are checked first
+        return service_index.match_words(name_words(base_filename))
 
-    def _match_by_title(self, doc_filepath, known_microservices):
+    def _match_by_title(self, doc_filepath, known_microservices, service_index=None):
         """Match microservice by document title"""
+        if service_index is None:
+            service_index = ServiceNameIndex(known_microservices)
+
+        if self.use_mmap:
+            try:
+                with mapped_file(doc_filepath) as buf:
+                    if buf is not None and is_plain_ascii(buf):
+                        self.metrics.count("bytes_read", len(buf))
+                        title_match = TITLE_BYTES_PATTERN.search(buf)
+                        if not title_match:
+                            return None
+                        self.metrics.count("regex_matches")
+                        return self._match_title(title_match.group(1).decode("ascii"), service_index)
+            except Exception as e:
+                print(f"Error reading title from {doc_filepath}: {e}")
+                return None
+
         try:
             with open(doc_filepath, "r", encoding="utf-8") as f:
                 content = f.read()
-            
-            title_match = re.search(r'title:\s*([^\n]+)', content, re.IGNORECASE)
+                self._count_bytes_read(f)
+        except Exception as e:
+            print(f"Error reading title from {doc_filepath}: {e}")
+            return None
+        return self._match_title_content(doc_filepath, content, service_index)
+
+    def _match_title_content(self, doc_filepath, content, service_index):
+        """_match_by_title for a doc whose content is already read"""
+        try:
+            title_match = TITLE_PATTERN.search(content)
             if not title_match:
                 return None
-                
-            title = title_match.group(1).strip().strip('"').strip("'")
-            
-            # Remove common suffixes
-            title = re.sub(r'\s+(api|service)$', '', title, flags=re.IGNORECASE)
-            normalized_title = re.sub(r'[^a-z0-9]', '', title.lower())
-            
-            # Direct title match
-            for ms_name in known_microservices:
-                normalized_ms = re.sub(r'[^a-z0-9]', '', ms_name.lower())
-                if normalized_ms == normalized_title:
-                    return ms_name
-            
-            # Word-based title matching with abbreviation support
-            title_words = re.findall(r'[a-z]+', title.lower())
-            for ms_name in known_microservices:
-                ms_words = re.findall(r'[a-z]+', ms_name.lower())
-                
-                # Check abbreviation in title
-                if len(title_words) >= 3:
-                    potential_abbrev = ''.join(word[0] for word in title_words[:3])
-                    if potential_abbrev in [w for w in ms_words if len(w) <= 4]:
-                        return ms_name
-                
-                # Word overlap
-                significant_ms_words = [w for w in ms_words if len(w) > 2]
-                significant_title_words = [w for w in title_words if len(w) > 2]
-                shared = set(significant_ms_words) & set(significant_title_words)
-                if len(shared) >= min(2, len(significant_ms_words)):
-                    return ms_name
-                        
+            self.metrics.count("regex_matches")
+            return self._match_title(title_match.group(1), service_index)
         except Exception as e:
             print(f"Error reading title from {doc_filepath}: {e}")
         
         return None
 
+    def _match_title(self, title, service_index):
+        """Service matching the text captured after a doc's title:"""
+        title = title.strip().strip('"').strip("'")
+        
+        # Remove common suffixes
+        title = TITLE_SUFFIX_PATTERN.sub('', title)
+
+        # Direct title match
+        matched = service_index.match_normalized(normalize_service_name(title))
+        if matched:
+            return matched
+        
+        # Word-based title matching with abbreviation support
+        return service_index.match_title_words(name_words(title))
+
     def process_producer_doc(self, filepath, service_name):
+        doc_topics = self._extract_doc_topics(filepath)
+        self.doc_file_results[filepath] = (service_name, doc_topics)
+        self._add_produced_topics(service_name, doc_topics)
+
+    def _extract_doc_topics(self, filepath):
+        """Return [(topic, is_domain_event), ...] for a doc file, or None on error"""
+        if self.use_mmap:
+            try:
+                with mapped_file(filepath) as buf:
+                    if buf is not None and is_plain_ascii(buf):
+                        self.metrics.count("bytes_read", len(buf))
+                        return self._classify_doc_buffer(buf)
+            except Exception as e:
+                print(f"Error processing doc file {filepath}: {e}")
+                return None
+
         try:
             with open(filepath, "r", encoding="utf-8") as f:
                 content = f.read()
+                self._count_bytes_read(f)
+        except Exception as e:
+            print(f"Error processing doc file {filepath}: {e}")
+            return None
+        return self._doc_topics_from_content(filepath, content)
 
-            # Initialize microservice if not exists
-            if service_name not in self.microservice_topics_map:
-                self.microservice_topics_map[service_name] = MicroserviceTopics()
-
-            # Find all topic declarations
-            for match in self.DOC_TOPIC_PATTERN.finditer(content):
-                topic = match.group(1)
-                topic_position = match.start()
-                
-                # Check if this is a domain event by examining the surrounding context
-                if self._is_domain_event_topic(content, topic_position):
-                    self.microservice_topics_map[service_name].produces.add(topic)
-                    
+    def _doc_topics_from_content(self, filepath, content):
+        """_extract_doc_topics for a doc whose content is already read"""
+        try:
+            # Find all topic declarations and classify them by their surrounding context
+            return self._classify_doc_topics(content)
         except Exception as e:
             print(f"Error processing doc file {filepath}: {e}")
-    
-    def _is_domain_event_topic(self, content, topic_position):
-        """Check if topic is a domain event by examining surrounding context"""
-        # Look for domain event indicators in the path or description
-        lines_before = content[:topic_position].split('\n')
-        lines_after = content[topic_position:].split('\n')
-        
-        # Check the path/endpoint context (lines before)
-        for i in range(len(lines_before) - 1, max(-1, len(lines_before) - 10), -1):
-            line = lines_before[i].strip()
-            
-            # Look for path definitions that might indicate events
-            if re.match(r'^\s*/[^:]*:\s*$', lines_before[i]):
-                # Found a path, now look for tags section
-                combined_lines = lines_before[i:] + lines_after[:20]  # Look ahead a bit
-                
-                in_tags_section = False
-                for line_text in combined_lines:
-                    line_stripped = line_text.strip()
-                    
-                    if line_stripped == "tags:":
-                        in_tags_section = True
-                        continue
-                    
-                    if in_tags_section:
-                        if line_text and not line_text.startswith((' ', '\t')):
-                            break
-                        # Look for domain event indicators
-                        if 'domainevent' in line_stripped.lower().replace(' ', '') or 'domain event' in line_stripped.lower():
-                            return True
-                break
-        
+            return None
+
+    def _classify_doc_topics(self, content):
+        """Return [(topic, is_domain_event), ...] for every topic declaration in a doc.
+
+        Gives the same answers as classifying each match on its own (see
+        legacy_is_domain_event_topic in tests/test_single_pass_scan.py),
+        but the content is split into lines once and the matches are visited in
+        a single forward pass. Each topic only looks at its own bounded window
+        (the path line up to 8 lines above it, and 20 lines from the topic on),
+        so the cost is linear in the doc size rather than quadratic.
+        """
+        lines = content.split('\n')
+        line_flags = {}
+
+        def flags_at(index):
+            flags = line_flags.get(index)
+            if flags is None:
+                flags = line_flags[index] = self._doc_line_flags(lines[index])
+            return flags
+
+        doc_topics = []
+        line_index = 0
+        line_start = 0
+        for match in self.DOC_TOPIC_PATTERN.finditer(content):
+            topic_position = match.start()
+            while line_start + len(lines[line_index]) < topic_position:
+                line_start += len(lines[line_index]) + 1
+                line_index += 1
+
+            is_domain_event = self._is_domain_event_at(lines, line_index, topic_position - line_start, flags_at)
+            doc_topics.append((match.group(1), is_domain_event))
+        self.metrics.count("regex_matches", len(doc_topics))
+        return doc_topics
+
+    def _classify_doc_buffer(self, buf):
+        """_classify_doc_topics over a plain-ASCII bytes buffer such as an mmap.
+
+        Topic declarations are found by a bytes regex; only each topic's own
+        classification window is decoded.
+        """
+        doc_topics = []
+        for match in DOC_TOPIC_BYTES_PATTERN.finditer(buf):
+            window_start, window_end, line_index, column = line_window(buf, match.start(), 8, 20)
+            # Text-mode reads turn \r\n into \n; is_plain_ascii rules out lone \r
+            lines = buf[window_start:window_end].decode("ascii").replace("\r\n", "\n").split("\n")
+
+            def flags_at(index, lines=lines):
+                return self._doc_line_flags(lines[index])
+
+            is_domain_event = self._is_domain_event_at(lines, line_index, column, flags_at)
+            topic = match.group(1).decode("ascii").replace("\r\n", "\n")
+            doc_topics.append((topic, is_domain_event))
+        self.metrics.count("regex_matches", len(doc_topics))
+        return doc_topics
+
+    def _doc_line_flags(self, text):
+        """(is_path, is_tags_header, is_unindented, has_domain_event_marker) for a doc line"""
+        stripped = text.strip()
+        lowered = stripped.lower()
+        return (
+            self.DOC_PATH_PATTERN.match(text) is not None,
+            stripped == "tags:",
+            bool(text) and not text.startswith((' ', '\t')),
+            'domainevent' in lowered.replace(' ', '') or 'domain event' in lowered,
+        )
+
+    def _is_domain_event_at(self, lines, line_index, column, flags_at):
+        """Classify the topic declared at lines[line_index][column:].
+
+        flags_at(i) returns _doc_line_flags(lines[i]), possibly cached.
+        """
+        # The topic's line is seen as two pieces: before and from the match
+        head_flags = self._doc_line_flags(lines[line_index][:column])
+        tail = lines[line_index][column:]
+
+        is_domain_event = False
+        for i in range(line_index, max(-1, line_index - 9), -1):
+            if not (head_flags if i == line_index else flags_at(i))[0]:
+                continue
+            # Found the path; look for a domain event marker under its tags
+            window = [flags_at(j) for j in range(i, line_index)]
+            window += [head_flags, self._doc_line_flags(tail)]
+            window += [flags_at(j) for j in range(line_index + 1, min(len(lines), line_index + 20))]
+            in_tags_section = False
+            for _, is_tags_header, is_unindented, has_marker in window:
+                if is_tags_header:
+                    in_tags_section = True
+                    continue
+                if in_tags_section:
+                    if is_unindented:
+                        break
+                    if has_marker:
+                        is_domain_event = True
+                        break
+            break
+
         # Fallback: if topic ends with .event, likely a domain event
-        lines_around_topic = lines_after[0] if lines_after else ""
-        if '.event' in lines_around_topic:
-            return True
-            
-        return False
+        if not is_domain_event and '.event' in tail:
+            is_domain_event = True
+        return is_domain_event
+
+    def _add_produced_topics(self, service_name, doc_topics):
+        """Merge a doc file's domain-event topics into the microservice map"""
+        if doc_topics is None:
+            return
 
+        # Initialize microservice if not exists
+        if service_name not in self.microservice_topics_map:
+            self.microservice_topics_map[service_name] = MicroserviceTopics(self.topic_table)
+        self.topics_version += 1
+
+        for topic, is_domain_event in doc_topics:
+            if is_domain_event:
+                self.microservice_topics_map[service_name].produces.add(topic)
+    
     def extract_microservice_name_from_topic(self, topic):
         """Extract microservice name from topic pattern"""
         match = self.TOPIC_PATTERN.match(topic)
@@ -399,28 +886,38 @@ class YamlParser:
         """Normalize topic names for comparison by removing separators and converting to lowercase"""
         if not name:
             return ""
-        # Better camelCase to hyphen conversion
-        # Handle sequences like "c2ResourceManagement" -> "c2-resource-management"
-        # First pass: insert hyphens before uppercase letters that follow lowercase/digits
-        name = re.sub(r'([a-z0-9])([A-Z])', r'\1-\2', name)
-        # Second pass: handle consecutive uppercase letters like "XMLHttpRequest" -> "XML-Http-Request"
-        name = re.sub(r'([A-Z])([A-Z][a-z])', r'\1-\2', name)
-        # Remove all separators and convert to lowercase
-        normalized = re.sub(r'[^a-z0-9]', '', name.lower())
-        
-        # Debug output for c2ResourceManagement case
-        if 'c2resource' in name.lower() or 'c2-resource' in name.lower():
-            print(f"DEBUG NORMALIZE: '{name}' -> '{normalized}'")
-        
-        return normalized
+        # Memoized: the same microservice parts recur across thousands of topics
+        return _normalize_topic_name(name)
 
-    def find_matching_producer_topics(self, consumer_topic, all_producer_topics):
-        """Find producer topics that match a consumer topic using fuzzy matching"""
-        consumer_ms_part = self.extract_microservice_name_from_topic(consumer_topic)
-        if not consumer_ms_part:
+    def topic_match_key(self, topic):
+        """Normalized microservice part of a topic, or None if the topic has none"""
+        ms_part = self.extract_microservice_name_from_topic(topic)
+        if not ms_part:
+            return None
+        return self.normalize_topic_name(ms_part)
+
+    def build_producer_topic_index(self, all_producer_topics):
+        """Index producer topics by their normalized microservice part"""
+        index = {}
+        for producer_topic in all_producer_topics:
+            key = self.topic_match_key(producer_topic)
+            if key is not None:
+                index.setdefault(key, []).append(producer_topic)
+        return index
+
+    def find_matching_producer_topics(self, consumer_topic, all_producer_topics, producer_index=None):
+        """Find producer topics that match a consumer topic using fuzzy matching.
+
+        With a producer_index from build_producer_topic_index this is a single
+        dict lookup; otherwise every producer topic is normalized and compared.
+        """
+        normalized_consumer = self.topic_match_key(consumer_topic)
+        if normalized_consumer is None:
             return []
-        
-        normalized_consumer = self.normalize_topic_name(consumer_ms_part)
+
+        if producer_index is not None:
+            return list(producer_index.get(normalized_consumer, ()))
+
         matching_topics = []
         
         for producer_topic in all_producer_topics:
@@ -432,9 +929,36 @@ class YamlParser:
         
         return matching_topics
 
+    def invalidate_dependency_graph(self):
+        """Drop the cached graph; call after mutating microservice_topics_map directly"""
+        self.topics_version += 1
+
     def build_dependency_graph(self):
+        """Return the dependency graph, rebuilding it only if the topic map changed.
+
+        The returned dict is shared with later calls and must not be mutated.
+        """
+        if self._graph_is_current():
+            return self._graph_cache[2]
+
+        with self.metrics.stage("build_graph"):
+            dependencies = self._compute_dependency_graph()
+        self._graph_cache = (self.topics_version, self.microservice_topics_map, dependencies)
+        self._graph_keys = None
+        return dependencies
+
+    def _graph_is_current(self):
+        """True if the cached graph was built from the current topic map"""
+        if self._graph_cache is None:
+            return False
+        cached_version, cached_map, _ = self._graph_cache
+        # Identity check also catches the whole map being replaced
+        return cached_version == self.topics_version and cached_map is self.microservice_topics_map
+
+    def _compute_dependency_graph(self):
         """Build dependency graph by matching microservice name parts with fuzzy matching"""
-        print("\n--- Building Dependency Graph ---")
+        logger.debug("--- Building Dependency Graph ---")
+        log_edges = logger.isEnabledFor(logging.DEBUG)
 
         # Collect all producer topics and map them to their services
         all_producer_topics = set()
@@ -447,13 +971,21 @@ class YamlParser:
                     topic_to_producers[topic] = set()
                 topic_to_producers[topic].add(producer_service)
 
+        # Normalize every producer topic once, then match consumers by lookup
+        producer_index = self.build_producer_topic_index(all_producer_topics)
+        matches_by_topic = {}
+
         # Build dependencies using fuzzy topic matching
         dependencies = {service: set() for service in self.microservice_topics_map}
         
         for consumer_service, topics_obj in self.microservice_topics_map.items():
             for subscribed_topic in topics_obj.subscribes:
-                # Find matching producer topics using fuzzy matching
-                matching_producer_topics = self.find_matching_producer_topics(subscribed_topic, all_producer_topics)
+                # Many services subscribe to the same topic; match each topic once
+                matching_producer_topics = matches_by_topic.get(subscribed_topic)
+                if matching_producer_topics is None:
+                    matching_producer_topics = self.find_matching_producer_topics(
+                        subscribed_topic, all_producer_topics, producer_index)
+                    matches_by_topic[subscribed_topic] = matching_producer_topics
                 
                 for producer_topic in matching_producer_topics:
                     producers = topic_to_producers.get(producer_topic, set())
@@ -461,10 +993,257 @@ class YamlParser:
                     
                     if filtered_producers:
                         dependencies[consumer_service].update(filtered_producers)
-                        print(f"'{consumer_service}' depends on {filtered_producers} (consumer: {subscribed_topic} -> producer: {producer_topic})")
+                        if log_edges:
+                            logger.debug("'%s' depends on %s (consumer: %s -> producer: %s)",
+                                         consumer_service, filtered_producers, subscribed_topic, producer_topic)
             
         return dependencies
 
+    def apply_file_changes(self, filepaths, workers=None, removed=()):
+        """Update the parse for files that were added, changed or deleted.
+
+        Only the changed files are re-parsed and only the services they
+        contribute to (before or after the change) are rebuilt. Docs are
+        re-matched to services only when the set of config-defined services
+        changes. If a dependency graph is cached it is patched in place for the
+        affected consumers instead of being rebuilt. Returns the set of
+        services whose entries were rebuilt. Paths in removed count as
+        deleted even if they still exist, e.g. files discovery now ignores.
+        """
+        with self.metrics.stage("apply_changes"):
+            return self._apply_file_changes(filepaths, workers, set(removed))
+
+    def _apply_file_changes(self, filepaths, workers, removed):
+        config_paths = []
+        doc_paths = []
+        for filepath in filepaths:
+            if not filepath.endswith((".yaml", ".yml")):
+                continue
+            if filepath.startswith(os.path.join(self.config_directory, "")):
+                config_paths.append(filepath)
+            elif filepath.startswith(os.path.join(self.doc_directory, "")):
+                doc_paths.append(filepath)
+
+        affected_services = set()
+        known_before = self._config_defined_services()
+
+        existing_configs = [filepath for filepath in config_paths
+                            if filepath not in removed and os.path.isfile(filepath)]
+        parsed = dict(zip(existing_configs, self._map_files("_parse_subscription_config", existing_configs, workers)))
+        definitions_changed = False
+        for filepath in config_paths:
+            old_result = self.config_file_results.pop(filepath, None)
+            if old_result:
+                affected_services.add(old_result[0])
+            result = parsed.get(filepath)
+            if result:
+                self.config_file_results[filepath] = result
+                affected_services.add(result[0])
+            if (old_result[1] if old_result else {}) != (result[1] if result else {}):
+                definitions_changed = True
+        if definitions_changed:
+            # Placeholders resolved through the index may now resolve differently
+            self._index_topic_definitions()
+            affected_services.update(
+                service_name for service_name, topic_map, consumed_topics in self.config_file_results.values()
+                if consumed_topics and self._uses_topic_index(topic_map, consumed_topics))
+
+        changed_docs = set(doc_paths)
+        known_microservices = self._config_defined_services()
+        if known_microservices != known_before:
+            # Doc matching depends on the known services; re-match every doc
+            doc_paths = changed_docs | set(self.doc_file_results)
+        service_index = ServiceNameIndex(known_microservices)
+
+        to_extract = []
+        for filepath in doc_paths:
+            old_service, old_topics = self.doc_file_results.pop(filepath, (None, None))
+            if filepath in removed or not os.path.isfile(filepath):
+                if old_service:
+                    affected_services.add(old_service)
+                continue
+            matched_service = self._find_matching_microservice(filepath, known_microservices, service_index)
+            if matched_service == old_service and filepath not in changed_docs:
+                self.doc_file_results[filepath] = (old_service, old_topics)
+                continue
+            if old_service:
+                affected_services.add(old_service)
+            if matched_service:
+                to_extract.append((filepath, matched_service))
+                affected_services.add(matched_service)
+            else:
+                self.doc_file_results[filepath] = (None, None)
+
+        doc_results = self._map_files("_extract_doc_topics", [filepath for filepath, _ in to_extract], workers)
+        for (filepath, service_name), doc_topics in zip(to_extract, doc_results):
+            self.doc_file_results[filepath] = (service_name, doc_topics)
+
+        affected_services.discard(None)
+        affected_services.discard("")
+        if affected_services:
+            self._rebuild_service_entries(affected_services)
+        return affected_services
+
+    def _config_defined_services(self):
+        """Services that get an entry from their config files (the doc-matching candidates)"""
+        return {
+            service_name
+            for service_name, _, consumed_topics in self.config_file_results.values()
+            if service_name and consumed_topics
+        }
+
+    def _rebuild_service_entries(self, service_names):
+        """Recompute the entries of service_names from the per-file results"""
+        rebuilt = {}
+        for service_name, topic_map, consumed_topics in self.config_file_results.values():
+            if service_name in service_names and consumed_topics:
+                topics = rebuilt.setdefault(service_name, MicroserviceTopics(self.topic_table))
+                for topic in consumed_topics:
+                    actual_topic = self._resolve_topic_placeholder(topic, topic_map)
+                    if actual_topic:
+                        topics.subscribes.add(actual_topic)
+        for service_name, doc_topics in self.doc_file_results.values():
+            if service_name in service_names and doc_topics is not None:
+                topics = rebuilt.setdefault(service_name, MicroserviceTopics(self.topic_table))
+                topics.produces.update(topic for topic, is_domain_event in doc_topics if is_domain_event)
+
+        graph_was_current = self._graph_is_current()
+        if graph_was_current:
+            # Index the graph's match keys while the map still holds the old topics
+            self._dependency_graph_keys()
+
+        previous = {}
+        for service_name in service_names:
+            topics = self.microservice_topics_map.get(service_name)
+            if topics is not None:
+                previous[service_name] = (set(topics.produces), set(topics.subscribes))
+            if service_name not in rebuilt:
+                self.microservice_topics_map.pop(service_name, None)
+            elif topics is None:
+                self.microservice_topics_map[service_name] = rebuilt[service_name]
+            else:
+                # Update in place so existing references stay valid
+                topics.produces = rebuilt[service_name].produces
+                topics.subscribes = rebuilt[service_name].subscribes
+
+        self.topics_version += 1
+        if graph_was_current:
+            self._patch_dependency_graph(previous, service_names)
+        self._compact_topic_table()
+
+    # Topic tables smaller than this are never compacted
+    MIN_COMPACTED_TABLE_SIZE = 4096
+
+    def _compact_topic_table(self):
+        """Drop the topics no service uses any more from topic_table.
+
+        Incremental updates leave the topics of deleted services and removed
+        subscriptions interned. Once the table has doubled since the last
+        compaction, the live topics are moved to a new table, so a watched
+        parser's table stays within twice its topic count (amortized O(1) per
+        interned topic).
+        """
+        if len(self.topic_table) <= max(self.MIN_COMPACTED_TABLE_SIZE, 2 * self._compacted_table_size):
+            return
+        table = TopicTable()
+        for topics in self.microservice_topics_map.values():
+            topics.move_to(table)
+        self.topic_table = table
+        self._compacted_table_size = len(table)
+
+    def _dependency_graph_keys(self):
+        """Match-key indexes behind the cached graph: key -> producer / consumer services"""
+        if self._graph_keys is None:
+            producers_by_key = {}
+            consumers_by_key = {}
+            for service_name, topics_obj in self.microservice_topics_map.items():
+                for key in self._topic_keys(topics_obj.produces):
+                    producers_by_key.setdefault(key, set()).add(service_name)
+                for key in self._topic_keys(topics_obj.subscribes):
+                    consumers_by_key.setdefault(key, set()).add(service_name)
+            self._graph_keys = (producers_by_key, consumers_by_key)
+        return self._graph_keys
+
+    def _topic_keys(self, topics):
+        keys = {self.topic_match_key(topic) for topic in topics}
+        keys.discard(None)
+        return keys
+
+    def _patch_dependency_graph(self, previous, service_names):
+        """Update the cached graph for services whose topics changed.
+
+        previous maps each service that existed before the change to its old
+        (produces, subscribes). Only rows of the changed services and of the
+        consumers of match keys whose producer set changed are recomputed.
+        """
+        _, _, dependencies = self._graph_cache
+        producers_by_key, consumers_by_key = self._dependency_graph_keys()
+
+        affected_consumers = set(service_names)
+        for service_name in service_names:
+            old_produces, old_subscribes = previous.get(service_name, ((), ()))
+            topics_obj = self.microservice_topics_map.get(service_name)
+            new_produces = topics_obj.produces if topics_obj else ()
+            new_subscribes = topics_obj.subscribes if topics_obj else ()
+
+            old_keys, new_keys = self._topic_keys(old_produces), self._topic_keys(new_produces)
+            for key in old_keys - new_keys:
+                producers_by_key[key].discard(service_name)
+                affected_consumers.update(consumers_by_key.get(key, ()))
+            for key in new_keys - old_keys:
+                producers_by_key.setdefault(key, set()).add(service_name)
+                affected_consumers.update(consumers_by_key.get(key, ()))
+
+            old_keys, new_keys = self._topic_keys(old_subscribes), self._topic_keys(new_subscribes)
+            for key in old_keys - new_keys:
+                consumers_by_key[key].discard(service_name)
+            for key in new_keys - old_keys:
+                consumers_by_key.setdefault(key, set()).add(service_name)
+
+        for consumer_service in affected_consumers:
+            topics_obj = self.microservice_topics_map.get(consumer_service)
+            if topics_obj is None:
+                dependencies.pop(consumer_service, None)
+                continue
+            row = set()
+            for key in self._topic_keys(topics_obj.subscribes):
+                row.update(producers_by_key.get(key, ()))
+            row.discard(consumer_service)
+            dependencies[consumer_service] = row
+
+        self._graph_cache = (self.topics_version, self.microservice_topics_map, dependencies)
+
+    def iter_microservices(self):
+        """Yield (name, produces, subscribes) for every service, in map order"""
+        for service_name, topics_obj in self.microservice_topics_map.items():
+            yield service_name, topics_obj.produces, topics_obj.subscribes
+
+    def iter_dependency_edges(self):
+        """Yield (service, dependency) pairs of the dependency graph.
+
+        Served from the cached graph when it is current. Otherwise edges are
+        produced one consumer at a time from a match-key -> producers map, so
+        the full graph is never held in memory (and is not cached).
+        """
+        if self._graph_is_current():
+            for service_name, deps in self._graph_cache[2].items():
+                for dep in deps:
+                    yield service_name, dep
+            return
+
+        producers_by_key = {}
+        for service_name, topics_obj in self.microservice_topics_map.items():
+            for key in self._topic_keys(topics_obj.produces):
+                producers_by_key.setdefault(key, set()).add(service_name)
+
+        for consumer_service, topics_obj in self.microservice_topics_map.items():
+            deps = set()
+            for key in self._topic_keys(topics_obj.subscribes):
+                deps.update(producers_by_key.get(key, ()))
+            deps.discard(consumer_service)
+            for dep in deps:
+                yield consumer_service, dep
+
     def get_all_microservice_names(self):
         return set(self.microservice_topics_map.keys())
 
@@ -475,8 +1254,21 @@ class YamlParser:
         dependencies = self.build_dependency_graph()
         return sum(len(dep_set) for dep_set in dependencies.values())
 
+def _parse_file_chunk(method_name, filepaths, collect_metrics=False, use_mmap=False, stream_min_bytes=None):
+    """Process-pool entry point: run a YamlParser per-file parse method over a chunk.
+
+    Returns (results, counters); counters is None unless collect_metrics.
+    """
+    metrics = ParseMetrics() if collect_metrics else None
+    parser = YamlParser("", metrics=metrics, use_mmap=use_mmap, stream_min_bytes=stream_min_bytes)
+    parse = getattr(parser, method_name)
+    results = [parse(filepath) for filepath in filepaths]
+    return results, metrics.counters if metrics else None
+
 # Test
 if __name__ == "__main__":
+    # Show the per-edge matching details unless LOG_LEVEL says otherwise
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "DEBUG"), format="%(message)s")
     current_dir = os.path.dirname(os.path.abspath(__file__))
     base_dir = os.path.join(current_dir, "tests", "test1")
     parser = YamlParser(base_dir)